@@ -1,5 +1,9 @@
+import time
+
+# Inicio de esta ejecución del script (cada rerun de Streamlit lo vuelve a correr)
+INICIO_SCRIPT = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
 import os
 from datetime import datetime
 import shutil
@@ -7,9 +11,24 @@ from pathlib import Path
 import re
 import hashlib
 import json
-import plotly.express as px
-import subprocess
 import pickle
+import io
+# Solo los módulos livianos del motor (sin pandas) se importan aquí, para que
+# la pantalla de acceso se muestre sin esperar a pandas; los que procesan
+# datos se importan dentro de las funciones y páginas que los usan.
+from express_analysis.cache_libros import CacheLibros
+from express_analysis.gemelos import respaldar_gemelos
+from express_analysis.libro_mayor import LibroMayor, ESTADO_PAGADO, ESTADO_POR_PAGAR
+from express_analysis.cola_git import ColaGit
+from express_analysis.rutas import Rutas
+from express_analysis.sincronizacion import Sincronizador
+from express_analysis.memo import Memoizador, huella_archivos
+from express_analysis.paquetes import crear_paquete
+from express_analysis.ingesta import Ingesta
+from express_analysis.metadatos_wicho import calcular_metadatos_wicho, guardar_metadatos_wicho, cargar_metadatos_wicho
+from express_analysis.trabajos import EjecutorTrabajos, EN_COLA, EJECUTANDO, TERMINADO, FALLIDO, CANCELADO
+from express_analysis.arranque import medir_importaciones
+from express_analysis.metricas import RegistroMetricas, etapas_mas_lentas, resumir_corridas
 
 # Configuración de la página
 st.set_page_config(
@@ -20,68 +39,65 @@ st.set_page_config(
 
 # Crear directorios necesarios si no existen
 BASE_DIR = Path(".")  # Directorio actual
-DETALLE_DIR = BASE_DIR / "Detalle"
-RESULTADOS_DIR = BASE_DIR / "Resultados"
-HISTORICO_DIR = BASE_DIR / "Detalle historico"
-TEMP_DIR = BASE_DIR / "Temp"
+RUTAS = Rutas(BASE_DIR)
+DETALLE_DIR = RUTAS.detalle
+RESULTADOS_DIR = RUTAS.resultados
+HISTORICO_DIR = RUTAS.historico
+TEMP_DIR = RUTAS.temp
 
-for directory in [DETALLE_DIR, RESULTADOS_DIR, HISTORICO_DIR, TEMP_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+# Registro de metadatos del archivo Wicho, escrito al subirlo
+METADATOS_WICHO = RUTAS.metadatos_wicho
 
-def guardar_en_git(ruta_archivo, mensaje_commit):
-    """
-    Función que guarda archivos y los añade a Git automáticamente.
-    
-    Args:
-        ruta_archivo (Path): Ruta del archivo a guardar
-        mensaje_commit (str): Mensaje para el commit
-        
-    Returns:
-        bool: True si se guardó correctamente, False en caso contrario
-    """
-    try:
-        # Verificar que el archivo existe
-        if not ruta_archivo.exists():
-            st.error(f"❌ El archivo no existe: {ruta_archivo}")
-            return False
-        
-        # Intentar añadir el archivo a Git
-        try:
-            # Añadir el archivo al staging area
-            result = subprocess.run(
-                ['git', 'add', str(ruta_archivo)],
-                capture_output=True,
-                text=True,
-                cwd=BASE_DIR
-            )
-            
-            if result.returncode == 0:
-                # Hacer commit del archivo
-                commit_result = subprocess.run(
-                    ['git', 'commit', '-m', mensaje_commit],
-                    capture_output=True,
-                    text=True,
-                    cwd=BASE_DIR
-                )
-                
-                if commit_result.returncode == 0:
-                    st.success(f"✅ Archivo guardado y añadido a Git: {ruta_archivo.name}")
-                    return True
-                else:
-                    st.warning(f"⚠️ Archivo guardado pero no se pudo hacer commit: {commit_result.stderr}")
-                    return True
-            else:
-                st.warning(f"⚠️ Archivo guardado pero no se pudo añadir a Git: {result.stderr}")
-                return True
-                
-        except FileNotFoundError:
-            # Git no está disponible, solo guardar localmente
-            st.success(f"✅ Archivo guardado localmente: {ruta_archivo.name}")
-            return True
-            
-    except Exception as e:
-        st.error(f"❌ Error al guardar archivo: {str(e)}")
-        return False
+# Registro de cambios de estado de pago de los libros de resultados
+ESTADOS_PAGO = RUTAS.estados_pago
+
+@st.cache_resource
+def preparar_directorios():
+    """Crea las carpetas de datos una sola vez por proceso, no en cada rerun."""
+    RUTAS.crear_directorios()
+    return True
+
+preparar_directorios()
+
+@st.cache_resource
+def obtener_cache_libros():
+    """Caché de libros parseados, compartida entre sesiones y reruns."""
+    return CacheLibros(RUTAS.cache_libros)
+
+@st.cache_resource
+def obtener_libro_mayor():
+    """Libro mayor de comisiones (SQLite), una fila por línea encontrada."""
+    return LibroMayor(RUTAS.libro_mayor, ESTADOS_PAGO)
+
+@st.cache_resource
+def obtener_metricas():
+    """Registro de métricas de ejecución por etapa, compartido entre sesiones."""
+    return RegistroMetricas(RUTAS.metricas)
+
+@st.cache_resource
+def obtener_cola_git():
+    """Cola de commits y push a Git en segundo plano, compartida entre sesiones."""
+    return ColaGit(
+        BASE_DIR,
+        remoto=os.environ.get('CHIPS_EXPRESS_GIT_REMOTO'),
+        rama=os.environ.get('CHIPS_EXPRESS_GIT_RAMA'),
+        metricas=obtener_metricas()
+    )
+
+@st.cache_resource
+def obtener_ejecutor_trabajos():
+    """Ejecutor de análisis en segundo plano, compartido entre sesiones."""
+    return EjecutorTrabajos(TEMP_DIR / "trabajos")
+
+@st.cache_resource
+def obtener_sincronizador():
+    """Sincronizador incremental de las carpetas de Git hacia Temp/."""
+    return Sincronizador(TEMP_DIR / "manifiesto_sincronizacion.json")
+
+@st.cache_resource
+def obtener_memo():
+    """Cálculos del dashboard memorizados por huella de los datos, compartidos entre sesiones."""
+    return Memoizador()
 
 def guardar_datos_persistentes(clave, datos):
     """
@@ -124,74 +140,37 @@ def cargar_datos_persistentes(clave):
         return None
 
 def sincronizar_con_git():
-    """Sincroniza los archivos entre Git y el directorio temporal."""
+    """
+    Sincroniza los archivos entre Git y el directorio temporal.
+
+    Solo se copian los archivos nuevos o modificados desde la última
+    sincronización (ver express_analysis/sincronizacion.py).
+
+    Returns:
+        dict: Resumen de cambios, o None si hubo un error
+    """
     try:
-        st.write("Iniciando sincronización con Git...")
-        
-        # Crear directorios en Git si no existen
-        for dir_name in ["Detalle", "Resultados", "Detalle historico"]:
-            git_dir = BASE_DIR / dir_name
-            temp_dir = TEMP_DIR / dir_name
-            
-            st.write(f"Procesando directorio: {dir_name}")
-            st.write(f"Directorio Git: {git_dir}")
-            st.write(f"Directorio Temporal: {temp_dir}")
-            
-            # Crear directorio en Git si no existe
-            git_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Copiar archivos de Git a temporal
-            if git_dir.exists():
-                archivos = list(git_dir.glob("*.xlsx"))
-                st.write(f"Archivos encontrados en Git: {[a.name for a in archivos]}")
-                
-                for archivo in archivos:
-                    try:
-                        # Asegurar que el directorio temporal existe
-                        temp_dir.mkdir(parents=True, exist_ok=True)
-                        
-                        # Copiar archivo
-                        destino = temp_dir / archivo.name
-                        shutil.copy2(archivo, destino)
-                        st.write(f"Copiado: {archivo.name} -> {destino}")
-                    except Exception as e:
-                        st.error(f"Error al copiar {archivo.name}: {str(e)}")
-            else:
-                st.warning(f"Directorio Git no existe: {git_dir}")
-        
-        # Verificar archivos en directorio temporal
-        st.write("\nVerificando archivos en directorio temporal:")
-        for dir_name in ["Detalle", "Resultados", "Detalle historico"]:
-            temp_dir = TEMP_DIR / dir_name
-            if temp_dir.exists():
-                archivos = list(temp_dir.glob("*.xlsx"))
-                st.write(f"{dir_name}: {[a.name for a in archivos]}")
-            else:
-                st.warning(f"Directorio temporal no existe: {temp_dir}")
-        
-        # Copiar archivos del repositorio al directorio temporal
-        st.write("\nCopiando archivos del repositorio al directorio temporal...")
-        for dir_name in ["Detalle", "Resultados", "Detalle historico"]:
-            git_dir = BASE_DIR / dir_name
-            temp_dir = TEMP_DIR / dir_name
-            
-            if git_dir.exists():
-                for archivo in git_dir.glob("*.xlsx"):
-                    try:
-                        # Asegurar que el directorio temporal existe
-                        temp_dir.mkdir(parents=True, exist_ok=True)
-                        
-                        # Copiar archivo
-                        destino = temp_dir / archivo.name
-                        shutil.copy2(archivo, destino)
-                        st.write(f"Copiado del repositorio: {archivo.name} -> {destino}")
-                    except Exception as e:
-                        st.error(f"Error al copiar {archivo.name} del repositorio: {str(e)}")
-        
-        return True
+        with obtener_metricas().corrida('sincronizacion').etapa('sincronizar_carpetas') as medicion:
+            resumen = obtener_sincronizador().sincronizar([
+                (BASE_DIR / dir_name, TEMP_DIR / dir_name)
+                for dir_name in ["Detalle", "Resultados", "Detalle historico"]
+            ])
+            medicion['filas'] = len(resumen['nuevos']) + len(resumen['modificados'])
+        
+        copiados = len(resumen['nuevos']) + len(resumen['modificados'])
+        if copiados or resumen['eliminados']:
+            metodos = ", ".join(f"{cantidad} por {metodo}" for metodo, cantidad in resumen['metodos'].items())
+            st.write(
+                f"Sincronización: {len(resumen['nuevos'])} nuevos, {len(resumen['modificados'])} modificados, "
+                f"{len(resumen['eliminados'])} eliminados, {resumen['sin_cambios']} sin cambios"
+                + (f" ({metodos})" if metodos else "")
+            )
+        else:
+            st.caption(f"Sincronización sin cambios ({resumen['sin_cambios']} archivos, {resumen['segundos'] * 1000:.0f} ms)")
+        return resumen
     except Exception as e:
         st.error(f"Error al sincronizar con Git: {str(e)}")
-        return False
+        return None
 
 def inicializar_archivos_ejemplo():
     """Inicializa los archivos de ejemplo en el directorio temporal."""
@@ -211,238 +190,120 @@ def inicializar_archivos_ejemplo():
     except Exception as e:
         st.error(f"Error al inicializar archivos de ejemplo: {str(e)}")
 
-# Inicializar archivos al inicio
-inicializar_archivos_ejemplo()
-
-# Función para guardar datos persistentes
-def guardar_datos_persistentes(nombre, datos):
-    """Guarda datos localmente."""
-    archivo = DATA_DIR / f"{nombre}.pkl"
-    pd.to_pickle(datos, archivo)
-
-# Función para cargar datos persistentes
-def cargar_datos_persistentes(nombre):
-    """Carga datos localmente."""
-    archivo = DATA_DIR / f"{nombre}.pkl"
-    if archivo.exists():
-        return pd.read_pickle(archivo)
-    return None
-
-def guardar_en_git(archivo, mensaje):
-    """Guarda un archivo en Git."""
-    try:
-        # Determinar el directorio de destino en Git
-        if "Detalle" in str(archivo):
-            git_dir = BASE_DIR / "Detalle"
-        elif "Resultados" in str(archivo):
-            git_dir = BASE_DIR / "Resultados"
-        elif "Detalle historico" in str(archivo):
-            git_dir = BASE_DIR / "Detalle historico"
-        else:
-            git_dir = BASE_DIR
+# Inicializar archivos al inicio de la sesión; los reruns no vuelven a
+# recorrer Resultados/ ni a sincronizar con Git
+if not st.session_state.get('archivos_inicializados'):
+    inicializar_archivos_ejemplo()
+    st.session_state.archivos_inicializados = True
 
-        # Crear directorio si no existe
-        git_dir.mkdir(parents=True, exist_ok=True)
+def guardar_en_git(archivos, mensaje):
+    """
+    Encola archivos para guardarlos en Git en un solo commit.
 
-        # Copiar archivo a Git
-        shutil.copy2(archivo, git_dir / archivo.name)
+    El commit y el push los hace la cola en segundo plano; esta función no
+    espera a Git.
 
-        # Agregar el archivo a Git
-        subprocess.run(['git', 'add', str(git_dir / archivo.name)], check=True)
-        # Hacer commit
-        subprocess.run(['git', 'commit', '-m', mensaje], check=True)
-        # Hacer push
-        subprocess.run(['git', 'push', 'origin', 'main'], check=True)
+    Args:
+        archivos (Path | list): Archivo o lista de archivos del lote
+        mensaje (str): Mensaje para el commit
+
+    Returns:
+        bool: True si el lote quedó en cola
+    """
+    try:
+        if isinstance(archivos, (str, Path)):
+            archivos = [archivos]
+        obtener_cola_git().encolar(archivos, mensaje)
         return True
     except Exception as e:
         st.error(f"Error al guardar en Git: {str(e)}")
         return False
 
-def procesar_archivos():
+def obtener_estado_archivos():
     """
-    Procesa los archivos de Wicho y detalle para generar el análisis de comisiones.
+    Libros de resultados con su fecha, estado de pago y totales, desde el
+    índice del libro mayor (sin leer los libros).
+
+    Returns:
+        list: Diccionarios con nombre, fecha, estado ('PAGADO' o 'POR PAGAR'),
+            estado_actualizado, total_lineas y total_comision, del más
+            reciente al más antiguo
     """
-    # Cargar archivo Wicho persistente
-    archivo_wicho = DATA_DIR / "wicho.pkl"
-    if not archivo_wicho.exists():
-        st.error("❌ No se encontró el archivo de Wicho. Por favor, súbelo primero.")
-        return False
+    # Pone el índice al día si cambió algún libro de Resultados/
+    resumen_resultados()
 
-    try:
-        dataframes_wicho = pd.read_pickle(archivo_wicho)
-        st.success("✅ Archivo de Wicho cargado correctamente")
-    except Exception as e:
-        st.error(f"❌ Error al leer el archivo de Wicho: {str(e)}")
-        return False
+    def calcular():
+        with obtener_metricas().corrida('dashboard').etapa('indice_resultados') as medicion:
+            indice = obtener_libro_mayor().indice_resultados()
+            medicion['filas'] = len(indice)
+        return indice
 
-    # Procesar archivos de detalle
-    archivos_detalle = [f for f in os.listdir(DETALLE_DIR) if f.endswith('.xlsx') and not f.startswith('~$')]
-    if not archivos_detalle:
-        st.warning("⚠️ No hay archivos de detalle para procesar")
-        return False
+    indice = obtener_memo().obtener('indice_resultados', huella_archivos(RESULTADOS_DIR), calcular)
+    indice = indice[indice['fecha'].notna()]
+    return [
+        {
+            'nombre': fila.archivo,
+            'fecha': datetime.fromisoformat(fila.fecha),
+            'estado': fila.estado.replace('_', ' '),
+            'estado_actualizado': fila.estado_actualizado,
+            'total_lineas': int(fila.total_lineas or 0),
+            'total_comision': float(fila.total_comision or 0)
+        }
+        for fila in indice.itertuples()
+    ]
 
-    resultados_finales = []
-    for archivo_detalle in archivos_detalle:
-        try:
-            df_detalle = pd.read_excel(DETALLE_DIR / archivo_detalle, header=2)
-            df_detalle.columns = df_detalle.columns.str.strip()
-            
-            # Procesar cada hoja del archivo wicho
-            for nombre_hoja, df_wicho in dataframes_wicho.items():
-                if 'CEL' in df_wicho.columns:
-                    df_join = pd.merge(
-                        df_wicho,
-                        df_detalle,
-                        left_on='CEL',
-                        right_on='Número celular asignado',
-                        how='inner'
-                    )
-                    if not df_join.empty:
-                        resultados_finales.append(df_join)
-            
-            # Mover archivo a histórico
-            shutil.move(str(DETALLE_DIR / archivo_detalle), str(HISTORICO_DIR / archivo_detalle))
-            
-        except Exception as e:
-            st.error(f"❌ Error procesando {archivo_detalle}: {str(e)}")
-            continue
-
-    if resultados_finales:
-        resultado_final = pd.concat(resultados_finales, ignore_index=True)
-        fecha_actual = datetime.now().strftime("%Y%m%d")
-        nombre_archivo = RESULTADOS_DIR / f"{fecha_actual}_analisis_chipExpress_(POR_PAGAR).xlsx"
-        resultado_final.to_excel(nombre_archivo, index=False)
-        
-        # Guardar en Git
-        if guardar_en_git(nombre_archivo, f"Agregar análisis de {fecha_actual}"):
-            st.success(f"✅ Análisis completado y guardado en Git: {nombre_archivo}")
-            return True
-        else:
-            st.error("❌ Error al guardar el análisis en Git")
-            return False
-    
-    st.warning("⚠️ No se encontraron coincidencias")
-    return False
+def resumen_resultados():
+    """
+    Resumen por archivo de resultados desde el libro mayor. Se calcula una
+    sola vez por cada cambio en Resultados/ y se comparte entre sesiones.
 
-def obtener_estado_archivos():
-    archivos = []
-    for archivo in os.listdir(RESULTADOS_DIR):
-        if archivo.endswith('.xlsx'):
-            # Extraer fecha del nombre del archivo
-            fecha_match = re.match(r'(\d{8})_', archivo)
-            if fecha_match:
-                fecha_str = fecha_match.group(1)
-                fecha = datetime.strptime(fecha_str, '%Y%m%d')
-                # Ser más flexible con el formato de PAGADO
-                estado = "PAGADO" if "PAGADO" in archivo.upper() else "POR PAGAR"
-                archivos.append({
-                    'nombre': archivo,
-                    'fecha': fecha,
-                    'estado': estado
-                })
-    return sorted(archivos, key=lambda x: x['fecha'], reverse=True)
+    Returns:
+        tuple: (DataFrame de LibroMayor.resumen_por_archivo, lista de avisos)
+    """
+    def calcular():
+        libro_mayor = obtener_libro_mayor()
+        corrida = obtener_metricas().corrida('dashboard')
+        with corrida.etapa('sincronizar_libro_mayor'):
+            avisos = libro_mayor.sincronizar(RESULTADOS_DIR, obtener_cache_libros())
+        with corrida.etapa('resumen_resultados') as medicion:
+            resumen = libro_mayor.resumen_por_archivo()
+            medicion['filas'] = len(resumen)
+        return resumen, avisos
+
+    resumen, avisos = obtener_memo().obtener('resumen_resultados', huella_archivos(RESULTADOS_DIR), calcular)
+    return resumen.copy(), avisos
 
 def analizar_archivos_pagados():
-    resultados = []
-    evaluaciones_detalle = []
-    
-    # Obtener ruta absoluta
-    ruta_absoluta = os.path.abspath(RESULTADOS_DIR)
-    st.write("Ruta absoluta:", ruta_absoluta)
-    
-    st.write("Buscando archivos en:", str(RESULTADOS_DIR))
+    """
+    Obtiene los conteos y comisiones de los archivos PAGADO desde el libro
+    mayor, leyendo solo los archivos nuevos o modificados.
+
+    Returns:
+        tuple: (df_resultados, df_funnel)
+    """
+    import pandas as pd
+
+    from express_analysis.agregados import construir_marcos
+
     archivos_encontrados = os.listdir(RESULTADOS_DIR)
-    st.write("Archivos encontrados:", archivos_encontrados)
     
     # Verificar si hay archivos
     if not archivos_encontrados:
         st.warning("No se encontraron archivos en el directorio de resultados")
         st.write("Intentando sincronizar con Git...")
         sincronizar_con_git()
-        # Verificar nuevamente después de sincronizar
-        archivos_encontrados = os.listdir(RESULTADOS_DIR)
-        st.write("Archivos encontrados después de sincronizar:", archivos_encontrados)
-    
-    # Procesar cada archivo
-    for archivo in archivos_encontrados:
-        # Ser más flexible con el formato de PAGADO
-        if archivo.endswith('.xlsx') and "PAGADO" in archivo.upper() and not archivo.startswith('~$'):
-            st.write(f"\nProcesando archivo: {archivo}")
-            try:
-                # Leer el archivo usando ruta absoluta
-                ruta_completa = os.path.join(ruta_absoluta, archivo)
-                st.write(f"Intentando leer archivo en: {ruta_completa}")
-                
-                df = pd.read_excel(ruta_completa)
-                st.write(f"Columnas encontradas en {archivo}:", df.columns.tolist())
-                
-                # Verificar si las columnas necesarias existen
-                if 'Fecha Primera Recarga' not in df.columns:
-                    st.warning(f"Columna 'Fecha Primera Recarga' no encontrada en {archivo}")
-                    continue
-                    
-                if 'Evaluación' not in df.columns:
-                    st.warning(f"Columna 'Evaluación' no encontrada en {archivo}")
-                    continue
-                
-                # Convertir la columna de fecha a datetime
-                df['Fecha Primera Recarga'] = pd.to_datetime(df['Fecha Primera Recarga'])
-                
-                # Contar evaluaciones
-                evaluaciones = df['Evaluación'].value_counts()
-                st.write(f"Evaluaciones encontradas en {archivo}:", evaluaciones.to_dict())
-                
-                # Contar evaluaciones con los valores correctos
-                primera_eval = evaluaciones.get('1ra evaluación', 0)
-                segunda_eval = evaluaciones.get('2da evaluación', 0)
-                tercera_eval = evaluaciones.get('3ra evaluación', 0)
-                cuarta_eval = evaluaciones.get('4ta evaluación', 0)
-                otras_eval = segunda_eval + tercera_eval + cuarta_eval
-                
-                # Calcular comisiones (cada línea vale $25)
-                comision_primera = primera_eval * 25
-                comision_otras = otras_eval * 25
-                
-                # Usar la fecha más reciente del archivo
-                fecha_archivo = df['Fecha Primera Recarga'].max()
-                
-                resultados.append({
-                    'fecha': fecha_archivo,
-                    'archivo': archivo,
-                    'primera_eval': primera_eval,
-                    'segunda_eval': segunda_eval,
-                    'tercera_eval': tercera_eval,
-                    'cuarta_eval': cuarta_eval,
-                    'otras_eval': otras_eval,
-                    'comision_primera': comision_primera,
-                    'comision_otras': comision_otras
-                })
-                
-                # Guardar detalle de evaluaciones para el funnel
-                evaluaciones_detalle.append({
-                    'fecha': fecha_archivo,
-                    'primera': primera_eval,
-                    'segunda': segunda_eval,
-                    'tercera': tercera_eval,
-                    'cuarta': cuarta_eval
-                })
-                
-            except Exception as e:
-                st.error(f"Error al procesar {archivo}: {str(e)}")
-                continue
     
-    if not resultados:
+    resumen, avisos = resumen_resultados()
+    for aviso in avisos:
+        st.warning(aviso)
+    
+    resumen = resumen[resumen['estado'] == ESTADO_PAGADO].reset_index(drop=True)
+    if resumen.empty:
         st.warning("No se encontraron resultados en los archivos")
         return pd.DataFrame(), pd.DataFrame()
     
-    # Ordenar resultados por fecha
-    df_resultados = pd.DataFrame(resultados)
-    df_resultados = df_resultados.sort_values('fecha', ascending=False)
-    
-    df_funnel = pd.DataFrame(evaluaciones_detalle)
-    df_funnel = df_funnel.sort_values('fecha', ascending=False)
-    
-    return df_resultados, df_funnel
+    with obtener_metricas().corrida('dashboard').etapa('analisis_pagados', filas=len(resumen)):
+        return construir_marcos(resumen)
 
 def calcular_tasa_conversion_wicho():
     """
@@ -452,25 +313,19 @@ def calcular_tasa_conversion_wicho():
         dict: Diccionario con información de conversión
     """
     try:
-        # Leer el archivo Wicho
-        archivo_wicho = TEMP_DIR / "CHIPS RUTA JL CABRERA WICHO.xlsx"
-        if not archivo_wicho.exists():
+        # Total de líneas de las hojas con 'CEL', calculado al subir el archivo
+        metadatos_wicho = cargar_metadatos_wicho(METADATOS_WICHO)
+        if metadatos_wicho is None:
             return None
-            
-        dataframes_wicho = pd.read_excel(archivo_wicho, sheet_name=None)
-        
-        # Contar total de líneas en el archivo Wicho
-        total_lineas_wicho = 0
-        for nombre_hoja, df_wicho in dataframes_wicho.items():
-            if 'CEL' in df_wicho.columns:
-                total_lineas_wicho += len(df_wicho)
+        total_lineas_wicho = metadatos_wicho['total_lineas_cel']
         
         # Obtener total de líneas en primera evaluación de archivos pagados
-        df_analisis, _ = analizar_archivos_pagados()
-        if df_analisis.empty:
+        resumen, _ = resumen_resultados()
+        pagados = resumen[resumen['estado'] == ESTADO_PAGADO]
+        if pagados.empty:
             return None
             
-        total_primera_eval = df_analisis['primera_eval'].sum()
+        total_primera_eval = pagados['primera_eval'].sum()
         
         # Calcular tasa de conversión
         tasa_conversion = (total_primera_eval / total_lineas_wicho * 100) if total_lineas_wicho > 0 else 0
@@ -485,6 +340,10 @@ def calcular_tasa_conversion_wicho():
         return None
 
 def mostrar_analisis_pagados():
+    # plotly solo se usa en este análisis; importarlo aquí evita su costo en cada arranque
+    import pandas as pd
+    import plotly.express as px
+
     st.header("Análisis de Comisiones Pagadas")
     
     # Forzar sincronización antes de analizar
@@ -990,95 +849,120 @@ def mostrar_analisis_pagados():
         use_container_width=True
     )
 
-def cambiar_estado_pago(nombre_archivo):
-    archivo_actual = RESULTADOS_DIR / nombre_archivo
-    if "POR_PAGAR" in nombre_archivo:
-        nuevo_nombre = nombre_archivo.replace("POR_PAGAR", "PAGADO")
-    else:
-        nuevo_nombre = nombre_archivo.replace("PAGADO", "POR_PAGAR")
-    
-    archivo_nuevo = RESULTADOS_DIR / nuevo_nombre
-    os.rename(archivo_actual, archivo_nuevo)
-    return nuevo_nombre
+def cambiar_estado_pago(nombre_archivo, estado_actual):
+    """
+    Alterna el estado de pago de un libro de resultados en el índice del
+    libro mayor. El archivo no se renombra, así que las cachés por ruta
+    siguen siendo válidas.
+
+    Args:
+        nombre_archivo (str): Nombre del libro en Resultados/
+        estado_actual (str): 'PAGADO' o 'POR PAGAR'
+
+    Returns:
+        str: Estado nuevo
+    """
+    nuevo_estado = ESTADO_POR_PAGAR if estado_actual == "PAGADO" else ESTADO_PAGADO
+    obtener_libro_mayor().cambiar_estado(nombre_archivo, nuevo_estado)
+    obtener_memo().invalidar()
+    guardar_en_git(ESTADOS_PAGO, f"Cambiar estado de {nombre_archivo} a {nuevo_estado}")
+    return nuevo_estado.replace('_', ' ')
 
-def analizar_archivo_resultado(nombre_archivo):
+def paginar(df, clave, columnas_orden, columnas_filtro, por_pagina=10):
     """
-    Analiza un archivo de resultado para obtener el desglose de comisiones.
-    
+    Muestra controles de filtro, orden y página para una lista y devuelve
+    solo las filas de la página visible, para no dibujar toda la lista.
+
     Args:
-        nombre_archivo (str): Nombre del archivo a analizar
-        
+        df (DataFrame): Filas de la lista
+        clave (str): Prefijo de las claves de los widgets
+        columnas_orden (dict): Etiqueta del orden → columna de df
+        columnas_filtro (list): Columnas en las que se busca el filtro
+        por_pagina (int): Filas por página
+
     Returns:
-        dict: Diccionario con el desglose de comisiones
+        DataFrame: Filas de la página visible
     """
-    try:
-        ruta_archivo = RESULTADOS_DIR / nombre_archivo
-        if not ruta_archivo.exists():
-            return None
-            
-        # Leer el archivo
-        df = pd.read_excel(ruta_archivo)
-        
-        # Verificar si las columnas necesarias existen
-        if 'Evaluación' not in df.columns:
-            return None
-            
-        if 'Comisión' not in df.columns:
-            return None
-            
-        # Contar evaluaciones con múltiples variaciones de nombres
-        evaluaciones = df['Evaluación'].value_counts()
-        
-        # Buscar evaluaciones con diferentes variaciones de nombres
-        primera_eval = 0
-        segunda_eval = 0
-        tercera_eval = 0
-        cuarta_eval = 0
-        
-        # Filtrar datos por tipo de evaluación y calcular comisiones reales
-        primera_mask = df['Evaluación'].str.lower().str.contains('1ra|primera|1a|1°|1º', na=False)
-        segunda_mask = df['Evaluación'].str.lower().str.contains('2da|segunda|2a|2°|2º', na=False)
-        tercera_mask = df['Evaluación'].str.lower().str.contains('3ra|tercera|3a|3°|3º', na=False)
-        cuarta_mask = df['Evaluación'].str.lower().str.contains('4ta|cuarta|4a|4°|4º', na=False)
-        
-        # Contar líneas por evaluación
-        primera_eval = primera_mask.sum()
-        segunda_eval = segunda_mask.sum()
-        tercera_eval = tercera_mask.sum()
-        cuarta_eval = cuarta_mask.sum()
-        
-        # Calcular comisiones reales basadas en la columna 'Comisión'
-        comision_primera = df[primera_mask]['Comisión'].sum() if primera_eval > 0 else 0
-        comision_segunda = df[segunda_mask]['Comisión'].sum() if segunda_eval > 0 else 0
-        comision_tercera = df[tercera_mask]['Comisión'].sum() if tercera_eval > 0 else 0
-        comision_cuarta = df[cuarta_mask]['Comisión'].sum() if cuarta_eval > 0 else 0
-        
-        # Calcular totales
-        otras_eval = segunda_eval + tercera_eval + cuarta_eval
-        comision_otras = comision_segunda + comision_tercera + comision_cuarta
-        comision_dat = comision_segunda + comision_tercera + comision_cuarta
-        total_comision = comision_primera + comision_otras
-        
-        return {
-            'primera_eval': primera_eval,
-            'otras_eval': otras_eval,
-            'segunda_eval': segunda_eval,
-            'tercera_eval': tercera_eval,
-            'cuarta_eval': cuarta_eval,
-            'comision_primera': comision_primera,
-            'comision_otras': comision_otras,
-            'comision_dat': comision_dat,
-            'comision_segunda': comision_segunda,
-            'comision_tercera': comision_tercera,
-            'comision_cuarta': comision_cuarta,
-            'total_comision': total_comision,
-            'total_lineas': len(df)
-        }
-        
-    except Exception as e:
-        return None
+    import pandas as pd
+
+    col_filtro, col_orden, col_sentido = st.columns([3, 2, 1])
+    with col_filtro:
+        texto = st.text_input("🔍 Filtrar", key=f"{clave}_filtro")
+    with col_orden:
+        etiqueta = st.selectbox("Ordenar por", list(columnas_orden), key=f"{clave}_orden")
+    with col_sentido:
+        descendente = st.toggle("Descendente", value=True, key=f"{clave}_descendente")
+
+    if texto:
+        coincide = pd.Series(False, index=df.index)
+        for columna in columnas_filtro:
+            coincide |= df[columna].astype(str).str.contains(texto, case=False, regex=False)
+        df = df[coincide]
+    df = df.sort_values(columnas_orden[etiqueta], ascending=not descendente, kind='stable')
+
+    paginas = max(1, -(-len(df) // por_pagina))
+    clave_pagina = f"{clave}_pagina"
+    if st.session_state.get(clave_pagina, 1) > paginas:
+        st.session_state[clave_pagina] = paginas
+    pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=clave_pagina)
+
+    inicio = (pagina - 1) * por_pagina
+    if len(df):
+        st.caption(f"Mostrando {inicio + 1}–{min(inicio + por_pagina, len(df))} de {len(df)}")
+    else:
+        st.caption("Ningún archivo coincide con el filtro")
+    return df.iloc[inicio:inicio + por_pagina]
+
+def mostrar_desglose_archivo(row):
+    """
+    Muestra las líneas y comisiones por evaluación de un libro de resultados.
+
+    Args:
+        row (Series): Fila de df_comisiones del dashboard
+    """
+    import pandas as pd
+
+    col1, col2, col3, col4, col5, col6, col7 = st.columns([2, 1, 1, 1, 1, 1, 1])
+    
+    with col1:
+        st.write(f"**Fecha:** {pd.to_datetime(row['fecha']).strftime('%Y-%m-%d')}")
+        st.write(f"**Estado:** {row['estado']}")
+        if row['estado_actualizado']:
+            st.caption(f"Cambiado el {row['estado_actualizado'].replace('T', ' ')}")
+    
+    with col2:
+        st.write(f"**1ra Evaluación:**")
+        st.write(f"{row['primera_eval']:,} líneas")
+        st.write(f"${row['comision_primera']:,.2f}")
+    
+    with col3:
+        st.write(f"**2da Evaluación:**")
+        st.write(f"{row['segunda_eval']:,} líneas")
+        st.write(f"${row['comision_segunda']:,.2f}")
+    
+    with col4:
+        st.write(f"**3ra Evaluación:**")
+        st.write(f"{row['tercera_eval']:,} líneas")
+        st.write(f"${row['comision_tercera']:,.2f}")
+    
+    with col5:
+        st.write(f"**4ta Evaluación:**")
+        st.write(f"{row['cuarta_eval']:,} líneas")
+        st.write(f"${row['comision_cuarta']:,.2f}")
+    
+    with col6:
+        st.write(f"**Comisión DAT:**")
+        st.write(f"**${row['comision_dat']:,.2f}**")
+        st.write(f"({row['segunda_eval'] + row['tercera_eval'] + row['cuarta_eval']:,} líneas)")
+    
+    with col7:
+        st.write(f"**Total:**")
+        st.write(f"{row['total_lineas']:,} líneas")
+        st.write(f"${row['total_comision']:,.2f}")
 
 def mostrar_dashboard():
+    import pandas as pd
+
     st.header("Dashboard de Comisiones")
     
     # Obtener lista de archivos y sus estados
@@ -1096,16 +980,22 @@ def mostrar_dashboard():
         st.error("Error: No se pudo crear el DataFrame correctamente")
         return
     
-    # Analizar cada archivo para obtener comisiones
+    # Conteos y comisiones de cada archivo desde el libro mayor
+    resumen, avisos = resumen_resultados()
+    for aviso in avisos:
+        st.warning(aviso)
+    resumen = resumen.drop(columns=['estado', 'fecha', 'estado_actualizado', 'fecha_max', 'total_lineas']).set_index('archivo')
+    
     analisis_comisiones = []
     for _, row in df_dashboard.iterrows():
-        analisis = analizar_archivo_resultado(row['nombre'])
-        if analisis:
+        if row['nombre'] in resumen.index:
             analisis_comisiones.append({
                 'nombre': row['nombre'],
                 'fecha': row['fecha'],
                 'estado': row['estado'],
-                **analisis
+                'estado_actualizado': row['estado_actualizado'],
+                'total_lineas': row['total_lineas'],
+                **resumen.loc[row['nombre']].to_dict()
             })
     
     # Crear DataFrame con análisis de comisiones
@@ -1127,7 +1017,7 @@ def mostrar_dashboard():
             st.metric("Archivos Pendientes", comisiones_pendientes)
         
         with col4:
-            total_pagar = df_comisiones['total_comision'].sum()
+            total_pagar = df_dashboard['total_comision'].sum()
             st.metric("Total a Pagar", f"${total_pagar:,.2f}")
         
         # Métricas de comisiones
@@ -1168,60 +1058,35 @@ def mostrar_dashboard():
         # Tabla detallada de comisiones con botones
         st.subheader("📋 Detalle de Comisiones por Archivo")
         
-        # Mostrar cada archivo con su información y botón de acción
-        for _, row in df_comisiones.iterrows():
+        # Solo se dibuja la página visible; el desglose de cada archivo se
+        # dibuja al activar su interruptor
+        pagina = paginar(
+            df_comisiones,
+            "dashboard",
+            {"Fecha": 'fecha', "Total": 'total_comision', "Nombre": 'nombre', "Estado": 'estado'},
+            ['nombre', 'estado']
+        )
+        for _, row in pagina.iterrows():
             with st.container():
-                # Crear un expander para cada archivo
-                with st.expander(f"📄 {row['nombre']} - Estado: {row['estado']} - Total: ${row['total_comision']:,.2f}"):
-                    # Información del archivo
-                    col1, col2, col3, col4, col5, col6, col7 = st.columns([2, 1, 1, 1, 1, 1, 1])
-                    
-                    with col1:
-                        st.write(f"**Fecha:** {pd.to_datetime(row['fecha']).strftime('%Y-%m-%d')}")
-                        st.write(f"**Estado:** {row['estado']}")
-                    
-                    with col2:
-                        st.write(f"**1ra Evaluación:**")
-                        st.write(f"{row['primera_eval']:,} líneas")
-                        st.write(f"${row['comision_primera']:,.2f}")
-                    
-                    with col3:
-                        st.write(f"**2da Evaluación:**")
-                        st.write(f"{row['segunda_eval']:,} líneas")
-                        st.write(f"${row['comision_segunda']:,.2f}")
-                    
-                    with col4:
-                        st.write(f"**3ra Evaluación:**")
-                        st.write(f"{row['tercera_eval']:,} líneas")
-                        st.write(f"${row['comision_tercera']:,.2f}")
-                    
-                    with col5:
-                        st.write(f"**4ta Evaluación:**")
-                        st.write(f"{row['cuarta_eval']:,} líneas")
-                        st.write(f"${row['comision_cuarta']:,.2f}")
-                    
-                    with col6:
-                        st.write(f"**Comisión DAT:**")
-                        st.write(f"**${row['comision_dat']:,.2f}**")
-                        st.write(f"({row['segunda_eval'] + row['tercera_eval'] + row['cuarta_eval']:,} líneas)")
-                    
-                    with col7:
-                        st.write(f"**Total:**")
-                        st.write(f"{row['total_lineas']:,} líneas")
-                        st.write(f"${row['total_comision']:,.2f}")
-                    
-                    # Botón de acción
-                    st.markdown("---")
-                    col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
-                    with col_btn2:
-                        if st.button(
-                            "Cambiar a PAGADO" if row['estado'] == 'POR PAGAR' else "Cambiar a POR PAGAR",
-                            key=f"btn_dashboard_{row['nombre']}",
-                            type="primary"
-                        ):
-                            nuevo_nombre = cambiar_estado_pago(row['nombre'])
-                            st.success(f"Estado actualizado para {nuevo_nombre}")
-                            st.rerun()
+                col_info, col_detalle, col_boton = st.columns([4, 1, 2])
+                with col_info:
+                    st.write(
+                        f"📄 **{row['nombre']}** · {pd.to_datetime(row['fecha']).strftime('%Y-%m-%d')} · "
+                        f"Estado: {row['estado']} · Total: ${row['total_comision']:,.2f}"
+                    )
+                with col_detalle:
+                    ver_desglose = st.toggle("Desglose", key=f"desglose_{row['nombre']}")
+                with col_boton:
+                    if st.button(
+                        "Cambiar a PAGADO" if row['estado'] == 'POR PAGAR' else "Cambiar a POR PAGAR",
+                        key=f"btn_dashboard_{row['nombre']}",
+                        type="primary"
+                    ):
+                        nuevo_estado = cambiar_estado_pago(row['nombre'], row['estado'])
+                        st.success(f"Estado actualizado para {row['nombre']}: {nuevo_estado}")
+                        st.rerun()
+                if ver_desglose:
+                    mostrar_desglose_archivo(row)
                 
                 st.markdown("---")
         
@@ -1274,7 +1139,13 @@ def mostrar_dashboard():
         df_dashboard['fecha'] = pd.to_datetime(df_dashboard['fecha']).dt.strftime('%Y-%m-%d')
         
         # Mostrar tabla con botones de acción
-        for _, row in df_dashboard.iterrows():
+        pagina = paginar(
+            df_dashboard,
+            "dashboard_basico",
+            {"Fecha": 'fecha', "Nombre": 'nombre', "Estado": 'estado'},
+            ['nombre', 'estado']
+        )
+        for _, row in pagina.iterrows():
             with st.container():
                 col1, col2, col3, col4 = st.columns([2, 2, 3, 2])
                 with col1:
@@ -1289,131 +1160,200 @@ def mostrar_dashboard():
                         key=f"btn_basic_{row['nombre']}",
                         type="primary"
                     ):
-                        nuevo_nombre = cambiar_estado_pago(row['nombre'])
-                        st.success(f"Estado actualizado para {nuevo_nombre}")
+                        nuevo_estado = cambiar_estado_pago(row['nombre'], row['estado'])
+                        st.success(f"Estado actualizado para {row['nombre']}: {nuevo_estado}")
                         st.rerun()
                 st.markdown("---")
 
-def procesar_archivos():
+def procesar_archivos(trabajo, libro_mayor, cache, cola_git, memo, trabajadores=1, filas_por_bloque=None, archivos_git=None,
+                      corrida=None):
     """
     Procesa los archivos de Wicho y detalle para generar el análisis de comisiones.
-    """
-    # Ruta del archivo de wicho
-    archivo_wicho = BASE_DIR / "CHIPS RUTA JL CABRERA WICHO.xlsx"
+
+    Se ejecuta como trabajo en segundo plano (ver obtener_ejecutor_trabajos),
+    así que no usa Streamlit: el avance por archivo queda en el trabajo y los
+    errores se lanzan como excepciones.
     
-    if not archivo_wicho.exists():
-        st.error("❌ No se encontró el archivo CHIPS RUTA JL CABRERA WICHO.xlsx")
-        return False
+    Args:
+        trabajo (Trabajo): Trabajo en ejecución, para informar el avance y
+            consultar si se pidió cancelar
+        libro_mayor (LibroMayor): Libro mayor donde se registra el resultado
+        cache (CacheLibros): Caché de libros usada por el libro mayor
+        cola_git (ColaGit): Cola donde se guarda el lote en Git
+        memo (Memoizador): Cálculos del dashboard, se invalidan al terminar
+        trabajadores (int): Procesos para leer y cruzar los archivos de
+            detalle en paralelo; 1 los procesa en serie
+        filas_por_bloque (int): Si se indica, cada archivo de detalle se lee
+            por bloques de ese tamaño para acotar la memoria
+        archivos_git (list): Archivos subidos del lote; se guardan en Git en
+            un solo commit junto con el resultado y los archivos movidos
+        corrida (Corrida): Opcional, donde se registra el tiempo, las filas y
+            la memoria de cada etapa (ver obtener_metricas)
 
-    # Leer todas las hojas del archivo wicho
+    Returns:
+        dict: Resumen del análisis para mostrar en la página
+    """
+    from express_analysis.analisis import analizar_carpetas
+
+    archivos_git = list(archivos_git or [])
     try:
-        st.info("📊 Leyendo archivo de Wicho...")
-        dataframes_wicho = pd.read_excel(archivo_wicho, sheet_name=None)
-        st.success("✅ Archivo de Wicho leído correctamente")
-    except Exception as e:
-        st.error(f"❌ Error al leer el archivo de Wicho: {str(e)}")
-        return False
+        resultado = analizar_carpetas(
+            RUTAS,
+            cache,
+            libro_mayor,
+            trabajadores=trabajadores,
+            filas_por_bloque=filas_por_bloque,
+            al_iniciar=trabajo.fijar_total,
+            al_terminar=lambda r: trabajo.avanzar(r.archivo, r.estado, r.lineas, r.mensaje, r.periodo),
+            cancelado=trabajo.cancelado,
+            modificados=archivos_git,
+            corrida=corrida
+        )
+        memo.invalidar()
+        return resultado
+    finally:
+        # Los archivos subidos se guardan en Git aunque el análisis falle
+        if archivos_git:
+            fecha_lote = datetime.now().strftime("%Y-%m-%d %H:%M")
+            cola_git.encolar(archivos_git, f"Agregar archivos de detalle y análisis del {fecha_lote}")
 
-    # Lista para almacenar los resultados finales
-    resultados_finales = []
-    archivos_procesados = []
-    total_lineas_procesadas = 0
+def mostrar_trabajo(estado):
+    """
+    Muestra el estado, el avance y el resultado de un trabajo de análisis.
 
-    # Iterar sobre cada archivo de detalle
-    archivos_detalle = [f for f in os.listdir(DETALLE_DIR) if f.endswith('.xlsx') and not f.startswith('~$')]
-    
-    if not archivos_detalle:
-        st.warning("⚠️ No hay archivos de detalle para procesar")
-        return False
+    Args:
+        estado (dict): Estado del trabajo devuelto por EjecutorTrabajos
+    """
+    from express_analysis.procesamiento import OK, SIN_COLUMNA, ERROR
 
-    st.info(f"📁 Procesando {len(archivos_detalle)} archivos de detalle...")
-    
-    for archivo_detalle in archivos_detalle:
-        ruta_archivo_detalle = DETALLE_DIR / archivo_detalle
-        st.write(f"📄 Procesando: {archivo_detalle}")
-        
-        try:
-            # Leer el archivo de detalle sin especificar la fila de encabezado
-            df_detalle_sin_encabezado = pd.read_excel(ruta_archivo_detalle, header=None)
-            periodo = df_detalle_sin_encabezado.iloc[0, 2]
-            st.write(f"📅 Período: {periodo}")
-
-            # Leer el archivo de detalle con el encabezado en la fila 3
-            df_detalle = pd.read_excel(ruta_archivo_detalle, header=2)
-            df_detalle.columns = df_detalle.columns.str.strip()
-
-            # Verificar el nombre de la columna en el archivo de detalle
-            columnas_posibles = ['Número celular asignado', 'Número de Teléfono', 'Número celular', 'Celular']
-            columna_numero = next((col for col in columnas_posibles if col in df_detalle.columns), None)
-
-            if not columna_numero:
-                st.warning(f"⚠️ No se encontró la columna de número de teléfono en el archivo {archivo_detalle}")
-                continue
-
-            # Procesar cada hoja del archivo wicho
-            resultados_archivo = []
-            for nombre_hoja, df_wicho in dataframes_wicho.items():
-                if 'CEL' in df_wicho.columns:
-                    # Realizar el join
-                    df_join = pd.merge(
-                        df_wicho,
-                        df_detalle,
-                        left_on='CEL',
-                        right_on=columna_numero,
-                        how='inner'
-                    )
-                    
-                    if not df_join.empty:
-                        resultados_archivo.append(df_join)
-                        st.write(f"✅ Hoja '{nombre_hoja}': {len(df_join)} líneas encontradas")
-
-            # Concatenar resultados del archivo actual
-            if resultados_archivo:
-                resultado_archivo = pd.concat(resultados_archivo, ignore_index=True)
-                resultado_archivo = resultado_archivo.drop_duplicates(subset='CEL')
-                resultado_archivo['Archivo_Detalle'] = archivo_detalle
-                resultado_archivo['Periodo'] = periodo
-                resultados_finales.append(resultado_archivo)
-                archivos_procesados.append(archivo_detalle)
-                total_lineas_procesadas += len(resultado_archivo)
-                st.success(f"✅ Archivo {archivo_detalle} procesado correctamente")
+    etiquetas = {
+        EN_COLA: "⏳ En cola",
+        EJECUTANDO: "🔄 Ejecutando",
+        TERMINADO: "✅ Terminado",
+        FALLIDO: "❌ Fallido",
+        CANCELADO: "🛑 Cancelado"
+    }
+    st.markdown(f"**{estado['descripcion']}** · {etiquetas.get(estado['estado'], estado['estado'])} · `{estado['id']}`")
 
-        except Exception as e:
-            st.error(f"❌ Error procesando el archivo {archivo_detalle}: {str(e)}")
-            continue
+    if estado['total']:
+        st.progress(
+            min(estado['completados'] / estado['total'], 1.0),
+            text=f"{estado['completados']} de {estado['total']} archivos"
+        )
+    if estado['estado'] == EJECUTANDO and estado['eta_segundos'] is not None:
+        st.caption(f"Tiempo restante estimado: {estado['eta_segundos']:.0f} s")
 
-    # Guardar resultados si se encontraron coincidencias
-    if resultados_finales:
-        resultado_final = pd.concat(resultados_finales, ignore_index=True)
-        fecha_hora_actual = datetime.now().strftime("%Y%m%d_%H%M")
-        nombre_archivo = RESULTADOS_DIR / f"{fecha_hora_actual}_analisis_chipExpress_(POR_PAGAR).xlsx"
-        
-        # Guardar el archivo de resultados
+    for evento in estado['eventos']:
+        if evento['estado'] == OK:
+            st.write(f"📄 {evento['archivo']} · 📅 Período: {evento['periodo']} · ✅ {evento['lineas']} líneas encontradas")
+        elif evento['estado'] == SIN_COLUMNA:
+            st.warning(f"⚠️ No se encontró la columna de número de teléfono en el archivo {evento['archivo']}")
+        elif evento['estado'] == ERROR:
+            st.error(f"❌ Error procesando el archivo {evento['archivo']}: {evento['mensaje']}")
+        else:
+            st.write(f"📄 {evento['archivo']} · 📅 Período: {evento['periodo']} · sin coincidencias")
+
+    if estado['estado'] == TERMINADO:
+        resultado = estado['resultado']
+        for aviso in resultado['avisos']:
+            st.warning(aviso)
+        st.success(f"✅ Análisis completado. Resultados guardados en: {resultado['archivo']}")
+        st.info(f"📊 Resumen del análisis:")
+        st.write(f"- Total de archivos procesados: {resultado['archivos_procesados']}")
+        st.write(f"- Total de líneas encontradas: {resultado['lineas']}")
+        st.write(f"- Escritura: {resultado['segundos_escritura']:.1f} s ({resultado['filas_por_segundo']:,.0f} filas/s)")
+        nombres_fase = {0: "Sin reconocer", 1: "1ra Evaluación", 2: "2da Evaluación", 3: "3ra Evaluación", 4: "4ta Evaluación"}
+        for total in resultado.get('evaluaciones', []):
+            if total['lineas']:
+                st.write(f"- {nombres_fase[total['fase']]}: {total['lineas']:,} líneas · ${total['comision']:,.2f}")
+        if resultado.get('telefonos_rechazados'):
+            motivos = {'no_numericos': "no numéricos", 'decimales': "con decimales", 'fuera_de_rango': "fuera de rango"}
+            detalle = ", ".join(
+                f"{(resultado['telefonos_detalle'].get(motivo, 0) + resultado['telefonos_wicho'].get(motivo, 0)):,} {texto}"
+                for motivo, texto in motivos.items()
+            )
+            st.warning(f"⚠️ {resultado['telefonos_rechazados']:,} números de teléfono mal formados no se cruzaron ({detalle})")
+        con_prefijo = resultado.get('telefonos_detalle', {}).get('con_prefijo', 0)
+        if con_prefijo:
+            st.write(f"- Números normalizados quitando el prefijo de país: {con_prefijo:,}")
+        st.success(f"✅ Se movieron {resultado['archivos_procesados']} archivos a la carpeta histórica")
+    elif estado['estado'] == FALLIDO:
+        st.error(f"❌ Error al procesar los archivos: {estado['error']}")
+    elif estado['estado'] == CANCELADO:
+        st.warning("⚠️ Análisis cancelado; no se escribió ningún resultado")
+
+def mostrar_descargas(directorio, df, clave, nombre_zip):
+    """
+    Lista paginada de descargas. Los bytes de un archivo solo se leen cuando
+    se pide su descarga, y la lista (o una selección) puede descargarse como
+    un ZIP que se comprime en disco y se reutiliza mientras no cambie.
+
+    Args:
+        directorio (Path): Carpeta de los archivos
+        df (DataFrame): Archivos listados, con las columnas 'Nombre' y
+            'Última modificación'
+        clave (str): Prefijo de las claves de los widgets
+        nombre_zip (str): Nombre del ZIP descargado
+    """
+    pagina = paginar(
+        df,
+        clave,
+        {"Última modificación": 'Última modificación', "Nombre": 'Nombre'},
+        ['Nombre'],
+        por_pagina=12
+    )
+    
+    # Crear columnas para los archivos
+    cols = st.columns(3)  # 3 archivos por fila
+    clave_preparado = f"{clave}_preparado"
+    
+    for idx, archivo in enumerate(pagina.itertuples()):
+        col_idx = idx % 3
+        with cols[col_idx]:
+            st.write(archivo.Nombre)
+            if st.session_state.get(clave_preparado) == archivo.Nombre:
+                with open(directorio / archivo.Nombre, 'rb') as f:
+                    st.download_button(
+                        label="📥 Descargar",
+                        data=f,
+                        file_name=archivo.Nombre,
+                        key=f"download_{clave}_{archivo.Nombre}"
+                    )
+            elif st.button("📄 Preparar descarga", key=f"preparar_{clave}_{archivo.Nombre}"):
+                st.session_state[clave_preparado] = archivo.Nombre
+                st.rerun()
+    
+    st.markdown("#### 📦 Descargar como ZIP")
+    seleccion = st.multiselect(
+        "Archivos del ZIP",
+        df['Nombre'].tolist(),
+        key=f"{clave}_seleccion_zip",
+        help="Si no se selecciona ninguno, el ZIP incluye todos los archivos de la lista"
+    )
+    nombres = sorted(seleccion or df['Nombre'].tolist())
+    clave_zip = f"{clave}_zip"
+    if st.button(f"📦 Preparar ZIP ({len(nombres)} archivos)", key=f"{clave}_preparar_zip"):
         try:
-            resultado_final.to_excel(nombre_archivo, index=False)
-            st.success(f"✅ Análisis completado. Resultados guardados en: {nombre_archivo}")
-            st.info(f"📊 Resumen del análisis:")
-            st.write(f"- Total de archivos procesados: {len(archivos_procesados)}")
-            st.write(f"- Total de líneas encontradas: {total_lineas_procesadas}")
-            st.write(f"- Archivo de resultados: {nombre_archivo}")
-
-            # Mover archivos procesados a la carpeta histórica
-            for archivo in archivos_procesados:
-                origen = DETALLE_DIR / archivo
-                destino = HISTORICO_DIR / archivo
-                shutil.move(str(origen), str(destino))
-            
-            st.success(f"✅ Se movieron {len(archivos_procesados)} archivos a la carpeta histórica")
-            return True
-            
+            with st.spinner("Comprimiendo archivos..."):
+                ruta_zip = crear_paquete([directorio / nombre for nombre in nombres], TEMP_DIR / "paquetes")
+            st.session_state[clave_zip] = (nombres, str(ruta_zip))
         except Exception as e:
-            st.error(f"❌ Error al guardar el archivo de resultados: {str(e)}")
-            return False
-    else:
-        st.warning("⚠️ No se encontraron coincidencias en ningún archivo")
-        return False
+            st.error(f"❌ Error al crear el ZIP: {str(e)}")
+    
+    preparado = st.session_state.get(clave_zip)
+    if preparado and preparado[0] == nombres and Path(preparado[1]).exists():
+        with open(preparado[1], 'rb') as f:
+            st.download_button(
+                label=f"📥 Descargar ZIP ({Path(preparado[1]).stat().st_size / 1024:,.0f} KB)",
+                data=f,
+                file_name=nombre_zip,
+                mime="application/zip",
+                key=f"{clave}_descargar_zip"
+            )
 
 def mostrar_archivos_carpeta(directorio, titulo):
+    import pandas as pd
+
     st.subheader(titulo)
     try:
         archivos = []
@@ -1463,21 +1403,7 @@ def mostrar_archivos_carpeta(directorio, titulo):
             
             # Agregar botones de descarga
             st.subheader("Descargar Archivos")
-            
-            # Crear columnas para los archivos
-            cols = st.columns(3)  # 3 archivos por fila
-            
-            for idx, archivo in enumerate(df_filtrado.itertuples()):
-                col_idx = idx % 3
-                with cols[col_idx]:
-                    st.write(archivo.Nombre)
-                    with open(directorio / archivo.Nombre, 'rb') as f:
-                        st.download_button(
-                            label="📥 Descargar",
-                            data=f,
-                            file_name=archivo.Nombre,
-                            key=f"download_{archivo.Nombre}"
-                        )
+            mostrar_descargas(directorio, df_filtrado, f"descargas_{titulo}", f"{directorio.name} {año_seleccionado}.zip")
         else:
             st.warning(f"No hay archivos en {titulo}")
     except Exception as e:
@@ -1587,6 +1513,8 @@ elif pagina == "📁 Gestión de Archivos":
                     })
             
             if archivos:
+                import pandas as pd
+
                 df = pd.DataFrame(archivos)
                 st.dataframe(
                     df,
@@ -1596,18 +1524,7 @@ elif pagina == "📁 Gestión de Archivos":
                 
                 # Agregar botones de descarga
                 st.subheader("Descargar Archivos")
-                for archivo in archivos:
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.write(archivo['Nombre'])
-                    with col2:
-                        with open(RESULTADOS_DIR / archivo['Nombre'], 'rb') as f:
-                            st.download_button(
-                                label="📥 Descargar",
-                                data=f,
-                                file_name=archivo['Nombre'],
-                                key=f"download_{archivo['Nombre']}"
-                            )
+                mostrar_descargas(RESULTADOS_DIR, df, "descargas_resultados", "Resultados.zip")
             else:
                 st.warning("No hay archivos en Resultados")
         except Exception as e:
@@ -1623,7 +1540,8 @@ elif pagina == "🚀 Ejecutar Análisis de Comisiones":
     st.title("🚀 Ejecutar Análisis de Comisiones")
     
     # Paso 1: Archivo Wicho (solo si no existe)
-    archivo_wicho = DATA_DIR / "wicho.pkl"
+    archivo_wicho = BASE_DIR / "CHIPS RUTA JL CABRERA WICHO.xlsx"
+    metadatos_wicho = cargar_metadatos_wicho(METADATOS_WICHO)
     if not archivo_wicho.exists():
         st.markdown("### 1️⃣ Subir Archivo Wicho (Solo primera vez)")
         archivo_wicho_upload = st.file_uploader(
@@ -1633,21 +1551,41 @@ elif pagina == "🚀 Ejecutar Análisis de Comisiones":
         )
         if archivo_wicho_upload:
             try:
-                # Guardar archivo Wicho en el directorio temporal
+                # Guardar archivo Wicho en el directorio temporal y en la
+                # raíz, de donde lo lee el análisis
+                contenido = archivo_wicho_upload.getvalue()
                 ruta_wicho = TEMP_DIR / "CHIPS RUTA JL CABRERA WICHO.xlsx"
                 with open(ruta_wicho, "wb") as f:
-                    f.write(archivo_wicho_upload.getvalue())
+                    f.write(contenido)
+                shutil.copy2(ruta_wicho, BASE_DIR / ruta_wicho.name)
+                ruta_wicho = BASE_DIR / ruta_wicho.name
+                
+                # Calcular una sola vez los metadatos que usa el dashboard
+                from express_analysis.esquema import leer_wicho
+
+                dataframes_wicho = leer_wicho(io.BytesIO(contenido))
+                guardar_metadatos_wicho(
+                    METADATOS_WICHO,
+                    calcular_metadatos_wicho(dataframes_wicho, hashlib.sha256(contenido).hexdigest(), archivo_wicho_upload.name)
+                )
+                obtener_memo().invalidar()
                 
                 # Guardar en Git
-                if guardar_en_git(ruta_wicho, "Agregar archivo Wicho"):
-                    dataframes_wicho = pd.read_excel(archivo_wicho_upload, sheet_name=None)
-                    guardar_datos_persistentes("wicho", dataframes_wicho)
+                if guardar_en_git([ruta_wicho, METADATOS_WICHO], "Agregar archivo Wicho"):
                     st.success("✅ Archivo de Wicho guardado correctamente en Git")
                     st.rerun()
                 else:
                     st.error("❌ Error al guardar el archivo Wicho en Git")
             except Exception as e:
                 st.error(f"❌ Error al procesar el archivo: {str(e)}")
+    elif metadatos_wicho:
+        hojas_cel = sum(1 for hoja in metadatos_wicho['hojas'] if hoja['tiene_cel'])
+        st.success(
+            f"✅ Archivo de Wicho ya está cargado ({metadatos_wicho['total_lineas_cel']:,} líneas y "
+            f"{metadatos_wicho['cel_distintos']:,} números distintos en {hojas_cel} hojas, subido el {metadatos_wicho['subido']})"
+        )
+        if metadatos_wicho.get('cel_rechazados'):
+            st.warning(f"⚠️ {metadatos_wicho['cel_rechazados']:,} valores de 'CEL' no son números de teléfono válidos y no se cruzarán")
     else:
         st.success("✅ Archivo de Wicho ya está cargado")
 
@@ -1655,39 +1593,81 @@ elif pagina == "🚀 Ejecutar Análisis de Comisiones":
     st.markdown("### 2️⃣ Subir Archivos de Detalle")
     archivos_detalle = st.file_uploader(
         "Sube los archivos de detalle",
-        type=['xlsx'],
+        type=['xlsx', 'zip'],
         accept_multiple_files=True,
-        help="Puedes subir uno o varios archivos de detalle para procesar"
+        help="Puedes subir uno o varios archivos de detalle, o un ZIP con los reportes del mes"
     )
 
+    # Análisis en curso o más reciente
+    ejecutor_trabajos = obtener_ejecutor_trabajos()
+    trabajo_activo = ejecutor_trabajos.activo()
+    trabajos_recientes = ejecutor_trabajos.recientes(1)
+    trabajo_mostrado = trabajo_activo or (trabajos_recientes[0] if trabajos_recientes else None)
+    if trabajo_mostrado:
+        st.markdown("### 📋 Análisis en Segundo Plano")
+        mostrar_trabajo(trabajo_mostrado)
+        if trabajo_activo and st.button("🛑 Cancelar Análisis", key=f"cancelar_{trabajo_activo['id']}"):
+            ejecutor_trabajos.cancelar(trabajo_activo['id'])
+            st.rerun()
+
     # Paso 3: Ejecutar Análisis
-    if archivos_detalle:
+    if trabajo_activo:
+        st.info("ℹ️ Hay un análisis en curso; podrás ejecutar otro cuando termine")
+    elif archivos_detalle:
+        trabajadores = st.number_input(
+            "Procesos en paralelo",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=1,
+            step=1,
+            help="Número de procesos para leer y cruzar los archivos de detalle. Útil para lotes grandes; con 1 se procesan en serie."
+        )
+        lectura_por_bloques = st.checkbox(
+            "Leer archivos grandes por bloques",
+            value=False,
+            help="Lee cada archivo de detalle por bloques de filas para limitar la memoria usada"
+        )
         if st.button("🚀 Ejecutar Análisis", type="primary", use_container_width=True):
-            # Guardar archivos de detalle
+            # Guardar archivos de detalle (los ZIP se extraen miembro a
+            # miembro); todo el lote va a Git en un solo commit al terminar
+            # el análisis
+            ingesta = Ingesta(DETALLE_DIR, HISTORICO_DIR)
             for archivo in archivos_detalle:
                 try:
-                    # Guardar en directorio temporal
-                    ruta_archivo = DETALLE_DIR / archivo.name
-                    with open(ruta_archivo, "wb") as f:
-                        f.write(archivo.getvalue())
-                    
-                    # Guardar en Git
-                    if guardar_en_git(ruta_archivo, f"Agregar archivo de detalle: {archivo.name}"):
-                        st.success(f"✅ Archivo {archivo.name} guardado correctamente en Git")
-                    else:
-                        st.error(f"❌ Error al guardar {archivo.name} en Git")
-                        continue
+                    ingesta.ingresar(archivo, archivo.name)
                 except Exception as e:
                     st.error(f"❌ Error al guardar {archivo.name}: {str(e)}")
                     continue
+            for ingresado in ingesta.ingresados:
+                origen = f" (de {ingresado.origen})" if ingresado.origen else ""
+                st.success(f"✅ Archivo {ingresado.nombre}{origen} guardado correctamente")
+            for nombre, motivo in ingesta.omitidos:
+                st.warning(f"⚠️ Se omitió {nombre}: {motivo}")
+            archivos_git = [ingresado.ruta for ingresado in ingesta.ingresados]
             
-            # Ejecutar análisis
-            with st.spinner("🔄 Procesando archivos..."):
-                if procesar_archivos():
-                    st.success("✅ Análisis completado exitosamente")
-                    st.rerun()
-                else:
-                    st.error("❌ Error al procesar los archivos")
+            # Enviar el análisis como trabajo en segundo plano
+            from express_analysis.analisis import FILAS_POR_BLOQUE
+
+            libro_mayor = obtener_libro_mayor()
+            cache = obtener_cache_libros()
+            cola_git = obtener_cola_git()
+            memo = obtener_memo()
+            opciones = {
+                'trabajadores': int(trabajadores),
+                'filas_por_bloque': FILAS_POR_BLOQUE if lectura_por_bloques else None,
+                'archivos_git': archivos_git,
+                'corrida': obtener_metricas().corrida('analisis')
+            }
+            ejecutor_trabajos.enviar(
+                f"Análisis de {len(archivos_git)} archivos de detalle",
+                lambda trabajo: procesar_archivos(trabajo, libro_mayor, cache, cola_git, memo, **opciones)
+            )
+            st.rerun()
+
+    # Consultar de nuevo mientras el análisis siga activo
+    if trabajo_activo:
+        time.sleep(2)
+        st.rerun()
 
 elif pagina == "⚙️ Configuración":
     st.title("⚙️ Configuración")
@@ -1820,6 +1800,161 @@ elif pagina == "⚙️ Configuración":
         # Aquí iría la lógica para guardar la configuración
         st.success("Configuración guardada exitosamente")
         
+    # Estado de la caché de libros
+    st.markdown("### 🗄️ Caché de Libros")
+    estadisticas_cache = obtener_cache_libros().estadisticas()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Aciertos", estadisticas_cache['aciertos'], help="Lecturas servidas desde Parquet sin usar openpyxl")
+    with col2:
+        st.metric("Fallos", estadisticas_cache['fallos'], help="Lecturas que tuvieron que parsear el Excel")
+    with col3:
+        st.metric("Archivos Conocidos", estadisticas_cache['archivos_conocidos'])
+    with col4:
+        st.metric("Sidecars", estadisticas_cache['sidecars'])
+    estadisticas_memo = obtener_memo().estadisticas()
+    st.caption(
+        f"Cálculos del dashboard memorizados: {estadisticas_memo['aciertos']} aciertos, "
+        f"{estadisticas_memo['fallos']} cálculos, {estadisticas_memo['entradas']} entradas"
+    )
+
+    # Gemelos Parquet de los resultados existentes
+    if st.button("🧬 Generar Gemelos Parquet", help="Crea el gemelo Parquet de los resultados que aún no lo tienen"):
+        with st.spinner("Generando gemelos..."):
+            creados, errores = respaldar_gemelos(RESULTADOS_DIR, obtener_cache_libros())
+        for error in errores:
+            st.error(f"❌ {error}")
+        st.success(f"✅ {creados} gemelos generados")
+
+    # Libro mayor de comisiones
+    st.markdown("### 📒 Libro Mayor")
+    libro_mayor = obtener_libro_mayor()
+    estadisticas_libro = libro_mayor.estadisticas()
+    lineas_por_estado = estadisticas_libro['lineas_por_estado']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Archivos Registrados", estadisticas_libro['archivos'])
+    with col2:
+        st.metric("Líneas Pagadas", f"{lineas_por_estado.get('PAGADO', 0):,}")
+    with col3:
+        st.metric("Líneas por Pagar", f"{lineas_por_estado.get('POR_PAGAR', 0):,}")
+    with col4:
+        st.metric("Líneas Sin Resultado", f"{lineas_por_estado.get('SIN_RESULTADO', 0):,}", help="Líneas de Detalle historico que no están en ningún archivo de resultados")
+
+    historico_importado = libro_mayor.historico_importado()
+    if historico_importado:
+        st.caption(f"Detalle historico importado el {historico_importado}")
+    if st.button("📥 Importar Resultados y Detalle Historico", help="Registra en el libro mayor los archivos existentes; los ya registrados se omiten"):
+        from express_analysis.esquema import leer_wicho
+        from express_analysis.indice_wicho import IndiceWicho
+
+        archivo_wicho = BASE_DIR / "CHIPS RUTA JL CABRERA WICHO.xlsx"
+        with st.spinner("Importando archivos..."):
+            indice_wicho = IndiceWicho.construir(leer_wicho(archivo_wicho)) if archivo_wicho.exists() else None
+            avisos = libro_mayor.sincronizar(RESULTADOS_DIR, obtener_cache_libros(), indice_wicho)
+            if indice_wicho is not None:
+                importados, avisos_historico = libro_mayor.importar_historico(HISTORICO_DIR, indice_wicho)
+                avisos += avisos_historico
+            obtener_memo().invalidar()
+        for aviso in avisos:
+            st.warning(f"⚠️ {aviso}")
+        if indice_wicho is None:
+            st.warning("⚠️ No se encontró el archivo CHIPS RUTA JL CABRERA WICHO.xlsx; no se importó Detalle historico")
+        else:
+            st.success(f"✅ Libro mayor actualizado ({importados} archivos de Detalle historico importados)")
+
+    # Estado de la cola de Git
+    st.markdown("### 📤 Persistencia en Git")
+    estado_git = obtener_cola_git().estado()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Lotes en Cola", estado_git['lotes_en_cola'])
+    with col2:
+        st.metric("Commits sin Subir", estado_git['commits_sin_push'])
+    with col3:
+        ultimo_push = estado_git['ultimo_push']
+        st.metric("Último Push", ultimo_push['fecha'] if ultimo_push else "—")
+    if ultimo_push and not ultimo_push['ok']:
+        st.warning(f"⚠️ El último push falló, se reintentará automáticamente: {ultimo_push['mensaje']}")
+    ultimo_commit = estado_git['ultimo_commit']
+    if ultimo_commit and not ultimo_commit['ok']:
+        st.warning(f"⚠️ {ultimo_commit['mensaje']}")
+
+    # Métricas de ejecución por etapa
+    st.markdown("### 🩺 Diagnósticos")
+    registros = obtener_metricas().recientes()
+    if not registros:
+        st.info("Aún no hay mediciones. Se registran al ejecutar un análisis, sincronizar, guardar en Git o cargar el dashboard.")
+    else:
+        import pandas as pd
+
+        corridas = resumir_corridas(registros)
+        st.markdown("#### Ejecuciones Recientes")
+        st.dataframe(
+            corridas.head(20).drop(columns=['corrida']).rename(columns={
+                'inicio': 'Inicio', 'nombre': 'Tipo', 'etapas': 'Etapas', 'segundos': 'Segundos',
+                'pico_mb': 'Memoria Pico (MB)', 'errores': 'Errores'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        opciones_corrida = corridas.head(20)['corrida'].tolist()
+        etiquetas_corrida = dict(zip(corridas['corrida'], corridas['inicio'] + " · " + corridas['nombre']))
+        corrida_elegida = st.selectbox(
+            "Etapas de la ejecución",
+            opciones_corrida,
+            format_func=lambda corrida: etiquetas_corrida[corrida]
+        )
+        etapas_corrida = pd.DataFrame([r for r in registros if r['corrida'] == corrida_elegida])
+        st.dataframe(
+            etapas_corrida[['etapa', 'segundos', 'filas', 'pico_mb', 'aumento_pico_mb', 'ok']].rename(columns={
+                'etapa': 'Etapa', 'segundos': 'Segundos', 'filas': 'Filas', 'pico_mb': 'Memoria Pico (MB)',
+                'aumento_pico_mb': 'Aumento del Pico (MB)', 'ok': 'Correcta'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        st.markdown("#### Etapas Más Lentas")
+        st.dataframe(
+            etapas_mas_lentas(registros).rename(columns={
+                'nombre': 'Tipo', 'etapa': 'Etapa', 'veces': 'Veces', 'segundos_mediana': 'Segundos (Mediana)',
+                'segundos_max': 'Segundos (Máximo)', 'filas_por_segundo': 'Filas por Segundo',
+                'aumento_pico_mb': 'Aumento Máximo del Pico (MB)'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(
+            "La lectura y el cruce de los archivos de detalle suman el tiempo de cada archivo, así que con varios "
+            "procesos pueden superar la duración real. La memoria pico es la del proceso de la aplicación."
+        )
+
+    # Tiempo de arranque
+    st.markdown("### ⏱️ Arranque")
+    st.caption(f"Esta página tardó {(time.perf_counter() - INICIO_SCRIPT) * 1000:.0f} ms desde el inicio del script hasta aquí")
+    if st.button("⏱️ Medir Importaciones", help="Importa cada módulo del motor en un proceso nuevo y mide cuánto tarda"):
+        import pandas as pd
+
+        with st.spinner("Midiendo importaciones..."):
+            mediciones = pd.DataFrame(medir_importaciones())
+        st.dataframe(
+            mediciones.rename(columns={
+                'modulo': 'Módulo',
+                'milisegundos': 'Milisegundos',
+                'presupuesto_ms': 'Presupuesto (ms)',
+                'dentro_presupuesto': 'Dentro del Presupuesto'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        fuera = mediciones.loc[~mediciones['dentro_presupuesto'], 'modulo'].tolist()
+        if fuera:
+            st.warning(f"⚠️ Exceden su presupuesto de importación: {', '.join(fuera)}")
+        else:
+            st.success("✅ Todos los módulos importan dentro de su presupuesto")
+
     # Información del sistema
     st.markdown("### ℹ️ Información del Sistema")
     st.info(f"""
@@ -0,0 +1,10 @@
+"""
+Motor de procesamiento para el Análisis de Chips Express.
+
+Se instala como el paquete `express_analysis` (`pip install .`); el nombre
+corto `motor` que tenía antes choca con el controlador de MongoDB de PyPI.
+
+Contiene la lógica de lectura, cruce y agregación que usan la aplicación de
+Streamlit (app.py) y la línea de comandos (cli.py, `chips-express`); main.py
+solo ejecuta `chips-express process`.
+"""
@@ -0,0 +1,47 @@
+"""
+Marcos del análisis de comisiones pagadas.
+
+Los conteos por evaluación de cada archivo salen del libro mayor
+(libro_mayor.LibroMayor.resumen_por_archivo); aquí solo se les da la forma
+que consumen las gráficas y tablas del análisis.
+"""
+
+import pandas as pd
+
+# Comisión fija por línea usada en el análisis de pagados
+COMISION_POR_LINEA = 25
+
+
+def construir_marcos(resumen):
+    """
+    Arma los DataFrames del análisis de pagados a partir del resumen por archivo.
+
+    Args:
+        resumen (DataFrame): Resultado de LibroMayor.resumen_por_archivo
+
+    Returns:
+        tuple: (df_resultados, df_funnel) ordenados por fecha descendente
+    """
+    if resumen.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    fecha = pd.to_datetime(resumen['fecha_max'])
+    df_resultados = pd.DataFrame({
+        'fecha': fecha,
+        'archivo': resumen['archivo'],
+        'primera_eval': resumen['primera_eval'],
+        'segunda_eval': resumen['segunda_eval'],
+        'tercera_eval': resumen['tercera_eval'],
+        'cuarta_eval': resumen['cuarta_eval'],
+        'otras_eval': resumen['otras_eval'],
+        'comision_primera': resumen['primera_eval'] * COMISION_POR_LINEA,
+        'comision_otras': resumen['otras_eval'] * COMISION_POR_LINEA
+    }).sort_values('fecha', ascending=False)
+    df_funnel = pd.DataFrame({
+        'fecha': fecha,
+        'primera': resumen['primera_eval'],
+        'segunda': resumen['segunda_eval'],
+        'tercera': resumen['tercera_eval'],
+        'cuarta': resumen['cuarta_eval']
+    }).sort_values('fecha', ascending=False)
+    return df_resultados, df_funnel
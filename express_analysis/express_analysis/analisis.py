@@ -0,0 +1,278 @@
+"""
+Análisis de comisiones sin interfaz.
+
+Cruza un lote de archivos de detalle contra el índice de Wicho, escribe el
+libro de resultados y mueve los archivos procesados al histórico. No usa
+Streamlit, así que puede ejecutarse en un hilo de fondo o desde la línea de
+comandos (ver cli.py); el avance se informa con callbacks y la cancelación
+se consulta entre archivo y archivo.
+"""
+
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from .escritor_resultados import EscritorResultados
+from .esquema import leer_wicho
+from .evaluaciones import totales_por_evaluacion
+from .indice_wicho import IndiceWicho, rechazados, sumar_conteos
+from .metricas import Corrida, memoria_pico_mb
+from .metadatos_wicho import calcular_metadatos_wicho, cargar_metadatos_wicho, guardar_metadatos_wicho
+from .procesamiento import OK, iterar_lote
+
+# Filas por bloque al leer archivos de detalle por bloques
+FILAS_POR_BLOQUE = 50000
+
+
+class AnalisisCancelado(Exception):
+    """El análisis se canceló antes de escribir el libro de resultados."""
+
+
+class SinArchivosPendientes(ValueError):
+    """No hay archivos de detalle para procesar."""
+
+
+@dataclass
+class ResumenAnalisis:
+    """
+    Resultado de un análisis.
+
+    Atributos:
+        archivos_procesados (list): Archivos con líneas encontradas
+        lineas (int): Líneas escritas en el libro de resultados
+        escritura (dict): Lo devuelto por EscritorResultados.cerrar(), o None
+            si no hubo coincidencias
+        movidos (list): Pares (origen, destino) de los archivos movidos al
+            histórico
+        evaluaciones (DataFrame): Líneas y comisión por fase de las líneas
+            escritas (ver totales_por_evaluacion), o None si ningún archivo
+            trae las columnas 'Evaluación' y 'Comisión'
+        telefonos (dict): Conteos de la normalización de las columnas de
+            teléfono de todos los archivos (ver normalizar_telefonos)
+    """
+    archivos_procesados: list = field(default_factory=list)
+    lineas: int = 0
+    escritura: dict = None
+    movidos: list = field(default_factory=list)
+    evaluaciones: pd.DataFrame = None
+    telefonos: dict = field(default_factory=dict)
+
+    def sumar_evaluaciones(self, datos):
+        """Acumula los totales por fase de un bloque de líneas encontradas."""
+        if 'Evaluación' not in datos.columns or 'Comisión' not in datos.columns:
+            return
+        totales = totales_por_evaluacion(datos)
+        self.evaluaciones = totales if self.evaluaciones is None else self.evaluaciones + totales
+
+
+def cargar_indice_wicho(ruta):
+    """
+    Lee las hojas del archivo Wicho (ver esquema.leer_wicho) y compila su
+    índice.
+
+    Args:
+        ruta (Path): Ruta del archivo Wicho
+
+    Returns:
+        IndiceWicho: Índice de números de Wicho
+    """
+    return IndiceWicho.construir(leer_wicho(ruta))
+
+
+def archivos_pendientes(directorio):
+    """
+    Args:
+        directorio (Path): Carpeta de archivos de detalle
+
+    Returns:
+        list: Rutas de los archivos de detalle, en orden fijo para que el
+            resultado no dependa del número de procesos
+    """
+    directorio = Path(directorio)
+    return [
+        directorio / f for f in sorted(os.listdir(directorio))
+        if f.endswith('.xlsx') and not f.startswith('~$')
+    ]
+
+
+def ejecutar_analisis(indice_wicho, rutas_detalle, directorio_resultados, directorio_historico,
+                      trabajadores=1, filas_por_bloque=None, al_terminar=None, cancelado=None, corrida=None):
+    """
+    Cruza los archivos de detalle, escribe el libro de resultados y mueve los
+    archivos procesados al histórico.
+
+    Args:
+        indice_wicho (IndiceWicho): Índice de números de Wicho
+        rutas_detalle (list): Rutas de los archivos de detalle
+        directorio_resultados (Path): Carpeta donde se escribe el resultado
+        directorio_historico (Path): Carpeta a la que se mueven los archivos
+            procesados
+        trabajadores (int): Procesos para leer y cruzar los archivos
+        filas_por_bloque (int): Lectura por bloques (ver procesar_detalle)
+        al_terminar (callable): Se llama con cada ResultadoDetalle en cuanto
+            está listo
+        cancelado (callable): Se consulta después de cada archivo; si
+            devuelve True el análisis se detiene sin escribir nada
+        corrida (Corrida): Opcional, donde se registran las etapas (lectura,
+            cruce, escritura y movimiento al histórico)
+
+    Returns:
+        ResumenAnalisis: Archivos procesados, líneas y escritura
+
+    Raises:
+        AnalisisCancelado: Si se canceló; no se escribe el libro ni se mueve
+            ningún archivo
+    """
+    corrida = corrida or Corrida(None, 'analisis')
+    rutas_detalle = [Path(r) for r in rutas_detalle]
+    por_nombre = {ruta.name: ruta for ruta in rutas_detalle}
+
+    # Cada archivo se entrega al escritor en cuanto termina y no se conserva
+    fecha_hora_actual = datetime.now().strftime("%Y%m%d_%H%M")
+    nombre_archivo = Path(directorio_resultados) / f"{fecha_hora_actual}_analisis_chipExpress_(POR_PAGAR).xlsx"
+    sumidero = EscritorResultados(nombre_archivo)
+    resumen = ResumenAnalisis()
+
+    # Lectura y cruce se miden dentro de cada archivo (también en los procesos
+    # trabajadores), así que en paralelo son la suma de los tiempos por archivo
+    filas_leidas = 0
+    segundos_lectura = segundos_cruce = segundos_bloques = 0.0
+    pico_antes = memoria_pico_mb()
+    try:
+        for resultado in iterar_lote(indice_wicho, rutas_detalle, trabajadores, filas_por_bloque):
+            filas_leidas += resultado.filas_leidas
+            segundos_lectura += resultado.segundos_lectura
+            segundos_cruce += resultado.segundos_cruce
+            sumar_conteos(resumen.telefonos, resultado.telefonos or {})
+            if al_terminar:
+                al_terminar(resultado)
+            if resultado.estado == OK:
+                inicio = time.perf_counter()
+                sumidero.escribir(resultado.datos)
+                segundos_bloques += time.perf_counter() - inicio
+                resumen.sumar_evaluaciones(resultado.datos)
+                resumen.archivos_procesados.append(resultado.archivo)
+            if cancelado is not None and cancelado():
+                raise AnalisisCancelado("Análisis cancelado")
+    except BaseException:
+        sumidero.descartar()
+        raise
+    finally:
+        corrida.registrar('lectura_detalle', segundos_lectura, filas_leidas, pico_antes=pico_antes)
+        corrida.registrar('cruce_wicho', segundos_cruce, sumidero.lineas)
+        corrida.registrar('bloques_temporales', segundos_bloques, sumidero.lineas)
+
+    resumen.lineas = sumidero.lineas
+    if not resumen.archivos_procesados:
+        sumidero.descartar()
+        return resumen
+
+    with corrida.etapa('escritura_resultado', filas=resumen.lineas):
+        resumen.escritura = sumidero.cerrar()
+
+    # Mover archivos procesados a la carpeta histórica
+    with corrida.etapa('mover_historico', filas=len(resumen.archivos_procesados)):
+        for archivo in resumen.archivos_procesados:
+            origen = por_nombre[archivo]
+            destino = Path(directorio_historico) / archivo
+            shutil.move(str(origen), str(destino))
+            resumen.movidos.append((origen, destino))
+    return resumen
+
+
+def analizar_carpetas(rutas, cache, libro_mayor, trabajadores=1, filas_por_bloque=None,
+                      al_iniciar=None, al_terminar=None, cancelado=None, modificados=None, corrida=None):
+    """
+    Analiza los archivos pendientes de Detalle/ de una raíz de datos y
+    registra el resultado en el libro mayor.
+
+    Es el cuerpo común del trabajo de la aplicación y del comando `process`.
+
+    Args:
+        rutas (Rutas): Estructura de carpetas de datos
+        cache (CacheLibros): Caché para hashes y lecturas
+        libro_mayor (LibroMayor): Libro mayor donde se registra el resultado
+        trabajadores (int): Procesos para leer y cruzar los archivos
+        filas_por_bloque (int): Lectura por bloques (ver procesar_detalle)
+        al_iniciar (callable): Se llama con el número de archivos pendientes
+        al_terminar (callable): Se llama con cada ResultadoDetalle
+        cancelado (callable): Ver ejecutar_analisis
+        modificados (list): Si se indica, se le agregan los archivos escritos
+            o movidos, aunque el análisis falle después
+        corrida (Corrida): Opcional, donde se registran las etapas
+
+    Returns:
+        dict: Resumen serializable del análisis
+
+    Raises:
+        FileNotFoundError: Si no existe el archivo Wicho
+        SinArchivosPendientes: Si no hay archivos de detalle
+        ValueError: Si ningún archivo tuvo coincidencias
+        AnalisisCancelado: Si se canceló
+    """
+    modificados = modificados if modificados is not None else []
+    corrida = corrida or Corrida(None, 'analisis')
+    if not rutas.wicho.exists():
+        raise FileNotFoundError(f"No se encontró el archivo {rutas.wicho.name}")
+    with corrida.etapa('lectura_wicho') as medicion:
+        dataframes_wicho = leer_wicho(rutas.wicho)
+        indice_wicho = IndiceWicho.construir(dataframes_wicho)
+        medicion['filas'] = len(indice_wicho)
+
+    # Completar el registro de metadatos si falta o es de otro archivo
+    hash_wicho = cache.hash_contenido(rutas.wicho)
+    metadatos_wicho = cargar_metadatos_wicho(rutas.metadatos_wicho)
+    if metadatos_wicho is None or metadatos_wicho['hash'] != hash_wicho:
+        guardar_metadatos_wicho(
+            rutas.metadatos_wicho,
+            calcular_metadatos_wicho(dataframes_wicho, hash_wicho, rutas.wicho.name)
+        )
+        modificados.append(rutas.metadatos_wicho)
+    del dataframes_wicho
+
+    rutas_detalle = archivos_pendientes(rutas.detalle)
+    if not rutas_detalle:
+        raise SinArchivosPendientes("No hay archivos de detalle para procesar")
+    if al_iniciar:
+        al_iniciar(len(rutas_detalle))
+
+    resumen = ejecutar_analisis(
+        indice_wicho,
+        rutas_detalle,
+        rutas.resultados,
+        rutas.historico,
+        trabajadores=trabajadores,
+        filas_por_bloque=filas_por_bloque,
+        al_terminar=al_terminar,
+        cancelado=cancelado,
+        corrida=corrida
+    )
+    if resumen.escritura is None:
+        raise ValueError("No se encontraron coincidencias en ningún archivo")
+
+    modificados.extend([resumen.escritura['ruta'], resumen.escritura['gemelo']])
+    for origen, destino in resumen.movidos:
+        modificados.extend([origen, destino])
+
+    with corrida.etapa('libro_mayor', filas=resumen.lineas):
+        avisos = libro_mayor.sincronizar(rutas.resultados, cache, indice_wicho)
+    return {
+        'archivo': resumen.escritura['ruta'].name,
+        'archivos_procesados': len(resumen.archivos_procesados),
+        'lineas': resumen.lineas,
+        'segundos_escritura': round(resumen.escritura['segundos'], 1),
+        'filas_por_segundo': round(resumen.escritura['filas_por_segundo']),
+        'telefonos_detalle': resumen.telefonos,
+        'telefonos_wicho': indice_wicho.conteos_telefono,
+        'telefonos_rechazados': rechazados(resumen.telefonos) + rechazados(indice_wicho.conteos_telefono),
+        'evaluaciones': [] if resumen.evaluaciones is None else [
+            {'fase': int(fase), 'lineas': int(fila['lineas']), 'comision': float(fila['comision'])}
+            for fase, fila in resumen.evaluaciones.iterrows()
+        ],
+        'avisos': avisos
+    }
@@ -0,0 +1,93 @@
+"""
+Medición del tiempo de arranque del motor.
+
+Importar un módulo del motor no debe tener efectos (no crea carpetas ni lee
+archivos) y las dependencias pesadas que no siempre se usan (pyarrow,
+openpyxl) se importan dentro de las funciones. Aquí se mide, en un proceso
+nuevo por módulo y con `python -X importtime`, cuánto cuesta importar cada
+módulo en frío y se compara con el presupuesto de ese módulo.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+# Presupuesto de importación en frío de cada módulo medido, en milisegundos:
+# la mediana de cinco mediciones por 1.5, redondeada a la decena. Se midieron
+# con Python 3.11.7, pandas 3.0.6, numpy 2.4.6 y pyarrow 26.0.0, no con el
+# pandas 2.2.1 que fija requirements.txt; con esa versión los módulos que
+# importan pandas pueden tardar distinto y conviene volver a medirlos. Los
+# módulos que no procesan datos no importan pandas ni numpy; si uno empieza a
+# hacerlo (unos 450 ms más) queda fuera de presupuesto.
+PRESUPUESTOS_IMPORTACION_MS = {
+    # El paquete, la línea de comandos y lo que usa la aplicación al arrancar
+    'express_analysis': 10,
+    'express_analysis.cli': 70,
+    'express_analysis.rutas': 60,
+    'express_analysis.cache_libros': 50,
+    'express_analysis.gemelos': 40,
+    'express_analysis.libro_mayor': 60,
+    'express_analysis.cola_git': 60,
+    'express_analysis.trabajos': 70,
+    'express_analysis.memo': 40,
+    'express_analysis.ingesta': 80,
+    'express_analysis.sincronizacion': 50,
+    'express_analysis.metadatos_wicho': 40,
+    'express_analysis.metricas': 50,
+    'express_analysis.paquetes': 60,
+    'express_analysis.arranque': 30,
+    # Los que procesan datos, importados solo al analizar
+    'express_analysis.indice_wicho': 740,
+    'express_analysis.esquema': 750,
+    'express_analysis.procesamiento': 720,
+    'express_analysis.analisis': 850,
+    'express_analysis.agregados': 600,
+    'express_analysis.evaluaciones': 670,
+    'express_analysis.lector_detalle': 640,
+    'express_analysis.escritor_resultados': 650,
+    # Solo para las mediciones de `bench`
+    'express_analysis.banco': 720,
+}
+
+MODULOS_MOTOR = list(PRESUPUESTOS_IMPORTACION_MS)
+
+def _milisegundos_importacion(salida, modulo):
+    """Tiempo acumulado (ms) de `modulo` en la salida de -X importtime."""
+    for linea in salida.splitlines():
+        partes = [parte.strip() for parte in linea.split('|')]
+        if len(partes) == 3 and partes[2] == modulo:
+            return int(partes[1]) / 1000
+    return None
+
+
+def medir_importaciones(modulos=MODULOS_MOTOR, presupuestos_ms=PRESUPUESTOS_IMPORTACION_MS):
+    """
+    Mide la importación en frío de cada módulo en un proceso nuevo.
+
+    Args:
+        modulos (list): Nombres de módulos a importar
+        presupuestos_ms (dict): Presupuesto de cada módulo en milisegundos
+
+    Returns:
+        list: Diccionarios con modulo, milisegundos, presupuesto_ms y
+            dentro_presupuesto (milisegundos es None si el módulo no se pudo
+            importar)
+    """
+    raiz = Path(__file__).resolve().parent.parent
+    mediciones = []
+    for modulo in modulos:
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+            capture_output=True,
+            text=True,
+            cwd=raiz
+        )
+        milisegundos = _milisegundos_importacion(proceso.stderr, modulo) if proceso.returncode == 0 else None
+        presupuesto_ms = presupuestos_ms[modulo]
+        mediciones.append({
+            'modulo': modulo,
+            'milisegundos': milisegundos,
+            'presupuesto_ms': presupuesto_ms,
+            'dentro_presupuesto': milisegundos is not None and milisegundos <= presupuesto_ms
+        })
+    return mediciones
@@ -0,0 +1,440 @@
+"""
+Banco de pruebas con datos sintéticos.
+
+Genera un libro Wicho (varias hojas con 'CEL' y una sin ella) y archivos de
+detalle con la misma forma que los reales: periodo en la fila 1, columna C,
+encabezados en la fila 3 y la columna de teléfono con los distintos nombres
+de lector_detalle.COLUMNAS_TELEFONO. Sobre esos datos mide por separado cada
+etapa del análisis y del dashboard, de modo que dos corridas (por ejemplo,
+antes y después de un cambio) puedan compararse etapa por etapa.
+
+Los datos generados se guardan junto con los parámetros que los produjeron y
+se reutilizan mientras no cambien, porque generar un millón de líneas tarda
+más que medirlas.
+
+medir_memoria compara, sobre archivos reales, la memoria que ocupan Wicho,
+los archivos de detalle y las líneas encontradas leídos completos y leídos
+con el esquema de carga (ver esquema.py).
+"""
+
+import json
+import math
+import platform
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .agregados import construir_marcos
+from .analisis import cargar_indice_wicho
+from .cache_libros import CacheLibros
+from .escritor_resultados import EscritorResultados
+from .esquema import ESQUEMA_DETALLE, ESQUEMA_RESULTADO, compactar, leer_wicho
+from .indice_wicho import IndiceWicho
+from .lector_detalle import COLUMNAS_TELEFONO, leer_detalle
+from .libro_mayor import ESTADO_PAGADO, LibroMayor
+from .procesamiento import OK, procesar_detalle
+
+# Versión del formato de los datos generados y de los resultados
+VERSION_BANCO = 1
+
+# Tamaños de la suite, en líneas de detalle
+TAMANOS = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000}
+
+# Etapas medidas, en el orden en que se ejecutan
+ETAPAS = [
+    'indice_wicho',
+    'lectura',
+    'cruce',
+    'depuracion',
+    'armado',
+    'escritura',
+    'analisis_resultado',
+    'analisis_pagados',
+]
+
+# Líneas por archivo de detalle y mínimo de archivos (uno por nombre de la
+# columna de teléfono)
+LINEAS_POR_ARCHIVO = 100_000
+MIN_ARCHIVOS = len(COLUMNAS_TELEFONO)
+
+# Filas por hoja del libro Wicho
+FILAS_POR_HOJA = 5_000
+
+# Proporción de líneas de detalle con número de Wicho y de números de Wicho
+# repetidos en otra hoja
+PROPORCION_COINCIDENCIAS = 0.6
+PROPORCION_REPETIDOS_WICHO = 0.01
+
+EVALUACIONES = ['1ra evaluación', '2da evaluación', '3ra evaluación', '4ta evaluación']
+PESOS_EVALUACIONES = [0.5, 0.2, 0.15, 0.15]
+
+COLUMNAS_WICHO = ['NO ', 'ICCID', 'CEL', 'FECHA PREACT', 'LOTE', 'CLIENTE', 'FECHA VENTA', 'FECHA 1ER RECARGA']
+
+FECHA_BASE = datetime(2025, 1, 1)
+
+# Diferencia mínima (segundos) para considerar una etapa más lenta, por
+# debajo de la cual la variación es ruido
+MINIMO_SEGUNDOS_REGRESION = 0.05
+
+
+def _numeros_wicho(lineas, generador):
+    """Números de Wicho distintos, en orden aleatorio."""
+    cantidad = max(lineas // 2, 1)
+    return 3_000_000_000 + generador.permutation(cantidad).astype('int64') * 7
+
+
+def generar_wicho(ruta, numeros, generador):
+    """
+    Escribe un libro Wicho sintético.
+
+    Los números se reparten en hojas de FILAS_POR_HOJA filas con las columnas
+    del libro real; algunos aparecen también en otra hoja y al final va una
+    hoja de resumen sin 'CEL'.
+
+    Args:
+        ruta (Path): Archivo a escribir
+        numeros (ndarray): Números de Wicho
+        generador (Generator): Generador de números aleatorios
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    repetidos = generador.choice(numeros, int(len(numeros) * PROPORCION_REPETIDOS_WICHO), replace=False)
+    hojas = np.array_split(numeros, max(math.ceil(len(numeros) / FILAS_POR_HOJA), 1))
+    for numero_hoja, hoja_numeros in enumerate(hojas):
+        hoja_numeros = np.concatenate([hoja_numeros, repetidos[repetidos % len(hojas) == numero_hoja]])
+        hoja = libro.create_sheet(str(1_000_000 + numero_hoja * 7919))
+        hoja.append(COLUMNAS_WICHO)
+        for fila, cel in enumerate(hoja_numeros.tolist(), start=1):
+            fecha = FECHA_BASE + timedelta(days=fila % 180)
+            hoja.append([fila, str(8952020000000000000 + cel), cel, fecha.strftime('%d/%m/%Y'), 1_000_000 + numero_hoja, None, None, None])
+
+    resumen = libro.create_sheet('concentrado')
+    resumen.append([None, None, None, None, 'total sembrado', len(numeros)])
+    libro.save(ruta)
+
+
+def generar_detalle(ruta, numeros, columna_telefono, periodo, generador):
+    """
+    Escribe un archivo de detalle sintético.
+
+    Args:
+        ruta (Path): Archivo a escribir
+        numeros (ndarray): Número de teléfono de cada línea
+        columna_telefono (str): Nombre de la columna de teléfono
+        periodo (str): Texto del periodo (fila 1, columna C)
+        generador (Generator): Generador de números aleatorios
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet('Detalle')
+    hoja.append(['Periodo:', None, periodo])
+    hoja.append([])
+    hoja.append([
+        'Fuerza de venta', 'Fuerza de venta 1', 'Fuerza de venta 2', 'Fuerza de venta 3', columna_telefono,
+        'Producto', 'ICCID', 'Estatus actual de la línea', 'Fecha de activación', 'Fecha de primer ingreso',
+        'Fecha Primera Recarga', 'Mes de primer ingres', 'Evaluación', 'Comisión', 'Estatus de la comisión'
+    ])
+
+    evaluaciones = generador.choice(len(EVALUACIONES), len(numeros), p=PESOS_EVALUACIONES)
+    dias = generador.integers(0, 180, len(numeros))
+    for cel, evaluacion, dia in zip(numeros.tolist(), evaluaciones.tolist(), dias.tolist()):
+        fecha = FECHA_BASE + timedelta(days=dia)
+        hoja.append([
+            'TPIMIO', 'TPIMIO', 'TP3PCT', 'TPIMIO', cel,
+            'CHIP EX', str(895202000000000000 + cel), 'ACT', fecha, fecha,
+            fecha, fecha.strftime('%b-%Y').upper(), EVALUACIONES[evaluacion], 25, 'PAGADA'
+        ])
+    libro.save(ruta)
+
+
+def preparar_datos(directorio, lineas, semilla=0):
+    """
+    Genera (o reutiliza) el libro Wicho y los archivos de detalle de un tamaño.
+
+    Args:
+        directorio (Path): Carpeta de los datos de este tamaño
+        lineas (int): Líneas de detalle en total
+        semilla (int): Semilla del generador
+
+    Returns:
+        dict: wicho (Path), detalle (list de Path) y lineas_wicho
+    """
+    directorio = Path(directorio)
+    parametros = {'version': VERSION_BANCO, 'lineas': lineas, 'semilla': semilla}
+    ruta_parametros = directorio / 'parametros.json'
+    if ruta_parametros.exists():
+        guardados = json.loads(ruta_parametros.read_text(encoding='utf-8'))
+        if guardados['parametros'] == parametros:
+            return {
+                'wicho': directorio / guardados['wicho'],
+                'detalle': [directorio / nombre for nombre in guardados['detalle']],
+                'lineas_wicho': guardados['lineas_wicho']
+            }
+
+    shutil.rmtree(directorio, ignore_errors=True)
+    directorio.mkdir(parents=True)
+    generador = np.random.default_rng(semilla)
+
+    numeros_wicho = _numeros_wicho(lineas, generador)
+    ruta_wicho = directorio / 'wicho.xlsx'
+    generar_wicho(ruta_wicho, numeros_wicho, generador)
+
+    # Las coincidencias se toman con reemplazo, así que hay números repetidos
+    # dentro de un archivo y entre archivos
+    coincide = generador.random(lineas) < PROPORCION_COINCIDENCIAS
+    numeros = np.where(
+        coincide,
+        generador.choice(numeros_wicho, lineas),
+        5_000_000_000 + generador.integers(0, 1_000_000_000, lineas)
+    )
+
+    rutas_detalle = []
+    archivos = max(math.ceil(lineas / LINEAS_POR_ARCHIVO), MIN_ARCHIVOS)
+    for numero_archivo, numeros_archivo in enumerate(np.array_split(numeros, archivos)):
+        inicio = FECHA_BASE + timedelta(weeks=numero_archivo)
+        periodo = f"{inicio:%d/%m/%Y} AL {inicio + timedelta(days=6):%d/%m/%Y}"
+        ruta = directorio / f"detalle_{numero_archivo:03d}.xlsx"
+        columna = COLUMNAS_TELEFONO[numero_archivo % len(COLUMNAS_TELEFONO)]
+        generar_detalle(ruta, numeros_archivo, columna, periodo, generador)
+        rutas_detalle.append(ruta)
+
+    ruta_parametros.write_text(json.dumps({
+        'parametros': parametros,
+        'wicho': ruta_wicho.name,
+        'detalle': [ruta.name for ruta in rutas_detalle],
+        'lineas_wicho': len(numeros_wicho)
+    }, indent=1), encoding='utf-8')
+    return {'wicho': ruta_wicho, 'detalle': rutas_detalle, 'lineas_wicho': len(numeros_wicho)}
+
+
+@contextmanager
+def _cronometro(tiempos, etapa):
+    """Suma a tiempos[etapa] los segundos del bloque."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[etapa] = tiempos.get(etapa, 0.0) + time.perf_counter() - inicio
+
+
+def medir_tamano(directorio, lineas, semilla=0):
+    """
+    Mide cada etapa sobre los datos sintéticos de un tamaño.
+
+    Cada archivo de detalle pasa por lectura, cruce (búsqueda de todos los
+    números en el índice), depuración (primera fila de cada número) y armado
+    del resultado, como en procesamiento.procesar_detalle. Después se escribe
+    el libro de resultados, se registra en un libro mayor nuevo
+    (analisis_resultado) y se arman los marcos del análisis de pagados.
+
+    Args:
+        directorio (Path): Carpeta de los datos de este tamaño
+        lineas (int): Líneas de detalle en total
+        semilla (int): Semilla del generador
+
+    Returns:
+        dict: lineas, lineas_wicho, archivos, coincidencias y etapas
+            (segundos por etapa)
+    """
+    directorio = Path(directorio)
+    datos = preparar_datos(directorio / 'datos', lineas, semilla)
+
+    # Salidas de la corrida anterior
+    trabajo = directorio / 'corrida'
+    shutil.rmtree(trabajo, ignore_errors=True)
+    resultados = trabajo / 'Resultados'
+    resultados.mkdir(parents=True)
+
+    tiempos = {}
+    with _cronometro(tiempos, 'indice_wicho'):
+        indice_wicho = cargar_indice_wicho(datos['wicho'])
+
+    escritor = EscritorResultados(resultados / f"{FECHA_BASE:%Y%m%d}_analisis_chipExpress_({ESTADO_PAGADO}).xlsx")
+    try:
+        for ruta in datos['detalle']:
+            with _cronometro(tiempos, 'lectura'):
+                libro = leer_detalle(ruta, ESQUEMA_DETALLE)
+                compactar(libro.datos, ESQUEMA_DETALLE)
+            with _cronometro(tiempos, 'cruce'):
+                filas, posiciones = indice_wicho.localizar(libro.datos, libro.columna_numero)
+            with _cronometro(tiempos, 'depuracion'):
+                filas, posiciones = indice_wicho.depurar(filas, posiciones)
+            with _cronometro(tiempos, 'armado'):
+                encontradas = indice_wicho.armar(libro.datos, filas, posiciones)
+                encontradas['Archivo_Detalle'] = ruta.name
+                encontradas['Periodo'] = libro.periodo
+                compactar(encontradas, ESQUEMA_RESULTADO)
+            with _cronometro(tiempos, 'escritura'):
+                escritor.escribir(encontradas)
+            del libro, encontradas
+        with _cronometro(tiempos, 'escritura'):
+            escritura = escritor.cerrar()
+    except BaseException:
+        escritor.descartar()
+        raise
+
+    cache = CacheLibros(trabajo / 'cache_libros')
+    libro_mayor = LibroMayor(trabajo / 'libro_mayor.sqlite')
+    with _cronometro(tiempos, 'analisis_resultado'):
+        avisos = libro_mayor.sincronizar(resultados, cache, indice_wicho)
+    if avisos:
+        raise RuntimeError("; ".join(avisos))
+    with _cronometro(tiempos, 'analisis_pagados'):
+        construir_marcos(libro_mayor.resumen_por_archivo(ESTADO_PAGADO))
+
+    return {
+        'lineas': lineas,
+        'lineas_wicho': datos['lineas_wicho'],
+        'archivos': len(datos['detalle']),
+        'coincidencias': escritura['filas'] if escritura else 0,
+        'etapas': {etapa: round(tiempos.get(etapa, 0.0), 4) for etapa in ETAPAS}
+    }
+
+
+def ejecutar_banco(directorio, tamanos=('10k',), semilla=0, al_terminar=None):
+    """
+    Ejecuta la suite en los tamaños indicados.
+
+    Args:
+        directorio (Path): Carpeta de trabajo (datos generados y salidas)
+        tamanos (list): Claves de TAMANOS
+        semilla (int): Semilla del generador
+        al_terminar (callable): Se llama con (tamaño, medición) al terminar
+            cada tamaño
+
+    Returns:
+        dict: Resultados serializables a JSON
+    """
+    resultados = {
+        'version': VERSION_BANCO,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'semilla': semilla,
+        'entorno': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform()
+        },
+        'tamanos': {}
+    }
+    for tamano in tamanos:
+        medicion = medir_tamano(Path(directorio) / tamano, TAMANOS[tamano], semilla)
+        resultados['tamanos'][tamano] = medicion
+        if al_terminar:
+            al_terminar(tamano, medicion)
+    return resultados
+
+
+def guardar_resultados(resultados, ruta):
+    """Escribe los resultados de ejecutar_banco como JSON."""
+    Path(ruta).write_text(json.dumps(resultados, ensure_ascii=False, indent=1), encoding='utf-8')
+
+
+def cargar_resultados(ruta):
+    """Lee resultados guardados con guardar_resultados."""
+    return json.loads(Path(ruta).read_text(encoding='utf-8'))
+
+
+def comparar_resultados(actuales, base, tolerancia=0.15):
+    """
+    Compara dos corridas etapa por etapa.
+
+    Una etapa es una regresión si tarda más que la base en más de
+    `tolerancia` (proporción) y en más de MINIMO_SEGUNDOS_REGRESION.
+
+    Args:
+        actuales (dict): Resultados de ejecutar_banco
+        base (dict): Resultados guardados de referencia
+        tolerancia (float): Aumento relativo permitido
+
+    Returns:
+        list: Diccionarios con tamano, etapa, base, actual, cambio (proporción
+            respecto a la base) y regresion, para los tamaños y etapas
+            presentes en ambas corridas
+    """
+    comparacion = []
+    for tamano, medicion in actuales['tamanos'].items():
+        etapas_base = base.get('tamanos', {}).get(tamano, {}).get('etapas', {})
+        for etapa, segundos in medicion['etapas'].items():
+            if etapa not in etapas_base:
+                continue
+            segundos_base = etapas_base[etapa]
+            comparacion.append({
+                'tamano': tamano,
+                'etapa': etapa,
+                'base': segundos_base,
+                'actual': segundos,
+                'cambio': round(segundos / segundos_base - 1, 3) if segundos_base > 0 else None,
+                'regresion': (
+                    segundos > segundos_base * (1 + tolerancia)
+                    and segundos - segundos_base > MINIMO_SEGUNDOS_REGRESION
+                )
+            })
+    return comparacion
+
+
+def _megabytes(marcos):
+    return sum(df.memory_usage(deep=True).sum() for df in marcos) / (1024 * 1024)
+
+
+def medir_memoria(ruta_wicho, rutas_detalle):
+    """
+    Mide la memoria de los datos cargados sin y con el esquema de carga.
+
+    "antes" lee todas las columnas con los tipos que infiere pandas, como
+    pd.read_excel y leer_detalle sin columnas; "despues" lee como el
+    análisis (esquema.leer_wicho y procesamiento.procesar_detalle).
+
+    Args:
+        ruta_wicho (Path): Libro Wicho
+        rutas_detalle (list): Archivos de detalle
+
+    Returns:
+        list: Para wicho, detalle y resultado (líneas encontradas): filas,
+            columnas y MiB antes y después
+    """
+    hojas_antes = pd.read_excel(ruta_wicho, sheet_name=None)
+    hojas_despues = leer_wicho(ruta_wicho)
+    indice_antes = IndiceWicho.construir(hojas_antes)
+    indice_despues = IndiceWicho.construir(hojas_despues)
+
+    detalle_antes, detalle_despues = [], []
+    resultado_antes, resultado_despues = [], []
+    for ruta in rutas_detalle:
+        libro = leer_detalle(ruta)
+        detalle_antes.append(libro.datos)
+        if libro.columna_numero:
+            encontradas = indice_antes.cruzar(libro.datos, libro.columna_numero)
+            if not encontradas.empty:
+                encontradas['Archivo_Detalle'] = Path(ruta).name
+                encontradas['Periodo'] = libro.periodo
+                resultado_antes.append(encontradas)
+
+        libro = leer_detalle(ruta, ESQUEMA_DETALLE)
+        detalle_despues.append(compactar(libro.datos, ESQUEMA_DETALLE))
+        resultado = procesar_detalle(indice_despues, ruta)
+        if resultado.estado == OK:
+            resultado_despues.append(resultado.datos)
+
+    def fila(fuente, antes, despues):
+        return {
+            'fuente': fuente,
+            'filas': int(sum(len(df) for df in antes)),
+            'columnas_antes': len({c for df in antes for c in df.columns}),
+            'columnas_despues': len({c for df in despues for c in df.columns}),
+            'mb_antes': round(_megabytes(antes), 2),
+            'mb_despues': round(_megabytes(despues), 2)
+        }
+
+    return [
+        fila('wicho', hojas_antes.values(), hojas_despues.values()),
+        fila('detalle', detalle_antes, detalle_despues),
+        fila('resultado', resultado_antes, resultado_despues)
+    ]
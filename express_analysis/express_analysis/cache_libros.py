@@ -0,0 +1,188 @@
+"""
+Caché persistente de libros de Excel ya parseados.
+
+Cada libro se convierte una sola vez a un archivo Parquet ("sidecar") y las
+lecturas siguientes se sirven desde ahí sin pasar por openpyxl. El sidecar se
+nombra con el hash del contenido del libro, de modo que renombrar un archivo
+(por ejemplo al cambiar su estado de pago) no obliga a volver a parsearlo,
+y reemplazarlo por otro contenido genera automáticamente un sidecar nuevo.
+Al guardar el manifiesto se borran los sidecars de contenidos que ya no
+corresponden a ningún archivo conocido.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+TAMANO_BLOQUE_HASH = 1024 * 1024
+
+
+def calcular_hash_archivo(ruta):
+    """
+    Calcula el SHA-256 del contenido de un archivo leyéndolo por bloques.
+
+    Args:
+        ruta (Path): Ruta del archivo
+
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE_HASH), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+class CacheLibros:
+    """
+    Caché de DataFrames leídos de Excel respaldada por archivos Parquet.
+
+    El manifiesto guarda, por ruta, el tamaño, la fecha de modificación y el
+    hash del contenido. Mientras tamaño y fecha coincidan se confía en el hash
+    guardado; si cambian, se vuelve a calcular.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.archivo_manifiesto = self.directorio / "manifiesto.json"
+        self._lock = threading.Lock()
+        self._manifiesto = self._cargar_manifiesto()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _cargar_manifiesto(self):
+        try:
+            with open(self.archivo_manifiesto, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _guardar_manifiesto(self):
+        temporal = self.archivo_manifiesto.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._manifiesto, f, ensure_ascii=False, indent=1)
+        os.replace(temporal, self.archivo_manifiesto)
+
+        # Sidecars de versiones anteriores de libros que se modificaron
+        vigentes = {entrada['hash'] for entrada in self._manifiesto.values()}
+        for sidecar in self.directorio.glob("*.parquet"):
+            if sidecar.name.split('_', 1)[0] not in vigentes:
+                sidecar.unlink(missing_ok=True)
+
+    @staticmethod
+    def _clave(ruta):
+        return str(Path(ruta).resolve())
+
+    def hash_contenido(self, ruta):
+        """
+        Devuelve el hash del contenido de un archivo, recalculándolo solo si
+        su tamaño o fecha de modificación cambiaron desde la última vez.
+
+        Args:
+            ruta (Path): Ruta del archivo
+
+        Returns:
+            str: Hash hexadecimal del contenido
+        """
+        clave = self._clave(ruta)
+        info = os.stat(ruta)
+        with self._lock:
+            entrada = self._manifiesto.get(clave)
+            if entrada and entrada['tamano'] == info.st_size and entrada['mtime_ns'] == info.st_mtime_ns:
+                return entrada['hash']
+
+        hash_archivo = calcular_hash_archivo(ruta)
+        with self._lock:
+            self._manifiesto[clave] = {
+                'tamano': info.st_size,
+                'mtime_ns': info.st_mtime_ns,
+                'hash': hash_archivo
+            }
+            self._guardar_manifiesto()
+        return hash_archivo
+
+    def _ruta_sidecar(self, hash_archivo, opciones):
+        firma = json.dumps(opciones, sort_keys=True, default=str)
+        sufijo = hashlib.sha256(firma.encode()).hexdigest()[:8]
+        return self.directorio / f"{hash_archivo}_{sufijo}.parquet"
+
+    def leer_excel(self, ruta, **opciones):
+        """
+        Lee una hoja de Excel como pd.read_excel, usando el sidecar si existe.
+
+        Args:
+            ruta (Path): Ruta del libro
+            **opciones: Argumentos para pd.read_excel (una sola hoja)
+
+        Returns:
+            DataFrame: Contenido de la hoja
+        """
+        import pandas as pd
+
+        sidecar = self._ruta_sidecar(self.hash_contenido(ruta), opciones)
+
+        if sidecar.exists():
+            try:
+                df = pd.read_parquet(sidecar)
+                with self._lock:
+                    self.aciertos += 1
+                return df
+            except Exception:
+                # Sidecar dañado: se descarta y se regenera
+                sidecar.unlink(missing_ok=True)
+
+        with self._lock:
+            self.fallos += 1
+        df = pd.read_excel(ruta, **opciones)
+        return self._escribir_sidecar(df, sidecar)
+
+    def _escribir_sidecar(self, df, sidecar):
+        """
+        Escribe el sidecar de forma atómica y devuelve el DataFrame tal como
+        quedará al leerlo de vuelta, para que aciertos y fallos coincidan.
+        """
+        temporal = sidecar.with_suffix('.tmp')
+        try:
+            try:
+                df.to_parquet(temporal, index=False)
+            except ImportError:
+                # Sin motor de Parquet instalado la caché queda deshabilitada
+                return df
+            except Exception:
+                # Columnas con tipos mezclados (p. ej. números y texto en LOTE)
+                df = _normalizar_columnas_mixtas(df)
+                df.to_parquet(temporal, index=False)
+            os.replace(temporal, sidecar)
+        except Exception:
+            temporal.unlink(missing_ok=True)
+        return df
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: Contadores de aciertos y fallos de la caché
+        """
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'archivos_conocidos': len(self._manifiesto),
+                'sidecars': sum(1 for _ in self.directorio.glob("*.parquet"))
+            }
+
+
+def _normalizar_columnas_mixtas(df):
+    """Convierte a texto los valores de columnas object con tipos mezclados."""
+    import pandas as pd
+
+    df = df.copy()
+    for columna in df.columns:
+        if df[columna].dtype == object:
+            tipos = {type(v) for v in df[columna].dropna()}
+            if len(tipos) > 1:
+                df[columna] = df[columna].map(lambda v: v if pd.isna(v) else str(v))
+    return df
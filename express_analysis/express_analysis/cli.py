@@ -0,0 +1,350 @@
+"""
+Línea de comandos del análisis de comisiones.
+
+Ejecuta el mismo motor que la aplicación de Streamlit sobre una raíz de
+datos (Detalle/, Resultados/, Detalle historico/, archivo Wicho y Temp/),
+sin iniciar Streamlit, para poder programar el procesamiento con cron:
+
+    chips-express process --datos /srv/express_analysis --trabajadores 4
+    chips-express aggregate --datos /srv/express_analysis --estado PAGADO --formato-resumen csv
+    chips-express reindex --datos /srv/express_analysis --historico
+    chips-express bench --datos /srv/express_analysis --formato-resumen json
+    chips-express bench --sintetico 10k 100k --salida banco.json --base base.json
+    chips-express bench --memoria --datos /srv/express_analysis
+
+`--formato-resumen` solo cambia cómo se imprime el resumen de cada comando
+en la salida estándar; los libros de resultados siempre se escriben en
+.xlsx. Los commits en Git no se hacen desde aquí; el trabajo programado puede
+hacerlos después de `process`. El motor (y con él pandas) se importa dentro
+de cada comando, así que `--help` y los errores de argumentos responden sin
+esperar esas importaciones.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from .rutas import Rutas
+
+FORMATOS = ['texto', 'json', 'csv']
+
+# Estados de pago (libro_mayor.ESTADO_PAGADO y ESTADO_POR_PAGAR)
+ESTADOS = ['PAGADO', 'POR_PAGAR']
+
+
+def _imprimir(datos, formato):
+    """
+    Imprime un dict o un DataFrame en el formato pedido.
+
+    Args:
+        datos (dict | DataFrame): Resultado del comando
+        formato (str): 'texto', 'json' o 'csv'
+    """
+    import pandas as pd
+
+    if isinstance(datos, pd.DataFrame):
+        if formato == 'json':
+            print(datos.to_json(orient='records', force_ascii=False, indent=1))
+        elif formato == 'csv':
+            datos.to_csv(sys.stdout, index=False)
+        else:
+            print(datos.to_string(index=False) if not datos.empty else "(sin filas)")
+        return
+
+    if formato == 'json':
+        print(json.dumps(datos, ensure_ascii=False, indent=1, default=str))
+    elif formato == 'csv':
+        pd.DataFrame([datos]).to_csv(sys.stdout, index=False)
+    else:
+        for clave, valor in datos.items():
+            print(f"{clave}: {valor}")
+
+
+def _abrir(rutas):
+    from .cache_libros import CacheLibros
+    from .libro_mayor import LibroMayor
+
+    rutas.crear_directorios()
+    return CacheLibros(rutas.cache_libros), LibroMayor(rutas.libro_mayor, rutas.estados_pago)
+
+
+def _avance(resultado):
+    from .procesamiento import OK, SIN_COLUMNA, ERROR
+
+    if resultado.estado == OK:
+        detalle = f"{resultado.lineas} líneas"
+    elif resultado.estado == SIN_COLUMNA:
+        detalle = "sin columna de número de teléfono"
+    elif resultado.estado == ERROR:
+        detalle = f"error: {resultado.mensaje}"
+    else:
+        detalle = "sin coincidencias"
+    print(f"{resultado.archivo}: {detalle}", file=sys.stderr)
+
+
+def comando_process(rutas, argumentos):
+    """Analiza los archivos pendientes de Detalle/."""
+    from .analisis import FILAS_POR_BLOQUE, SinArchivosPendientes, analizar_carpetas
+    from .metricas import RegistroMetricas
+
+    cache, libro_mayor = _abrir(rutas)
+    try:
+        resumen = analizar_carpetas(
+            rutas,
+            cache,
+            libro_mayor,
+            trabajadores=argumentos.trabajadores,
+            filas_por_bloque=FILAS_POR_BLOQUE if argumentos.por_bloques else None,
+            al_terminar=_avance,
+            corrida=RegistroMetricas(rutas.metricas).corrida('analisis')
+        )
+    except SinArchivosPendientes as e:
+        # Sin trabajo no es un error para una ejecución programada
+        print(str(e), file=sys.stderr)
+        return 0
+    _imprimir(resumen, argumentos.formato)
+    return 0
+
+
+def comando_aggregate(rutas, argumentos):
+    """Totales por libro de resultados desde el libro mayor."""
+    cache, libro_mayor = _abrir(rutas)
+    for aviso in libro_mayor.sincronizar(rutas.resultados, cache):
+        print(aviso, file=sys.stderr)
+    _imprimir(libro_mayor.resumen_por_archivo(argumentos.estado), argumentos.formato)
+    return 0
+
+
+def comando_reindex(rutas, argumentos):
+    """Reconstruye los gemelos Parquet y el libro mayor."""
+    from .gemelos import respaldar_gemelos
+
+    if argumentos.desde_cero and rutas.libro_mayor.exists():
+        rutas.libro_mayor.unlink()
+    cache, libro_mayor = _abrir(rutas)
+
+    inicio = time.perf_counter()
+    creados, errores = respaldar_gemelos(rutas.resultados, cache)
+    for error in errores:
+        print(error, file=sys.stderr)
+    avisos = libro_mayor.sincronizar(rutas.resultados, cache)
+    for aviso in avisos:
+        print(aviso, file=sys.stderr)
+
+    resumen = {'gemelos_creados': creados, 'errores_gemelos': len(errores), 'avisos': len(avisos)}
+    if argumentos.historico:
+        from .analisis import cargar_indice_wicho
+
+        importados, avisos_historico = libro_mayor.importar_historico(rutas.historico, cargar_indice_wicho(rutas.wicho))
+        for aviso in avisos_historico:
+            print(aviso, file=sys.stderr)
+        resumen['historico_importados'] = importados
+    resumen.update(libro_mayor.estadisticas())
+    resumen['segundos'] = round(time.perf_counter() - inicio, 2)
+    _imprimir(resumen, argumentos.formato)
+    return 0
+
+
+def comando_bench(rutas, argumentos):
+    """Mide el cruce de archivos de detalle sin escribir resultados."""
+    if argumentos.arranque:
+        return comando_arranque(argumentos)
+    if argumentos.sintetico:
+        return comando_banco(rutas, argumentos)
+
+    from .analisis import FILAS_POR_BLOQUE, archivos_pendientes, cargar_indice_wicho
+    from .procesamiento import iterar_lote
+
+    carpeta = Path(argumentos.carpeta) if argumentos.carpeta else rutas.historico
+    rutas_detalle = archivos_pendientes(carpeta)[:argumentos.limite or None]
+    if argumentos.memoria:
+        return comando_memoria(rutas, rutas_detalle, argumentos)
+
+    inicio = time.perf_counter()
+    indice_wicho = cargar_indice_wicho(rutas.wicho)
+    segundos_indice = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lineas = 0
+    for resultado in iterar_lote(
+        indice_wicho,
+        rutas_detalle,
+        argumentos.trabajadores,
+        FILAS_POR_BLOQUE if argumentos.por_bloques else None
+    ):
+        lineas += resultado.lineas
+    segundos_cruce = time.perf_counter() - inicio
+
+    _imprimir({
+        'archivos': len(rutas_detalle),
+        'trabajadores': argumentos.trabajadores,
+        'lineas_encontradas': lineas,
+        'segundos_indice_wicho': round(segundos_indice, 3),
+        'segundos_cruce': round(segundos_cruce, 3),
+        'archivos_por_segundo': round(len(rutas_detalle) / segundos_cruce, 2) if segundos_cruce > 0 else None
+    }, argumentos.formato)
+    return 0
+
+
+def comando_arranque(argumentos):
+    """Mide la importación en frío de los módulos del motor."""
+    from .arranque import medir_importaciones
+
+    mediciones = medir_importaciones()
+    if argumentos.formato == 'texto':
+        for medicion in mediciones:
+            tiempo = "no se pudo importar" if medicion['milisegundos'] is None else f"{medicion['milisegundos']:.0f} ms"
+            marca = "ok" if medicion['dentro_presupuesto'] else "FUERA DE PRESUPUESTO"
+            print(f"{medicion['modulo']}: {tiempo}, presupuesto {medicion['presupuesto_ms']} ms ({marca})")
+    else:
+        import pandas as pd
+
+        _imprimir(pd.DataFrame(mediciones), argumentos.formato)
+    return 0 if all(medicion['dentro_presupuesto'] for medicion in mediciones) else 1
+
+
+def comando_memoria(rutas, rutas_detalle, argumentos):
+    """Compara la memoria de los datos leídos completos y con el esquema de carga."""
+    import pandas as pd
+
+    from .banco import medir_memoria
+
+    _imprimir(pd.DataFrame(medir_memoria(rutas.wicho, rutas_detalle)), argumentos.formato)
+    return 0
+
+
+def comando_banco(rutas, argumentos):
+    """Ejecuta la suite sintética y la compara con una corrida de referencia."""
+    from .banco import cargar_resultados, comparar_resultados, ejecutar_banco, guardar_resultados
+
+    def al_terminar(tamano, medicion):
+        etapas = ", ".join(f"{etapa} {segundos:.2f}s" for etapa, segundos in medicion['etapas'].items())
+        print(f"{tamano}: {medicion['coincidencias']} coincidencias; {etapas}", file=sys.stderr)
+
+    resultados = ejecutar_banco(rutas.temp / "banco", argumentos.sintetico, argumentos.semilla, al_terminar)
+    if argumentos.salida:
+        guardar_resultados(resultados, argumentos.salida)
+
+    if not argumentos.base:
+        _imprimir(resultados if argumentos.formato == 'json' else _tabla_banco(resultados), argumentos.formato)
+        return 0
+
+    import pandas as pd
+
+    comparacion = pd.DataFrame(comparar_resultados(resultados, cargar_resultados(argumentos.base), argumentos.tolerancia))
+    _imprimir(comparacion, argumentos.formato)
+    return 1 if not comparacion.empty and comparacion['regresion'].any() else 0
+
+
+def _tabla_banco(resultados):
+    import pandas as pd
+
+    return pd.DataFrame([
+        {'tamano': tamano, 'etapa': etapa, 'segundos': segundos}
+        for tamano, medicion in resultados['tamanos'].items()
+        for etapa, segundos in medicion['etapas'].items()
+    ])
+
+
+def crear_parser():
+    """
+    Returns:
+        ArgumentParser: Parser con los subcomandos process, aggregate,
+            reindex y bench
+    """
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument(
+        '--datos',
+        default=os.environ.get('CHIPS_EXPRESS_DATOS', '.'),
+        help="Raíz de datos con Detalle/, Resultados/ y el archivo Wicho (por defecto la carpeta actual "
+             "o CHIPS_EXPRESS_DATOS)"
+    )
+    comunes.add_argument(
+        '--formato-resumen', dest='formato', choices=FORMATOS, default='texto',
+        help="Formato del resumen que se imprime en la salida estándar (no cambia los libros de resultados, "
+             "que siempre son .xlsx)"
+    )
+    # Nombre anterior de --formato-resumen, para las tareas programadas que ya lo usan
+    comunes.add_argument('--formato', dest='formato', choices=FORMATOS, default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+
+    parser = argparse.ArgumentParser(
+        prog="chips-express",
+        description="Análisis de comisiones de Chips Express sin interfaz"
+    )
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    def opciones_lectura(subparser):
+        subparser.add_argument(
+            '--trabajadores', type=int, default=1,
+            help="Procesos para leer y cruzar los archivos de detalle (1 = en serie)"
+        )
+        subparser.add_argument(
+            '--por-bloques', action='store_true',
+            help="Leer cada archivo de detalle por bloques de filas para acotar la memoria"
+        )
+
+    process = subparsers.add_parser('process', parents=[comunes], help="Analiza los archivos pendientes de Detalle/")
+    opciones_lectura(process)
+    process.set_defaults(funcion=comando_process)
+
+    aggregate = subparsers.add_parser('aggregate', parents=[comunes], help="Totales por libro de resultados")
+    aggregate.add_argument('--estado', choices=ESTADOS, help="Solo libros con este estado")
+    aggregate.set_defaults(funcion=comando_aggregate)
+
+    reindex = subparsers.add_parser('reindex', parents=[comunes], help="Reconstruye los gemelos Parquet y el libro mayor")
+    reindex.add_argument('--desde-cero', action='store_true', help="Borra el libro mayor antes de reconstruirlo")
+    reindex.add_argument('--historico', action='store_true', help="Importa también Detalle historico")
+    reindex.set_defaults(funcion=comando_reindex)
+
+    bench = subparsers.add_parser('bench', parents=[comunes], help="Mide el cruce de archivos de detalle sin escribir resultados")
+    opciones_lectura(bench)
+    bench.add_argument('--carpeta', help="Carpeta de archivos de detalle (por defecto Detalle historico)")
+    bench.add_argument('--limite', type=int, help="Máximo de archivos a cruzar")
+    bench.add_argument(
+        '--arranque', action='store_true',
+        help="Mide la importación en frío de los módulos del motor contra el presupuesto de cada uno "
+             "(express_analysis/arranque.py); sale con código 1 si alguno lo excede"
+    )
+    bench.add_argument(
+        '--sintetico', nargs='+', choices=['10k', '100k', '1M'],
+        help="Ejecuta la suite con datos sintéticos de estos tamaños (generados en Temp/banco)"
+    )
+    bench.add_argument(
+        '--memoria', action='store_true',
+        help="Compara la memoria de Wicho y de los archivos de detalle leídos completos y con el esquema de carga"
+    )
+    bench.add_argument('--semilla', type=int, default=0, help="Semilla de los datos sintéticos")
+    bench.add_argument('--salida', help="Guarda los resultados de la suite en este JSON")
+    bench.add_argument(
+        '--base',
+        help="JSON de una corrida anterior; compara etapa por etapa y sale con código 1 si alguna empeoró"
+    )
+    bench.add_argument(
+        '--tolerancia', type=float, default=0.15,
+        help="Aumento relativo permitido por etapa al comparar con --base (por defecto 0.15)"
+    )
+    bench.set_defaults(funcion=comando_bench)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Punto de entrada de `chips-express`.
+
+    Returns:
+        int: Código de salida
+    """
+    argumentos = crear_parser().parse_args(argv)
+    try:
+        return argumentos.funcion(Rutas(Path(argumentos.datos)), argumentos)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
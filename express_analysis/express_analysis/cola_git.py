@@ -0,0 +1,213 @@
+"""
+Cola de persistencia en Git con push en segundo plano.
+
+Cada lote de archivos (por ejemplo los detalles subidos más el resultado
+generado) se guarda en un solo commit. Los commits y el push los hace un hilo
+trabajador: la página solo encola el lote y sigue. Si hay varios lotes en
+cola se confirman uno tras otro y se suben con un único push; si el push
+falla se reintenta con espera creciente y los commits nuevos se suben junto
+con los pendientes.
+
+Cada commit incluye solo las rutas de su lote, aunque haya otros cambios en
+el índice. El push va al remoto y la rama indicados o, si no se indican, a la
+rama remota que sigue la rama actual.
+"""
+
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from .metricas import Corrida
+
+ESPERA_REINTENTO_INICIAL = 30
+ESPERA_REINTENTO_MAXIMA = 600
+
+
+class ColaGit:
+    """
+    Cola de lotes a confirmar y subir a Git.
+
+    Atributos:
+        directorio (Path): Directorio dentro del repositorio donde se ejecuta git
+        remoto (str): Remoto al que se hace push; None para el de la rama
+            remota que sigue la rama actual
+        rama (str): Rama remota a la que se hace push; None para la que
+            sigue la rama actual
+        metricas (RegistroMetricas): Opcional, donde se registra la duración
+            de cada commit y de cada push
+    """
+
+    def __init__(self, directorio, remoto=None, rama=None, metricas=None):
+        self.directorio = Path(directorio)
+        self.remoto = remoto
+        self.rama = rama
+        self.metricas = metricas
+        self._lotes = deque()
+        self._condicion = threading.Condition()
+        self._hilo = None
+        self._commits_sin_push = 0
+        self._espera = ESPERA_REINTENTO_INICIAL
+        self._proximo_intento = 0.0
+        self._ultimo_commit = None
+        self._ultimo_push = None
+
+    def encolar(self, rutas, mensaje):
+        """
+        Agrega un lote a la cola sin esperar a Git.
+
+        Args:
+            rutas (list): Archivos del lote; los que ya no existen se quitan
+                del repositorio (por ejemplo los detalles movidos al histórico)
+            mensaje (str): Mensaje del commit
+        """
+        rutas = [Path(r) for r in rutas]
+        if not rutas:
+            return
+        with self._condicion:
+            self._lotes.append((rutas, mensaje))
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._trabajar, name="cola-git", daemon=True)
+                self._hilo.start()
+            self._condicion.notify()
+
+    def estado(self):
+        """
+        Returns:
+            dict: Lotes en cola, commits sin subir, último commit y último push
+                ({'fecha', 'ok', 'mensaje'} o None)
+        """
+        with self._condicion:
+            return {
+                'lotes_en_cola': len(self._lotes),
+                'commits_sin_push': self._commits_sin_push,
+                'ultimo_commit': self._ultimo_commit,
+                'ultimo_push': self._ultimo_push
+            }
+
+    def _git(self, *argumentos):
+        return subprocess.run(
+            ['git', *argumentos],
+            capture_output=True,
+            text=True,
+            cwd=self.directorio
+        )
+
+    def _confirmar(self, rutas, mensaje):
+        """
+        Agrega las rutas del lote y hace un commit solo con ellas; el resto
+        del índice no se toca. Devuelve True si hubo commit.
+        """
+        relativas = []
+        for ruta in rutas:
+            relativa = str(ruta.relative_to(self.directorio)) if ruta.is_absolute() else str(ruta)
+            relativas.append(relativa)
+            if ruta.exists():
+                resultado = self._git('add', '--', relativa)
+            else:
+                resultado = self._git('rm', '--cached', '--ignore-unmatch', '-q', '--', relativa)
+            if resultado.returncode != 0:
+                raise RuntimeError(resultado.stderr.strip() or f"git add falló para {relativa}")
+
+        if self._git('diff', '--cached', '--quiet', '--', *relativas).returncode == 0:
+            return False
+        resultado = self._git('commit', '-m', mensaje, '--', *relativas)
+        if resultado.returncode != 0:
+            raise RuntimeError(resultado.stderr.strip() or resultado.stdout.strip())
+        return True
+
+    def _destino_push(self):
+        """
+        Returns:
+            tuple: (remoto, rama remota) del push
+
+        Raises:
+            RuntimeError: Si falta alguno y la rama actual no sigue una rama
+                remota
+        """
+        if self.remoto and self.rama:
+            return self.remoto, self.rama
+        resultado = self._git('rev-parse', '--abbrev-ref', '--symbolic-full-name', '@{u}')
+        if resultado.returncode != 0:
+            raise RuntimeError("La rama actual no sigue una rama remota; indica el remoto y la rama del push")
+        remoto, _, rama = resultado.stdout.strip().partition('/')
+        return self.remoto or remoto, self.rama or rama
+
+    def _registrar_push(self, ok, mensaje):
+        self._ultimo_push = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'ok': ok,
+            'mensaje': mensaje
+        }
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                while not self._lotes and not (
+                    self._commits_sin_push and time.monotonic() >= self._proximo_intento
+                ):
+                    espera = None
+                    if self._commits_sin_push:
+                        espera = max(self._proximo_intento - time.monotonic(), 0)
+                    self._condicion.wait(espera)
+                lotes = list(self._lotes)
+                self._lotes.clear()
+            corrida = Corrida(self.metricas, 'git')
+
+            # Confirmar todos los lotes acumulados, uno por commit
+            for rutas, mensaje in lotes:
+                try:
+                    with corrida.etapa('git_commit', filas=len(rutas)):
+                        hubo_commit = self._confirmar(rutas, mensaje)
+                    with self._condicion:
+                        self._ultimo_commit = {
+                            'fecha': datetime.now().isoformat(timespec='seconds'),
+                            'ok': True,
+                            'mensaje': mensaje if hubo_commit else f"Sin cambios: {mensaje}"
+                        }
+                        if hubo_commit:
+                            self._commits_sin_push += 1
+                except FileNotFoundError:
+                    with self._condicion:
+                        self._ultimo_commit = {
+                            'fecha': datetime.now().isoformat(timespec='seconds'),
+                            'ok': False,
+                            'mensaje': "Git no está disponible; los archivos quedan guardados localmente"
+                        }
+                except Exception as e:
+                    with self._condicion:
+                        self._ultimo_commit = {
+                            'fecha': datetime.now().isoformat(timespec='seconds'),
+                            'ok': False,
+                            'mensaje': f"{mensaje}: {str(e)}"
+                        }
+
+            with self._condicion:
+                if not self._commits_sin_push or time.monotonic() < self._proximo_intento:
+                    continue
+                por_subir = self._commits_sin_push
+
+            # Un solo push para todos los commits pendientes
+            with corrida.etapa('git_push', filas=por_subir) as medicion:
+                try:
+                    remoto, rama = self._destino_push()
+                    resultado = self._git('push', remoto, f'HEAD:{rama}')
+                    ok = resultado.returncode == 0
+                    detalle = f"{por_subir} commits subidos" if ok else resultado.stderr.strip()
+                except FileNotFoundError:
+                    ok, detalle = False, "Git no está disponible"
+                except RuntimeError as e:
+                    ok, detalle = False, str(e)
+                medicion['ok'] = ok
+
+            with self._condicion:
+                self._registrar_push(ok, detalle)
+                if ok:
+                    self._commits_sin_push -= por_subir
+                    self._espera = ESPERA_REINTENTO_INICIAL
+                    self._proximo_intento = 0.0
+                else:
+                    self._proximo_intento = time.monotonic() + self._espera
+                    self._espera = min(self._espera * 2, ESPERA_REINTENTO_MAXIMA)
@@ -0,0 +1,130 @@
+"""
+Escritor de libros de resultados en modo de memoria constante.
+
+Recibe las líneas encontradas archivo por archivo (es un sumidero de
+procesamiento.iterar_lote). Cada bloque se guarda en un archivo temporal y,
+al cerrar, los bloques se vuelcan uno a uno a un libro openpyxl en modo
+write-only, que escribe las filas directamente al disco. El libro se escribe
+primero con un nombre temporal y luego se renombra, así que en Resultados/
+nunca aparece un archivo a medio escribir. Con los mismos bloques se escribe
+después el gemelo Parquet del libro (ver gemelos.py).
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .cache_libros import calcular_hash_archivo
+from .gemelos import escribir_gemelo
+
+NOMBRE_HOJA = 'Sheet1'
+
+
+def _valores_columna(serie):
+    """Valores de una columna listos para openpyxl (None en lugar de NaN)."""
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        valores = pd.Series(serie.dt.to_pydatetime(), index=serie.index, dtype=object)
+    else:
+        valores = serie.astype(object)
+    return valores.where(serie.notna(), None).tolist()
+
+
+class EscritorResultados:
+    """
+    Sumidero que escribe el libro de resultados sin cargarlo en memoria.
+
+    Las columnas del libro son la unión de las columnas de todos los bloques
+    en orden de aparición, igual que pd.concat.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.lineas = 0
+        self.columnas = []
+        self._bloques = []
+        self._directorio = Path(tempfile.mkdtemp(prefix=".bloques_", dir=self.ruta.parent))
+
+    def escribir(self, datos):
+        """
+        Guarda un bloque de líneas en el área temporal.
+
+        Args:
+            datos (DataFrame): Líneas encontradas de un archivo
+        """
+        ruta_bloque = self._directorio / f"{len(self._bloques):05d}.pkl"
+        datos.to_pickle(ruta_bloque)
+        self._bloques.append(ruta_bloque)
+        self.lineas += len(datos)
+        for columna in datos.columns:
+            if columna not in self.columnas:
+                self.columnas.append(columna)
+
+    def descartar(self):
+        """Elimina los bloques recibidos sin escribir el libro."""
+        self._bloques = []
+        shutil.rmtree(self._directorio, ignore_errors=True)
+
+    def cerrar(self):
+        """
+        Escribe el libro final y lo mueve a su ruta definitiva, junto con su
+        gemelo Parquet.
+
+        Returns:
+            dict: Ruta, filas escritas, segundos y filas por segundo del libro,
+                y ruta del gemelo, o None si no se recibió ningún bloque
+        """
+        try:
+            if not self._bloques:
+                return None
+
+            from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font
+
+            inicio = time.perf_counter()
+            libro = Workbook(write_only=True)
+            hoja = libro.create_sheet(NOMBRE_HOJA)
+
+            encabezado = []
+            for columna in self.columnas:
+                celda = WriteOnlyCell(hoja, value=str(columna))
+                celda.font = Font(bold=True)
+                encabezado.append(celda)
+            hoja.append(encabezado)
+
+            for ruta_bloque in self._bloques:
+                bloque = pd.read_pickle(ruta_bloque).reindex(columns=self.columnas)
+                columnas = [_valores_columna(bloque[c]) for c in bloque.columns]
+                for fila in zip(*columnas):
+                    hoja.append(fila)
+                del bloque, columnas
+
+            temporal = self.ruta.with_name(f".{self.ruta.name}.tmp")
+            try:
+                libro.save(temporal)
+                os.replace(temporal, self.ruta)
+            finally:
+                if temporal.exists():
+                    temporal.unlink()
+
+            segundos = time.perf_counter() - inicio
+
+            gemelo = escribir_gemelo(
+                (pd.read_pickle(ruta_bloque) for ruta_bloque in self._bloques),
+                self.columnas,
+                self.ruta,
+                calcular_hash_archivo(self.ruta)
+            )
+            return {
+                'ruta': self.ruta,
+                'gemelo': gemelo,
+                'filas': self.lineas,
+                'segundos': segundos,
+                'filas_por_segundo': self.lineas / segundos if segundos > 0 else 0.0
+            }
+        finally:
+            shutil.rmtree(self._directorio, ignore_errors=True)
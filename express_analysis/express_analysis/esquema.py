@@ -0,0 +1,111 @@
+"""
+Esquema de carga de los libros Wicho y de detalle.
+
+Declara las columnas que usan el cruce, el libro mayor y el libro de
+resultados, y el tipo con el que se guardan en memoria. Las demás columnas
+(celdas sueltas fuera de la tabla, columnas 'Unnamed: n') no se leen. Para
+agregar una columna al libro de resultados hay que declararla aquí.
+
+Tipos:
+    'categoria': textos que se repiten en muchas filas (fuerza de venta,
+        estatus, evaluación, archivo de origen); se guardan como categóricos
+    'entero': enteros que se reducen al tipo más chico que los contiene
+    None: se conservan tal como se leyeron (teléfonos, ICCID y fechas)
+"""
+
+import pandas as pd
+
+from .indice_wicho import COLUMNA_CEL
+from .lector_detalle import COLUMNAS_TELEFONO
+
+ESQUEMA_WICHO = {
+    'NO ': 'entero',
+    'ICCID': None,
+    COLUMNA_CEL: None,
+    'FECHA PREACT': 'categoria',
+    'LOTE': 'entero',
+    'CLIENTE': 'categoria',
+    'FECHA VENTA': 'categoria',
+    'FECHA 1ER RECARGA': 'categoria',
+}
+
+ESQUEMA_DETALLE = {
+    **dict.fromkeys(COLUMNAS_TELEFONO),
+    'Fuerza de venta': 'categoria',
+    'Fuerza de venta 1': 'categoria',
+    'Fuerza de venta 2': 'categoria',
+    'Fuerza de venta 3': 'categoria',
+    'Fuerza de Venta 1 Actual': 'categoria',
+    'Fuerza de Venta 2 Actual': 'categoria',
+    'Fuerza de Venta 3 Actual': 'categoria',
+    'Producto': 'categoria',
+    'ICCID': None,
+    'Estatus actual de la línea': 'categoria',
+    'Fecha de activación': None,
+    'Fecha de primer ingreso': None,
+    'Fecha Primera Recarga': None,
+    'Fecha primera llamada con costo': None,
+    'Mes de primer ingres': 'categoria',
+    'Evaluación': 'categoria',
+    'Número de evaluación aplicable': 'categoria',
+    'Comisión': 'entero',
+    'Comisión a pagar': 'entero',
+    'Estatus de la comisión': 'categoria',
+    'Estatus de comisión': 'categoria',
+}
+
+# Columnas del cruce: las de Wicho, las del detalle y las que agrega el
+# procesamiento. Las columnas repetidas llevan sufijo (ICCID_x, ICCID_y) y
+# se conservan como se leyeron.
+ESQUEMA_RESULTADO = {
+    **ESQUEMA_WICHO,
+    **ESQUEMA_DETALLE,
+    'Archivo_Detalle': 'categoria',
+    'Periodo': 'categoria',
+}
+
+
+def compactar(df, esquema):
+    """
+    Convierte las columnas de `df` a los tipos de `esquema`, en su lugar.
+
+    Solo se convierten los textos (a categórico) y los enteros (al entero más
+    chico); una columna con otro tipo, por ejemplo una de textos que pandas
+    leyó como fechas, se deja igual.
+
+    Args:
+        df (DataFrame): Marco a compactar
+        esquema (dict): Tipo de cada columna (ver el docstring del módulo)
+
+    Returns:
+        DataFrame: El mismo `df`
+    """
+    for columna in df.columns:
+        tipo = esquema.get(columna)
+        serie = df[columna]
+        if tipo == 'categoria':
+            if pd.api.types.is_object_dtype(serie.dtype) or pd.api.types.is_string_dtype(serie.dtype):
+                df[columna] = serie.astype('category')
+        elif tipo == 'entero':
+            if pd.api.types.is_integer_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+                df[columna] = pd.to_numeric(serie, downcast='integer')
+    return df
+
+
+def leer_wicho(origen):
+    """
+    Lee las hojas del libro Wicho con las columnas de ESQUEMA_WICHO.
+
+    Las hojas sin ninguna columna del esquema (los resúmenes) quedan vacías,
+    con 0 filas. No tienen 'CEL', así que el índice no las usa y los
+    metadatos no registran sus filas.
+
+    Args:
+        origen (Path | file): Ruta o archivo abierto del libro Wicho
+
+    Returns:
+        dict: DataFrame compactado por nombre de hoja, como
+            pd.read_excel(sheet_name=None)
+    """
+    hojas = pd.read_excel(origen, sheet_name=None, usecols=lambda columna: columna in ESQUEMA_WICHO)
+    return {nombre: compactar(df, ESQUEMA_WICHO) for nombre, df in hojas.items()}
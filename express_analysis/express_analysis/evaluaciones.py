@@ -0,0 +1,91 @@
+"""
+Clasificación de la columna 'Evaluación' por fase.
+
+Los textos de evaluación varían entre archivos ("1ra Evaluación", "Primera",
+"1°", ...). Cada texto distinto se clasifica una sola vez con las expresiones
+de PATRONES_FASE y el resultado queda en caché, así que una columna se
+clasifica con un factorize y una indexación, sin recorrer el texto de cada
+fila con cuatro expresiones regulares. Los conteos y comisiones por fase
+salen después de un solo groupby.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Variaciones de nombre de cada evaluación (fase 1 a 4)
+PATRONES_FASE = {
+    1: '1ra|primera|1a|1°|1º',
+    2: '2da|segunda|2a|2°|2º',
+    3: '3ra|tercera|3a|3°|3º',
+    4: '4ta|cuarta|4a|4°|4º'
+}
+
+# Fase de una evaluación no reconocida
+FASE_DESCONOCIDA = 0
+
+# Categórico ordinal de fases: 0 (desconocida) y 1 a 4
+TIPO_FASE = pd.CategoricalDtype([FASE_DESCONOCIDA, 1, 2, 3, 4], ordered=True)
+
+_EXPRESIONES_FASE = {fase: re.compile(patron) for fase, patron in PATRONES_FASE.items()}
+
+
+@lru_cache(maxsize=4096)
+def fase_de_texto(texto):
+    """
+    Args:
+        texto (str): Valor de 'Evaluación'
+
+    Returns:
+        int: Fase 1 a 4, o FASE_DESCONOCIDA; si coincide con varias gana la
+            más baja
+    """
+    texto = texto.lower()
+    for fase, expresion in _EXPRESIONES_FASE.items():
+        if expresion.search(texto):
+            return fase
+    return FASE_DESCONOCIDA
+
+
+def clasificar_evaluaciones(serie):
+    """
+    Clasifica una columna 'Evaluación' por fase.
+
+    Args:
+        serie (Series): Columna 'Evaluación'
+
+    Returns:
+        Series: Categórico TIPO_FASE con el mismo índice que `serie`
+    """
+    codigos, distintos = pd.factorize(serie, use_na_sentinel=True)
+    fases_distintas = np.array(
+        [fase_de_texto(str(valor)) for valor in distintos] + [FASE_DESCONOCIDA],
+        dtype='int8'
+    )
+    # El código -1 (valor vacío) toma el último elemento: FASE_DESCONOCIDA
+    fases = fases_distintas[codigos]
+    return pd.Series(
+        pd.Categorical.from_codes(fases, dtype=TIPO_FASE),
+        index=serie.index,
+        name='Fase'
+    )
+
+
+def totales_por_evaluacion(datos):
+    """
+    Líneas y comisión por fase con un solo groupby.
+
+    Args:
+        datos (DataFrame): Líneas con las columnas 'Evaluación' y 'Comisión'
+
+    Returns:
+        DataFrame: Índice de fases 0 a 4 (todas, aunque no tengan líneas) y
+            columnas 'lineas' y 'comision'
+    """
+    fases = clasificar_evaluaciones(datos['Evaluación'])
+    comisiones = pd.to_numeric(datos['Comisión'], errors='coerce')
+    return comisiones.groupby(fases, observed=False).agg(['size', 'sum']).rename(
+        columns={'size': 'lineas', 'sum': 'comision'}
+    )
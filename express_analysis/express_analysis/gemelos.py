@@ -0,0 +1,215 @@
+"""
+Gemelos Parquet de los libros de resultados.
+
+Junto a cada `..._analisis_chipExpress_(ESTADO).xlsx` se guarda un archivo
+`.parquet` con el mismo nombre, comprimido y con tipos explícitos. El
+dashboard lee del gemelo solo las columnas que necesita en lugar de parsear
+el libro completo con openpyxl. El gemelo guarda en sus metadatos el hash del
+libro del que salió y la versión del formato; si el libro cambia o el
+formato es otro, el gemelo se considera vencido y se regenera.
+"""
+
+import os
+from pathlib import Path
+
+# Columnas que usa el dashboard
+COLUMNAS_DASHBOARD = ['Evaluación', 'Comisión', 'Fecha Primera Recarga']
+
+# Tipos explícitos de las columnas conocidas; el resto se guarda como texto.
+# 'CEL' también va como texto: puede traer espacios o prefijo y se normaliza
+# al leerlo (indice_wicho.normalizar_telefonos), no al guardarlo.
+TIPOS_COLUMNAS = {
+    'Evaluación': 'texto',
+    'Comisión': 'decimal',
+    'Fecha Primera Recarga': 'fecha',
+    'CEL': 'texto'
+}
+
+# Versión del formato; al cambiar TIPOS_COLUMNAS se incrementa para que los
+# gemelos anteriores se regeneren
+VERSION_GEMELO = 2
+
+CLAVE_HASH_ORIGEN = b'hash_origen'
+CLAVE_VERSION = b'version_gemelo'
+COMPRESION = 'zstd'
+
+
+def ruta_gemelo(ruta_libro):
+    """Ruta del gemelo Parquet de un libro de resultados."""
+    return Path(ruta_libro).with_suffix('.parquet')
+
+
+def _tipo_arrow(tipo):
+    import pyarrow as pa
+
+    return {
+        'texto': pa.string(),
+        'decimal': pa.float64(),
+        'fecha': pa.timestamp('us'),
+        'entero': pa.int64()
+    }[tipo]
+
+
+def esquema_gemelo(columnas, hash_origen):
+    """
+    Esquema Arrow del gemelo.
+
+    Args:
+        columnas (list): Columnas del libro de resultados
+        hash_origen (str): Hash del libro, guardado en los metadatos junto
+            con VERSION_GEMELO
+
+    Returns:
+        pyarrow.Schema: Esquema con los tipos de TIPOS_COLUMNAS
+    """
+    import pyarrow as pa
+
+    campos = [pa.field(str(c), _tipo_arrow(TIPOS_COLUMNAS.get(str(c), 'texto'))) for c in columnas]
+    return pa.schema(campos, metadata={
+        CLAVE_HASH_ORIGEN: hash_origen.encode(),
+        CLAVE_VERSION: str(VERSION_GEMELO).encode()
+    })
+
+
+def tipar_bloque(df, columnas):
+    """
+    Convierte un bloque de resultados a los tipos del gemelo.
+
+    Args:
+        df (DataFrame): Bloque de resultados
+        columnas (list): Columnas finales del libro
+
+    Returns:
+        DataFrame: Bloque con todas las columnas y tipos explícitos
+    """
+    import pandas as pd
+
+    df = df.reindex(columns=columnas)
+    tipado = {}
+    for columna in columnas:
+        serie = df[columna]
+        tipo = TIPOS_COLUMNAS.get(str(columna), 'texto')
+        if tipo == 'decimal':
+            serie = pd.to_numeric(serie, errors='coerce').astype('float64')
+        elif tipo == 'entero':
+            serie = pd.to_numeric(serie, errors='coerce').round().astype('Int64')
+        elif tipo == 'fecha':
+            serie = pd.to_datetime(serie, errors='coerce')
+        else:
+            serie = serie.astype('string')
+        tipado[str(columna)] = serie
+    return pd.DataFrame(tipado)
+
+
+def escribir_gemelo(bloques, columnas, ruta_libro, hash_origen):
+    """
+    Escribe el gemelo de un libro a partir de sus bloques, uno a la vez.
+
+    Args:
+        bloques (iterable): DataFrames con las filas del libro, en orden
+        columnas (list): Columnas del libro
+        ruta_libro (Path): Ruta del libro de resultados
+        hash_origen (str): Hash del contenido del libro
+
+    Returns:
+        Path: Ruta del gemelo
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    destino = ruta_gemelo(ruta_libro)
+    temporal = destino.with_name(f".{destino.name}.tmp")
+    esquema = esquema_gemelo(columnas, hash_origen)
+    try:
+        with pq.ParquetWriter(temporal, esquema, compression=COMPRESION) as escritor:
+            for bloque in bloques:
+                tabla = pa.Table.from_pandas(tipar_bloque(bloque, columnas), schema=esquema, preserve_index=False)
+                escritor.write_table(tabla)
+        os.replace(temporal, destino)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+    return destino
+
+
+def leer_gemelo(ruta_libro, hash_origen, columnas=None):
+    """
+    Lee columnas del gemelo de un libro si existe y está al día.
+
+    Args:
+        ruta_libro (Path): Ruta del libro de resultados
+        hash_origen (str): Hash actual del libro
+        columnas (list): Columnas a leer; las que no existan se omiten
+
+    Returns:
+        DataFrame: Columnas pedidas, o None si no hay gemelo vigente (de
+            este libro y de VERSION_GEMELO)
+    """
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    destino = ruta_gemelo(ruta_libro)
+    if not destino.exists():
+        return None
+    try:
+        esquema = pq.read_schema(destino)
+    except Exception:
+        return None
+    metadatos = esquema.metadata or {}
+    if metadatos.get(CLAVE_HASH_ORIGEN) != hash_origen.encode():
+        return None
+    if metadatos.get(CLAVE_VERSION) != str(VERSION_GEMELO).encode():
+        return None
+    if columnas is not None:
+        columnas = [c for c in columnas if c in esquema.names]
+    return pd.read_parquet(destino, columns=columnas)
+
+
+def leer_resultado(ruta_libro, cache, columnas=COLUMNAS_DASHBOARD):
+    """
+    Lee columnas de un libro de resultados a través de su gemelo, creándolo
+    primero si no existe o está vencido.
+
+    Args:
+        ruta_libro (Path): Ruta del libro de resultados
+        cache (CacheLibros): Caché para el hash y la lectura del libro
+        columnas (list): Columnas a leer
+
+    Returns:
+        DataFrame: Columnas pedidas que existan en el libro
+    """
+    hash_origen = cache.hash_contenido(ruta_libro)
+    df = leer_gemelo(ruta_libro, hash_origen, columnas)
+    if df is None:
+        libro = cache.leer_excel(ruta_libro)
+        escribir_gemelo([libro], list(libro.columns), ruta_libro, hash_origen)
+        df = leer_gemelo(ruta_libro, hash_origen, columnas)
+    return df
+
+
+def respaldar_gemelos(directorio, cache):
+    """
+    Crea los gemelos que falten o estén vencidos en una carpeta de resultados.
+
+    Args:
+        directorio (Path): Carpeta de resultados
+        cache (CacheLibros): Caché para el hash y la lectura de los libros
+
+    Returns:
+        tuple: (gemelos creados, lista de errores)
+    """
+    creados = 0
+    errores = []
+    for nombre in sorted(os.listdir(directorio)):
+        if not nombre.endswith('.xlsx') or nombre.startswith('~$'):
+            continue
+        ruta = Path(directorio) / nombre
+        try:
+            hash_origen = cache.hash_contenido(ruta)
+            if leer_gemelo(ruta, hash_origen, columnas=[]) is None:
+                libro = cache.leer_excel(ruta)
+                escribir_gemelo([libro], list(libro.columns), ruta, hash_origen)
+                creados += 1
+        except Exception as e:
+            errores.append(f"{nombre}: {str(e)}")
+    return creados, errores
@@ -0,0 +1,397 @@
+"""
+Índice de números de teléfono del archivo Wicho.
+
+El libro Wicho se compila una sola vez en un arreglo ordenado de claves uint64
+con la hoja y la fila donde aparece cada número por primera vez. Cada archivo
+de detalle se cruza contra ese índice con una búsqueda vectorizada
+(searchsorted) en lugar de hacer un pd.merge por hoja.
+
+Las columnas de teléfono llegan como enteros, flotantes (5512345678.0) o
+texto con espacios, guiones y prefijo de país ("+52 55 1234 5678"). Antes de
+cruzar, cada columna se normaliza de forma vectorizada a una clave canónica:
+el número nacional de 10 dígitos cuando trae el prefijo 52 o 521. Un número
+con menos de 10 dígitos (una lada o un prefijo sueltos, como 52) no es un
+teléfono y se rechaza. Los números que no se pueden normalizar se cuentan
+por motivo en lugar de perderse en silencio.
+
+El resultado es el mismo que concatenar los pd.merge de cada hoja con 'CEL'
+y aplicar drop_duplicates(subset='CEL'): por cada número se conserva la
+primera hoja y la primera fila de Wicho, y la primera fila del detalle. La
+única diferencia es que las celdas vacías y los números rechazados no
+cruzan: pd.merge sí emparejaba un 'CEL' vacío con un número vacío del
+detalle.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNA_CEL = 'CEL'
+
+# Dígitos del número nacional y prefijos de país que se quitan, por número
+# de dígitos con el prefijo (52 y el antiguo 521 de celulares)
+DIGITOS_NACIONALES = 10
+PREFIJOS_PAIS = {12: 52, 13: 521}
+
+# Mínimo y máximo de dígitos de un número de teléfono: el número nacional y
+# el largo máximo de E.164
+MIN_DIGITOS = DIGITOS_NACIONALES
+MAX_DIGITOS = 15
+
+# Motivos por los que se rechaza un número mal formado
+MOTIVOS_RECHAZO = ['no_numericos', 'decimales', 'fuera_de_rango']
+
+# Conteos de normalizar_telefonos: celdas vacías, rechazos por motivo,
+# números leídos de texto y números a los que se quitó el prefijo de país
+CONTEOS_TELEFONO = ['vacios', *MOTIVOS_RECHAZO, 'desde_texto', 'con_prefijo']
+
+# Separadores que se quitan de los números escritos como texto
+_SEPARADORES = r'[\s\-\.\(\)/]'
+
+
+def _normalizar_texto(textos, conteos):
+    """
+    Convierte a números los teléfonos escritos como texto.
+
+    Returns:
+        ndarray: Claves uint64 (0 si se rechazó o estaba vacío)
+    """
+    textos = textos.astype(str).str.strip()
+    vacios = (textos == '').to_numpy()
+    limpios = (
+        textos.str.replace(r'\.0+$', '', regex=True)
+        .str.replace(_SEPARADORES, '', regex=True)
+        .str.replace(r'^(\+|00)', '', regex=True)
+    )
+    digitos = limpios.str.fullmatch(r'\d+').to_numpy(dtype=bool) & ~vacios
+    en_rango = digitos & (limpios.str.len().to_numpy() <= MAX_DIGITOS)
+
+    claves = np.zeros(len(textos), dtype='uint64')
+    claves[en_rango] = limpios[en_rango].astype('uint64').to_numpy()
+    # Con ceros a la izquierda el texto puede ser largo y el número corto
+    cortos = en_rango & (claves < 10 ** (MIN_DIGITOS - 1))
+    claves[cortos] = 0
+    conteos['vacios'] += int(vacios.sum())
+    conteos['no_numericos'] += int((~digitos & ~vacios).sum())
+    conteos['fuera_de_rango'] += int((digitos & ~en_rango).sum() + cortos.sum())
+    conteos['desde_texto'] += int((claves > 0).sum())
+    return claves
+
+
+def normalizar_telefonos(serie):
+    """
+    Convierte una columna de teléfonos a claves canónicas uint64.
+
+    Enteros y flotantes enteros se toman tal cual; el texto se limpia de
+    espacios, separadores, un ".0" final y el "+" o "00" inicial. A todos se
+    les quita después el prefijo de país (ver PREFIJOS_PAIS). Los números
+    con menos de MIN_DIGITOS dígitos o más de MAX_DIGITOS se cuentan como
+    'fuera_de_rango'.
+
+    Args:
+        serie (Series): Columna con los números
+
+    Returns:
+        tuple: (arreglo uint64 de claves, arreglo bool de claves válidas,
+            dict con los conteos de CONTEOS_TELEFONO)
+    """
+    conteos = dict.fromkeys(CONTEOS_TELEFONO, 0)
+
+    if pd.api.types.is_integer_dtype(serie.dtype) and not serie.hasnans:
+        enteros = serie.to_numpy(dtype='int64')
+        en_rango = (enteros >= 10 ** (MIN_DIGITOS - 1)) & (enteros < 10 ** MAX_DIGITOS)
+        claves = np.where(en_rango, enteros, 0).astype('uint64')
+        conteos['fuera_de_rango'] += int((~en_rango).sum())
+    else:
+        valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        vacios = serie.isna().to_numpy()
+        numeros = np.isfinite(valores)
+        enteros = numeros & (valores == np.floor(valores))
+        en_rango = enteros & (valores >= 10 ** (MIN_DIGITOS - 1)) & (valores < 10 ** MAX_DIGITOS)
+
+        claves = np.zeros(len(valores), dtype='uint64')
+        claves[en_rango] = valores[en_rango].astype('uint64')
+        conteos['vacios'] += int(vacios.sum())
+        conteos['decimales'] += int((numeros & ~enteros).sum())
+        conteos['fuera_de_rango'] += int((enteros & ~en_rango).sum())
+
+        # Lo que no es número: texto con separadores o prefijo, o infinito
+        sin_numero = ~numeros & ~vacios
+        if sin_numero.any():
+            if pd.api.types.is_object_dtype(serie.dtype) or pd.api.types.is_string_dtype(serie.dtype):
+                claves[sin_numero] = _normalizar_texto(serie[sin_numero], conteos)
+            else:
+                conteos['fuera_de_rango'] += int(sin_numero.sum())
+
+    for digitos, prefijo in PREFIJOS_PAIS.items():
+        con_prefijo = (
+            (claves >= 10 ** (digitos - 1))
+            & (claves < 10 ** digitos)
+            & (claves // 10 ** DIGITOS_NACIONALES == prefijo)
+        )
+        claves[con_prefijo] %= np.uint64(10 ** DIGITOS_NACIONALES)
+        conteos['con_prefijo'] += int(con_prefijo.sum())
+
+    return claves, claves > 0, conteos
+
+
+def claves_telefono(serie):
+    """
+    Args:
+        serie (Series): Columna con los números
+
+    Returns:
+        tuple: (arreglo uint64 de claves, arreglo bool de claves válidas);
+            ver normalizar_telefonos
+    """
+    claves, validos, _ = normalizar_telefonos(serie)
+    return claves, validos
+
+
+def sumar_conteos(total, conteos):
+    """Acumula en `total` los conteos de normalizar_telefonos."""
+    for clave, valor in conteos.items():
+        total[clave] = total.get(clave, 0) + valor
+    return total
+
+
+def rechazados(conteos):
+    """Números mal formados en unos conteos de normalizar_telefonos."""
+    return sum(conteos.get(motivo, 0) for motivo in MOTIVOS_RECHAZO)
+
+
+def _primeras_ocurrencias(claves, orden):
+    """Índices (en `orden`) de la primera aparición de cada clave distinta."""
+    ordenadas = claves[orden]
+    inicio = np.ones(len(ordenadas), dtype=bool)
+    inicio[1:] = ordenadas[1:] != ordenadas[:-1]
+    return orden[inicio]
+
+
+class IndiceWicho:
+    """
+    Índice compacto de los números de todas las hojas de Wicho con 'CEL'.
+
+    Atributos:
+        hojas (list): Nombres de las hojas indexadas, en orden del libro
+        marcos (list): DataFrames de esas hojas
+        claves (ndarray): Números uint64 ordenados y sin repetir
+        hoja (ndarray): Posición en `hojas` de la primera hoja con el número
+        fila (ndarray): Fila dentro de esa hoja
+        conteos_telefono (dict): Conteos de normalizar_telefonos de la
+            columna 'CEL' de todas las hojas
+    """
+
+    def __init__(self, hojas, marcos, claves, hoja, fila, claves_por_hoja, conteos_telefono=None):
+        self.hojas = hojas
+        self.marcos = marcos
+        self.claves = claves
+        self.hoja = hoja
+        self.fila = fila
+        self._claves_por_hoja = claves_por_hoja
+        self.conteos_telefono = conteos_telefono or dict.fromkeys(CONTEOS_TELEFONO, 0)
+
+    @classmethod
+    def construir(cls, dataframes_wicho):
+        """
+        Compila el índice a partir de las hojas del libro Wicho.
+
+        Args:
+            dataframes_wicho (dict): Hojas leídas con sheet_name=None
+
+        Returns:
+            IndiceWicho: Índice listo para cruzar archivos de detalle
+        """
+        hojas, marcos, claves_por_hoja = [], [], []
+        todas_claves, todas_hojas, todas_filas = [], [], []
+        conteos_telefono = dict.fromkeys(CONTEOS_TELEFONO, 0)
+
+        for nombre_hoja, df_wicho in dataframes_wicho.items():
+            if COLUMNA_CEL not in df_wicho.columns:
+                continue
+            id_hoja = len(hojas)
+            hojas.append(nombre_hoja)
+            marcos.append(df_wicho)
+
+            claves, validos, conteos = normalizar_telefonos(df_wicho[COLUMNA_CEL])
+            sumar_conteos(conteos_telefono, conteos)
+            filas = np.flatnonzero(validos)
+            claves_por_hoja.append(np.unique(claves[filas]))
+            todas_claves.append(claves[filas])
+            todas_hojas.append(np.full(len(filas), id_hoja, dtype='int32'))
+            todas_filas.append(filas)
+
+        if todas_claves:
+            claves = np.concatenate(todas_claves)
+            hoja = np.concatenate(todas_hojas)
+            fila = np.concatenate(todas_filas)
+        else:
+            claves = np.empty(0, dtype='uint64')
+            hoja = np.empty(0, dtype='int32')
+            fila = np.empty(0, dtype='int64')
+
+        # Ordenar por número y, a igualdad, por hoja y fila para quedarse con
+        # la primera aparición de cada número en el libro
+        primeras = _primeras_ocurrencias(claves, np.lexsort((fila, hoja, claves)))
+        return cls(
+            hojas, marcos, claves[primeras], hoja[primeras], fila[primeras], claves_por_hoja, conteos_telefono
+        )
+
+    def __len__(self):
+        return len(self.claves)
+
+    def buscar(self, claves):
+        """
+        Busca claves en el índice.
+
+        Args:
+            claves (ndarray): Claves uint64 a buscar
+
+        Returns:
+            ndarray: Posición de cada clave en el índice, o -1 si no existe
+        """
+        if len(self.claves) == 0:
+            return np.full(len(claves), -1, dtype='int64')
+        posiciones = np.searchsorted(self.claves, claves)
+        posiciones = np.minimum(posiciones, len(self.claves) - 1)
+        return np.where(self.claves[posiciones] == claves, posiciones, -1)
+
+    def hojas_de(self, claves):
+        """
+        Args:
+            claves (ndarray): Claves uint64 a buscar
+
+        Returns:
+            list: Nombre de la primera hoja con cada número, o None si no está
+        """
+        posiciones = self.buscar(claves)
+        return [self.hojas[self.hoja[p]] if p >= 0 else None for p in posiciones]
+
+    def cruzar(self, df_detalle, columna_numero, conteos=None):
+        """
+        Cruza un archivo de detalle contra el índice.
+
+        Args:
+            df_detalle (DataFrame): Archivo de detalle con encabezados limpios
+            columna_numero (str): Columna del detalle con el teléfono
+            conteos (dict): Opcional, acumula los conteos de
+                normalizar_telefonos de la columna de teléfono
+
+        Returns:
+            DataFrame: Una fila por número encontrado, con las columnas de la
+                hoja Wicho seguidas de las del detalle (sufijos _x/_y en las
+                columnas repetidas, como pd.merge)
+        """
+        filas_detalle, posiciones = self.coincidencias(df_detalle, columna_numero, conteos=conteos)
+        return self.armar(df_detalle, filas_detalle, posiciones)
+
+    def coincidencias(self, df_detalle, columna_numero, vistos=None, conteos=None):
+        """
+        Localiza las filas del detalle cuyo número está en el índice,
+        quedándose con la primera fila de cada número.
+
+        Args:
+            df_detalle (DataFrame): Archivo (o bloque) de detalle
+            columna_numero (str): Columna del detalle con el teléfono
+            vistos (ndarray): Opcional, arreglo bool del tamaño del índice con
+                los números ya encontrados en bloques anteriores; se actualiza
+            conteos (dict): Ver cruzar()
+
+        Returns:
+            tuple: (filas del detalle, posiciones en el índice)
+        """
+        filas_detalle, posiciones = self.localizar(df_detalle, columna_numero, conteos)
+        return self.depurar(filas_detalle, posiciones, vistos)
+
+    def localizar(self, df_detalle, columna_numero, conteos=None):
+        """
+        Localiza todas las filas del detalle cuyo número está en el índice,
+        incluidas las repetidas.
+
+        Args:
+            df_detalle (DataFrame): Archivo (o bloque) de detalle
+            columna_numero (str): Columna del detalle con el teléfono
+            conteos (dict): Ver cruzar()
+
+        Returns:
+            tuple: (filas del detalle, posiciones en el índice)
+        """
+        claves, validos, conteos_columna = normalizar_telefonos(df_detalle[columna_numero])
+        if conteos is not None:
+            sumar_conteos(conteos, conteos_columna)
+        filas_detalle = np.flatnonzero(validos)
+        posiciones = self.buscar(claves[filas_detalle])
+        encontrados = posiciones >= 0
+        return filas_detalle[encontrados], posiciones[encontrados]
+
+    def depurar(self, filas_detalle, posiciones, vistos=None):
+        """
+        Se queda con la primera fila del detalle de cada número localizado.
+
+        Args:
+            filas_detalle (ndarray): Filas devueltas por localizar()
+            posiciones (ndarray): Posiciones devueltas por localizar()
+            vistos (ndarray): Ver coincidencias()
+
+        Returns:
+            tuple: (filas del detalle, posiciones en el índice)
+        """
+        primeras = _primeras_ocurrencias(posiciones, np.argsort(posiciones, kind='stable'))
+        primeras.sort()
+        filas_detalle = filas_detalle[primeras]
+        posiciones = posiciones[primeras]
+
+        if vistos is not None:
+            nuevos = ~vistos[posiciones]
+            filas_detalle = filas_detalle[nuevos]
+            posiciones = posiciones[nuevos]
+            vistos[posiciones] = True
+        return filas_detalle, posiciones
+
+    def armar(self, df_detalle, filas_detalle, posiciones):
+        """
+        Arma el resultado del cruce a partir de las coincidencias.
+
+        Args:
+            df_detalle (DataFrame): Filas del detalle
+            filas_detalle (ndarray): Filas de `df_detalle` encontradas
+            posiciones (ndarray): Posición en el índice de cada fila
+
+        Returns:
+            DataFrame: Ver cruzar()
+        """
+        claves_detalle = self.claves[posiciones]
+
+        partes = []
+        columnas = []
+        for id_hoja, df_wicho in enumerate(self.marcos):
+            # Las hojas con coincidencias aportan sus columnas aunque todas sus
+            # filas se descarten como duplicadas de una hoja anterior
+            if not np.isin(self._claves_por_hoja[id_hoja], claves_detalle, assume_unique=True).any():
+                continue
+            nombres_izq, nombres_der = _nombres_merge(df_wicho.columns, df_detalle.columns)
+            for nombre in nombres_izq + nombres_der:
+                if nombre not in columnas:
+                    columnas.append(nombre)
+
+            de_hoja = self.hoja[posiciones] == id_hoja
+            if not de_hoja.any():
+                continue
+            filas_wicho = self.fila[posiciones[de_hoja]]
+            orden = np.argsort(filas_wicho, kind='stable')
+            izquierda = df_wicho.iloc[filas_wicho[orden]].reset_index(drop=True)
+            derecha = df_detalle.iloc[filas_detalle[de_hoja][orden]].reset_index(drop=True)
+            izquierda.columns = nombres_izq
+            derecha.columns = nombres_der
+            partes.append(pd.concat([izquierda, derecha], axis=1))
+
+        if not partes:
+            return pd.DataFrame(columns=columnas)
+        return pd.concat(partes, ignore_index=True).reindex(columns=columnas)
+
+
+def _nombres_merge(columnas_izq, columnas_der, sufijos=('_x', '_y')):
+    """Nombres de columnas que produciría pd.merge con left_on/right_on distintos."""
+    comunes = set(columnas_izq) & set(columnas_der)
+    izquierda = [f"{c}{sufijos[0]}" if c in comunes else c for c in columnas_izq]
+    derecha = [f"{c}{sufijos[1]}" if c in comunes else c for c in columnas_der]
+    return izquierda, derecha
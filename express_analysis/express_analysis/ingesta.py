@@ -0,0 +1,155 @@
+"""
+Ingesta de archivos de detalle subidos, sueltos o dentro de un ZIP.
+
+Cada archivo se copia a la carpeta de detalle por bloques mientras se
+calcula su SHA-256, sin armar una copia completa en memoria. De un ZIP se
+extraen uno a uno solo los miembros .xlsx; los archivos de bloqueo de Excel
+(~$...), las carpetas y cualquier otro tipo de archivo se omiten. Los
+archivos idénticos a uno ya procesado en el histórico, o repetidos dentro de
+la misma subida, también se omiten.
+"""
+
+import hashlib
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from .cache_libros import calcular_hash_archivo
+
+# Bytes copiados por bloque
+TAMANO_BLOQUE = 1024 * 1024
+
+
+@dataclass
+class ArchivoIngresado:
+    """
+    Archivo de detalle guardado en la carpeta de detalle.
+
+    Atributos:
+        nombre (str): Nombre del archivo
+        ruta (Path): Ruta donde se guardó
+        hash (str): SHA-256 del contenido
+        origen (str): Nombre del ZIP del que salió, o None
+    """
+    nombre: str
+    ruta: Path
+    hash: str
+    origen: str = None
+
+
+def motivo_omision(nombre):
+    """
+    Args:
+        nombre (str): Nombre de un archivo subido o de un miembro de un ZIP
+
+    Returns:
+        str: Por qué no se ingresa, o None si es un archivo de detalle
+    """
+    if PurePosixPath(nombre).name.startswith('~$'):
+        return "archivo de bloqueo de Excel"
+    if not nombre.lower().endswith('.xlsx'):
+        return "no es un archivo .xlsx"
+    return None
+
+
+def copiar_con_hash(origen, destino):
+    """
+    Copia un flujo a un archivo por bloques calculando su SHA-256.
+
+    Args:
+        origen: Objeto tipo archivo abierto en modo binario
+        destino (Path): Archivo de destino; se reemplaza si existe
+
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    sha = hashlib.sha256()
+    temporal = destino.with_name(f".{destino.name}.tmp")
+    try:
+        with open(temporal, 'wb') as salida:
+            for bloque in iter(lambda: origen.read(TAMANO_BLOQUE), b''):
+                sha.update(bloque)
+                salida.write(bloque)
+        os.replace(temporal, destino)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+    return sha.hexdigest()
+
+
+class Ingesta:
+    """
+    Guarda en una carpeta los archivos de detalle de una subida.
+
+    Después de ingresar todos los archivos, `ingresados` tiene los guardados y
+    `omitidos` pares (nombre, motivo) de los que no se guardaron.
+    """
+
+    def __init__(self, directorio, directorio_historico=None):
+        """
+        Args:
+            directorio (Path): Carpeta de detalle
+            directorio_historico (Path): Carpeta de archivos ya procesados;
+                opcional, para omitir archivos repetidos
+        """
+        self.directorio = Path(directorio)
+        self.directorio_historico = Path(directorio_historico) if directorio_historico else None
+        self.ingresados = []
+        self.omitidos = []
+        self._hashes = {}
+
+    def ingresar(self, archivo, nombre):
+        """
+        Ingresa un archivo subido; si es un ZIP, cada uno de sus miembros.
+
+        Args:
+            archivo: Objeto tipo archivo con el contenido subido
+            nombre (str): Nombre del archivo subido
+        """
+        if nombre.lower().endswith('.zip'):
+            archivo.seek(0)
+            with zipfile.ZipFile(archivo) as paquete:
+                for info in paquete.infolist():
+                    if info.is_dir():
+                        continue
+                    motivo = motivo_omision(info.filename)
+                    if motivo:
+                        self.omitidos.append((f"{nombre}/{info.filename}", motivo))
+                        continue
+                    with paquete.open(info) as miembro:
+                        self._guardar(miembro, PurePosixPath(info.filename).name, nombre)
+            return
+
+        motivo = motivo_omision(nombre)
+        if motivo:
+            self.omitidos.append((nombre, motivo))
+            return
+        archivo.seek(0)
+        self._guardar(archivo, Path(nombre).name, None)
+
+    def _guardar(self, flujo, nombre, origen):
+        etiqueta = f"{origen}/{nombre}" if origen else nombre
+        if nombre in self._hashes:
+            self.omitidos.append((etiqueta, "nombre repetido en la subida"))
+            return
+
+        # Se copia con otro nombre y solo reemplaza al destino si se ingresa
+        recibido = self.directorio / f".{nombre}.subida"
+        hash_archivo = copiar_con_hash(flujo, recibido)
+
+        motivo = None
+        historico = self.directorio_historico / nombre if self.directorio_historico else None
+        if hash_archivo in self._hashes.values():
+            motivo = "contenido repetido en la subida"
+        elif historico is not None and historico.exists() and calcular_hash_archivo(historico) == hash_archivo:
+            motivo = "ya se procesó (está en Detalle historico)"
+        if motivo:
+            recibido.unlink()
+            self.omitidos.append((etiqueta, motivo))
+            return
+
+        destino = self.directorio / nombre
+        os.replace(recibido, destino)
+        self._hashes[nombre] = hash_archivo
+        self.ingresados.append(ArchivoIngresado(nombre, destino, hash_archivo, origen))
@@ -0,0 +1,276 @@
+"""
+Lector de un solo paso para los archivos de detalle de comisiones.
+
+Los archivos de detalle traen el periodo en la celda C1 y los encabezados en
+la fila 3. Antes se leían dos veces con pd.read_excel (una con header=None
+solo para el periodo y otra con header=2); aquí el libro se abre una sola vez
+en modo de solo lectura y de las mismas filas se obtienen periodo, encabezados
+y datos, con las mismas conversiones que aplica pandas.
+
+Los datos se arman con pd.DataFrame y una conversión explícita por columna
+(_convertir_columna), sin el parser interno de pandas: las celdas vacías y
+los textos que pd.read_excel toma como vacíos ('N/A', 'NULL', ...) quedan
+como NaN, las columnas numéricas (también las de números guardados como
+texto) pasan a números y las de fechas a datetime64. La lectura completa y
+la lectura por bloques usan el mismo armado, así que dan las mismas filas:
+las filas vacías entre datos se conservan (como en pd.read_excel) y las del
+final se descartan.
+
+Con `columnas` (ver esquema.ESQUEMA_DETALLE) solo se convierten las celdas de
+esas columnas a partir de la fila de encabezado; el resto del archivo se
+recorre pero no se carga.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Nombres posibles de la columna de teléfono, en orden de preferencia
+COLUMNAS_TELEFONO = ['Número celular asignado', 'Número de Teléfono', 'Número celular', 'Celular']
+
+FILA_ENCABEZADO = 2
+COLUMNA_PERIODO = 2
+
+# Textos que pd.read_excel toma como celdas vacías (su `na_values` por omisión)
+VALORES_VACIOS = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+
+@dataclass
+class LibroDetalle:
+    """
+    Contenido de un archivo de detalle.
+
+    Atributos:
+        periodo: Valor de la celda del periodo (NaN si está vacía)
+        columnas (list): Encabezados ya sin espacios al inicio y al final
+        datos (DataFrame): Filas de datos bajo el encabezado
+        columna_numero (str): Columna de teléfono detectada, o None
+    """
+    periodo: object
+    columnas: list
+    datos: pd.DataFrame
+    columna_numero: str = None
+
+
+def _convertir_celda(celda):
+    """Misma conversión de celdas que el lector openpyxl de pandas."""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if celda.value is None:
+        return ""
+    elif celda.data_type == TYPE_ERROR:
+        return np.nan
+    elif celda.data_type == TYPE_NUMERIC:
+        valor = int(celda.value)
+        if valor == celda.value:
+            return valor
+        return float(celda.value)
+    return celda.value
+
+
+def _recortar(fila):
+    while fila and fila[-1] == "":
+        fila.pop()
+    return fila
+
+
+def _iterar_filas(hoja, columnas=None):
+    """
+    Filas convertidas de la hoja, sin las celdas vacías del final.
+
+    Con `columnas`, desde la fila de encabezado solo se convierten las celdas
+    cuyo encabezado (sin espacios al inicio y al final) está en `columnas`.
+    """
+    posiciones = None
+    for numero, fila in enumerate(hoja.rows):
+        if posiciones is None:
+            convertida = [_convertir_celda(celda) for celda in fila]
+            if columnas is not None and numero == FILA_ENCABEZADO:
+                posiciones = [i for i, nombre in enumerate(convertida) if str(nombre).strip() in columnas]
+                convertida = [convertida[i] for i in posiciones]
+        else:
+            convertida = [_convertir_celda(fila[i]) if i < len(fila) else "" for i in posiciones]
+        yield _recortar(convertida)
+
+
+def _rellenar(filas, ancho):
+    return [fila + [""] * (ancho - len(fila)) for fila in filas]
+
+
+def _sin_vacias_al_final(filas):
+    """Las mismas filas, sin las vacías que no tienen datos debajo."""
+    vacias = 0
+    for fila in filas:
+        if not fila:
+            vacias += 1
+            continue
+        for _ in range(vacias):
+            yield []
+        vacias = 0
+        yield fila
+
+
+def _nombres_columnas(encabezado):
+    """
+    Encabezados sin espacios al inicio y al final; los vacíos se nombran
+    'Unnamed: n' y los repetidos llevan sufijo '.1', '.2', como en pandas.
+    """
+    nombres = [
+        f"Unnamed: {i}" if nombre == "" else nombre.strip() if isinstance(nombre, str) else nombre
+        for i, nombre in enumerate(encabezado)
+    ]
+    originales = set(nombres)
+    vistos = set()
+    for i, nombre in enumerate(nombres):
+        if nombre in vistos:
+            sufijo = 1
+            while f"{nombre}.{sufijo}" in originales | vistos:
+                sufijo += 1
+            nombres[i] = nombre = f"{nombre}.{sufijo}"
+        vistos.add(nombre)
+    return nombres
+
+
+def _convertir_columna(serie):
+    """Tipo de una columna leída, con la inferencia de pd.read_excel."""
+    if serie.dtype != object:
+        return serie
+    serie = serie.mask(serie.isin(VALORES_VACIOS))
+    try:
+        return pd.to_numeric(serie)
+    except (ValueError, TypeError):
+        return serie.infer_objects()
+
+
+def _armar_datos(encabezado, filas, ancho=0):
+    """
+    DataFrame de las filas de datos bajo `encabezado`.
+
+    Args:
+        encabezado (list): Fila de encabezado ya convertida
+        filas (list): Filas de datos ya convertidas
+        ancho (int): Número mínimo de columnas; las que no tienen
+            encabezado se nombran 'Unnamed: n'
+
+    Returns:
+        DataFrame: Datos con el tipo inferido de cada columna
+    """
+    ancho = max([ancho, len(encabezado)] + [len(fila) for fila in filas])
+    datos = pd.DataFrame(
+        _rellenar(filas, ancho),
+        columns=_nombres_columnas(_rellenar([encabezado], ancho)[0]),
+        dtype=object
+    )
+    for numero in range(ancho):
+        datos.isetitem(numero, _convertir_columna(datos.iloc[:, numero]))
+    return datos
+
+
+def _valor_periodo(fila):
+    periodo = fila[COLUMNA_PERIODO] if len(fila) > COLUMNA_PERIODO else ""
+    return np.nan if periodo == "" else periodo
+
+
+def detectar_columna_numero(columnas):
+    """
+    Args:
+        columnas (list): Encabezados del archivo de detalle
+
+    Returns:
+        str: Primera columna de teléfono reconocida, o None
+    """
+    return next((col for col in COLUMNAS_TELEFONO if col in columnas), None)
+
+
+def leer_detalle(ruta, columnas=None):
+    """
+    Lee un archivo de detalle abriendo el libro una sola vez.
+
+    Args:
+        ruta (Path): Ruta del archivo de detalle
+        columnas (Iterable): Si se indica, solo se leen estas columnas
+
+    Returns:
+        LibroDetalle: Periodo, encabezados, datos y columna de teléfono
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True, keep_links=False)
+    try:
+        hoja = libro.worksheets[0]
+        hoja.reset_dimensions()
+        filas = list(_sin_vacias_al_final(_iterar_filas(hoja, columnas)))
+    finally:
+        libro.close()
+
+    filas += [[]] * (FILA_ENCABEZADO + 1 - len(filas))
+    periodo = _valor_periodo(filas[0])
+    # Como en pd.read_excel, una fila previa más ancha que el encabezado
+    # agrega columnas sin nombre
+    datos = _armar_datos(
+        filas[FILA_ENCABEZADO], filas[FILA_ENCABEZADO + 1:], max(len(fila) for fila in filas[:FILA_ENCABEZADO])
+    )
+    columnas = list(datos.columns)
+
+    return LibroDetalle(
+        periodo=periodo,
+        columnas=columnas,
+        datos=datos,
+        columna_numero=detectar_columna_numero(columnas)
+    )
+
+
+def leer_detalle_por_bloques(ruta, filas_por_bloque=50000, columnas=None):
+    """
+    Lee un archivo de detalle por bloques de filas, sin cargarlo completo.
+
+    El libro se recorre en modo de solo lectura y solo se mantiene en memoria
+    el bloque actual. Cada bloque se convierte con los mismos encabezados
+    (fila 3), de modo que todos comparten nombres de columnas, y entre todos
+    tienen las mismas filas que leer_detalle. El tipo de cada columna se
+    infiere por bloque.
+
+    Args:
+        ruta (Path): Ruta del archivo de detalle
+        filas_por_bloque (int): Filas de datos por bloque
+        columnas (Iterable): Si se indica, solo se leen estas columnas
+
+    Yields:
+        LibroDetalle: Un objeto por bloque con el periodo, los encabezados,
+            las filas del bloque y la columna de teléfono. Si el archivo no
+            tiene datos se produce un único bloque vacío.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True, keep_links=False)
+    try:
+        hoja = libro.worksheets[0]
+        hoja.reset_dimensions()
+        filas = _sin_vacias_al_final(_iterar_filas(hoja, columnas))
+
+        primeras = [next(filas, []) for _ in range(FILA_ENCABEZADO + 1)]
+        periodo = _valor_periodo(primeras[0])
+        encabezado = primeras[FILA_ENCABEZADO]
+        ancho = max(len(fila) for fila in primeras[:FILA_ENCABEZADO])
+
+        def armar(bloque):
+            datos = _armar_datos(encabezado, bloque, ancho)
+            columnas = list(datos.columns)
+            return LibroDetalle(periodo, columnas, datos, detectar_columna_numero(columnas))
+
+        bloque = []
+        producidos = 0
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) >= filas_por_bloque:
+                yield armar(bloque)
+                producidos += 1
+                bloque = []
+        if bloque or not producidos:
+            yield armar(bloque)
+    finally:
+        libro.close()
@@ -0,0 +1,553 @@
+"""
+Libro mayor de comisiones en SQLite.
+
+Guarda una fila por línea encontrada (número de Wicho cruzado con un archivo
+de detalle) con la hoja de Wicho, el periodo, la evaluación, la comisión, los
+archivos de origen y el estado de pago. Los totales del dashboard salen de
+consultas GROUP BY sobre esta tabla en lugar de releer los libros de
+resultados.
+
+Cada libro de resultados se registra una sola vez junto con el hash de su
+contenido; sincronizar() solo vuelve a leer los libros nuevos o modificados.
+La tabla `archivos` es además el índice de libros de resultados (fecha,
+estado de pago, totales y hash): el listado del dashboard sale de ella sin
+leer la carpeta ni los libros.
+
+El estado de pago ya no se guarda en el nombre del libro. Cambiarlo es un
+UPDATE con fecha de auditoría que además se anota en un registro JSON por
+nombre de libro; ese registro se guarda en Git para que el estado sobreviva
+aunque el libro mayor se reconstruya. Cada anotación guarda también el hash
+del contenido, que solo sirve para seguir al libro si se renombra: dos libros
+con el mismo contenido (una copia o uno regenerado) tienen cada uno su
+estado. Los libros sin anotación toman el estado de su nombre, como antes.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+ESTADO_PAGADO = 'PAGADO'
+ESTADO_POR_PAGAR = 'POR_PAGAR'
+# Líneas de archivos de Detalle historico que no están en ningún resultado
+ESTADO_SIN_RESULTADO = 'SIN_RESULTADO'
+
+# Columnas de un libro de resultados que se guardan en el libro mayor
+COLUMNAS_LIBRO = ['CEL', 'Evaluación', 'Comisión', 'Fecha Primera Recarga', 'Archivo_Detalle', 'Periodo']
+
+# Columnas sin las cuales un libro de resultados se marca como no válido
+COLUMNAS_REQUERIDAS = ['Fecha Primera Recarga', 'Evaluación']
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    archivo TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    valido INTEGER NOT NULL,
+    motivo TEXT,
+    fecha TEXT,
+    total_lineas INTEGER,
+    total_comision REAL,
+    estado_actualizado TEXT
+);
+CREATE TABLE IF NOT EXISTS lineas (
+    id INTEGER PRIMARY KEY,
+    cel INTEGER,
+    hoja_wicho TEXT,
+    periodo TEXT,
+    evaluacion TEXT,
+    fase INTEGER,
+    comision REAL,
+    fecha_primera_recarga TEXT,
+    archivo_detalle TEXT,
+    archivo_resultado TEXT,
+    estado TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lineas_cel ON lineas (cel);
+CREATE INDEX IF NOT EXISTS idx_lineas_periodo ON lineas (periodo);
+CREATE INDEX IF NOT EXISTS idx_lineas_estado ON lineas (estado);
+CREATE INDEX IF NOT EXISTS idx_lineas_archivo_resultado ON lineas (archivo_resultado);
+CREATE INDEX IF NOT EXISTS idx_lineas_archivo_detalle ON lineas (archivo_detalle);
+CREATE TABLE IF NOT EXISTS metadatos (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Columnas agregadas a `archivos` después de la primera versión del esquema
+COLUMNAS_INDICE = {
+    'fecha': 'TEXT',
+    'total_lineas': 'INTEGER',
+    'total_comision': 'REAL',
+    'estado_actualizado': 'TEXT'
+}
+
+CONSULTA_INDICE = """
+SELECT rowid AS id, archivo, fecha, estado, estado_actualizado,
+    total_lineas, total_comision, hash, valido, motivo
+FROM archivos
+ORDER BY fecha DESC, archivo DESC
+"""
+
+CONSULTA_RESUMEN = """
+SELECT
+    a.archivo AS archivo,
+    a.fecha AS fecha,
+    a.estado AS estado,
+    a.estado_actualizado AS estado_actualizado,
+    COUNT(l.id) AS total_lineas,
+    MAX(l.fecha_primera_recarga) AS fecha_max,
+    COALESCE(SUM(l.fase = 1), 0) AS primera_eval,
+    COALESCE(SUM(l.fase = 2), 0) AS segunda_eval,
+    COALESCE(SUM(l.fase = 3), 0) AS tercera_eval,
+    COALESCE(SUM(l.fase = 4), 0) AS cuarta_eval,
+    COALESCE(SUM(CASE WHEN l.fase = 1 THEN l.comision END), 0) AS comision_primera,
+    COALESCE(SUM(CASE WHEN l.fase = 2 THEN l.comision END), 0) AS comision_segunda,
+    COALESCE(SUM(CASE WHEN l.fase = 3 THEN l.comision END), 0) AS comision_tercera,
+    COALESCE(SUM(CASE WHEN l.fase = 4 THEN l.comision END), 0) AS comision_cuarta
+FROM archivos a
+LEFT JOIN lineas l ON l.archivo_resultado = a.archivo
+WHERE a.valido = 1 {filtro}
+GROUP BY a.archivo
+ORDER BY a.archivo
+"""
+
+
+def estado_de_archivo(nombre_archivo):
+    """Estado de pago de un libro de resultados según su nombre."""
+    return ESTADO_PAGADO if "PAGADO" in nombre_archivo.upper() else ESTADO_POR_PAGAR
+
+
+def fecha_de_archivo(nombre_archivo):
+    """
+    Returns:
+        str: Fecha ISO del prefijo AAAAMMDD_ del nombre, o None si no tiene
+    """
+    coincidencia = re.match(r'(\d{8})_', nombre_archivo)
+    if not coincidencia:
+        return None
+    try:
+        return datetime.strptime(coincidencia.group(1), '%Y%m%d').date().isoformat()
+    except ValueError:
+        return None
+
+
+def _texto(valor):
+    import pandas as pd
+
+    return None if pd.isna(valor) else str(valor)
+
+
+def filas_lineas(datos, archivo_resultado, estado, indice_wicho=None):
+    """
+    Convierte líneas encontradas en filas de la tabla `lineas`.
+
+    Args:
+        datos (DataFrame): Líneas con las columnas de COLUMNAS_LIBRO (las que
+            falten quedan vacías)
+        archivo_resultado (str): Libro de resultados, o None
+        estado (str): Estado de pago de las líneas
+        indice_wicho (IndiceWicho): Opcional, para anotar la hoja de Wicho
+
+    Returns:
+        list: Tuplas listas para INSERT
+    """
+    import pandas as pd
+
+    from .evaluaciones import clasificar_evaluaciones
+    from .indice_wicho import claves_telefono
+
+    datos = datos.reindex(columns=COLUMNAS_LIBRO)
+    claves, validas = claves_telefono(datos['CEL'])
+    cels = [int(c) if v else None for c, v in zip(claves, validas)]
+    if indice_wicho is not None:
+        hojas = indice_wicho.hojas_de(claves)
+        hojas = [h if v else None for h, v in zip(hojas, validas)]
+    else:
+        hojas = [None] * len(datos)
+    fases = clasificar_evaluaciones(datos['Evaluación']).cat.codes.to_numpy()
+    comisiones = pd.to_numeric(datos['Comisión'], errors='coerce')
+    fechas = pd.to_datetime(datos['Fecha Primera Recarga'], errors='coerce')
+
+    return [
+        (
+            cel,
+            hoja,
+            _texto(periodo),
+            _texto(evaluacion),
+            int(fase) if fase else None,
+            None if pd.isna(comision) else float(comision),
+            None if pd.isna(fecha) else fecha.isoformat(),
+            _texto(archivo_detalle),
+            archivo_resultado,
+            estado
+        )
+        for cel, hoja, periodo, evaluacion, fase, comision, fecha, archivo_detalle in zip(
+            cels, hojas, datos['Periodo'], datos['Evaluación'], fases,
+            comisiones, fechas, datos['Archivo_Detalle']
+        )
+    ]
+
+
+class LibroMayor:
+    """
+    Libro mayor de comisiones sobre un archivo SQLite.
+
+    Las conexiones se abren por operación, así que una misma instancia puede
+    compartirse entre sesiones de Streamlit.
+    """
+
+    def __init__(self, ruta, archivo_estados=None):
+        """
+        Args:
+            ruta (Path): Archivo SQLite
+            archivo_estados (Path): Registro JSON de cambios de estado de
+                pago por nombre de libro; opcional
+        """
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.archivo_estados = Path(archivo_estados) if archivo_estados else None
+        self._lock = threading.Lock()
+        with self._conectar() as conexion:
+            conexion.executescript(ESQUEMA)
+            existentes = {fila[1] for fila in conexion.execute("PRAGMA table_info(archivos)")}
+            for columna, tipo in COLUMNAS_INDICE.items():
+                if columna not in existentes:
+                    conexion.execute(f"ALTER TABLE archivos ADD COLUMN {columna} {tipo}")
+            # Libros registrados antes de que existieran esas columnas
+            for (archivo,) in conexion.execute("SELECT archivo FROM archivos WHERE total_lineas IS NULL").fetchall():
+                self._actualizar_totales(conexion, archivo, fecha_de_archivo(archivo))
+
+    def _cargar_estados(self):
+        if self.archivo_estados is None:
+            return {}
+        try:
+            with open(self.archivo_estados, 'r', encoding='utf-8') as f:
+                estados = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        # Los registros anteriores se indexaban por hash de contenido
+        return {
+            (anotacion['archivo'] if 'hash' not in anotacion else archivo): {
+                'hash': anotacion.get('hash', archivo),
+                'estado': anotacion['estado'],
+                'actualizado': anotacion['actualizado']
+            }
+            for archivo, anotacion in estados.items()
+        }
+
+    def _guardar_estados(self, estados):
+        self.archivo_estados.parent.mkdir(parents=True, exist_ok=True)
+        temporal = self.archivo_estados.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(estados, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporal, self.archivo_estados)
+
+    @contextmanager
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta)
+        try:
+            with conexion:
+                yield conexion
+        finally:
+            conexion.close()
+
+    def _insertar_lineas(self, conexion, filas):
+        conexion.executemany(
+            """INSERT INTO lineas (cel, hoja_wicho, periodo, evaluacion, fase, comision,
+                fecha_primera_recarga, archivo_detalle, archivo_resultado, estado)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            filas
+        )
+
+    def _actualizar_totales(self, conexion, archivo, fecha):
+        conexion.execute(
+            """UPDATE archivos SET
+                fecha = ?,
+                total_lineas = (SELECT COUNT(*) FROM lineas WHERE archivo_resultado = ?),
+                total_comision = (SELECT COALESCE(SUM(comision), 0) FROM lineas
+                    WHERE archivo_resultado = ? AND fase BETWEEN 1 AND 4)
+            WHERE archivo = ?""",
+            (fecha, archivo, archivo, archivo)
+        )
+
+    def _borrar_resultado(self, conexion, archivo):
+        conexion.execute("DELETE FROM lineas WHERE archivo_resultado = ?", (archivo,))
+        conexion.execute("DELETE FROM archivos WHERE archivo = ?", (archivo,))
+
+    def _seguir_renombrados(self, presentes):
+        """
+        Pasa las anotaciones de estado de los libros renombrados a su nombre
+        nuevo y descarta las de los libros que ya no existen.
+
+        Args:
+            presentes (dict): Nombre y hash de los libros de la carpeta
+        """
+        if self.archivo_estados is None:
+            return
+        with self._lock:
+            estados = self._cargar_estados()
+            desaparecidos = {a['hash']: n for n, a in estados.items() if n not in presentes}
+            if not desaparecidos:
+                return
+            for nombre, hash_archivo in presentes.items():
+                if nombre not in estados and hash_archivo in desaparecidos:
+                    estados[nombre] = estados[desaparecidos.pop(hash_archivo)]
+            for nombre in set(estados) - set(presentes):
+                del estados[nombre]
+            self._guardar_estados(estados)
+
+    def registrar_resultado(self, nombre_archivo, hash_archivo, datos, indice_wicho=None):
+        """
+        Registra (o reemplaza) las líneas de un libro de resultados.
+
+        Args:
+            nombre_archivo (str): Nombre del libro en Resultados/
+            hash_archivo (str): Hash del contenido del libro
+            datos (DataFrame): Columnas de COLUMNAS_LIBRO del libro
+            indice_wicho (IndiceWicho): Opcional, para anotar la hoja de Wicho
+        """
+        # Estado anotado para este libro, el que ya tenía si se cambió desde
+        # la aplicación o, si no, el de su nombre
+        with self._lock:
+            estados = self._cargar_estados()
+            anotado = estados.get(nombre_archivo)
+            if anotado and anotado['hash'] != hash_archivo:
+                anotado['hash'] = hash_archivo
+                self._guardar_estados(estados)
+        with self._conectar() as conexion:
+            anterior = conexion.execute(
+                "SELECT estado, estado_actualizado FROM archivos WHERE archivo = ?", (nombre_archivo,)
+            ).fetchone()
+        if anotado:
+            estado, actualizado = anotado['estado'], anotado['actualizado']
+        elif anterior and anterior[1]:
+            estado, actualizado = anterior
+        else:
+            estado, actualizado = estado_de_archivo(nombre_archivo), None
+
+        # Las mismas columnas que exigía el análisis de pagados; un libro sin
+        # 'Comisión' se registra con las comisiones vacías (suman 0)
+        faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in datos.columns]
+        motivo = f"Columna '{faltantes[0]}' no encontrada" if faltantes else None
+        filas = [] if faltantes else filas_lineas(datos, nombre_archivo, estado, indice_wicho)
+
+        with self._lock, self._conectar() as conexion:
+            self._borrar_resultado(conexion, nombre_archivo)
+            conexion.execute(
+                """INSERT INTO archivos (archivo, hash, estado, valido, motivo, estado_actualizado)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (nombre_archivo, hash_archivo, estado, int(not faltantes), motivo, actualizado)
+            )
+            self._insertar_lineas(conexion, filas)
+            self._actualizar_totales(conexion, nombre_archivo, fecha_de_archivo(nombre_archivo))
+
+    def renombrar_resultado(self, origen, destino):
+        """
+        Cambia el nombre de un libro registrado. Si su estado de pago nunca
+        se cambió desde la aplicación, toma el del nombre nuevo.
+
+        Args:
+            origen (str): Nombre anterior del libro
+            destino (str): Nombre nuevo del libro
+        """
+        with self._lock, self._conectar() as conexion:
+            conexion.execute(
+                """UPDATE archivos SET archivo = ?, fecha = ?,
+                    estado = CASE WHEN estado_actualizado IS NULL THEN ? ELSE estado END
+                WHERE archivo = ?""",
+                (destino, fecha_de_archivo(destino), estado_de_archivo(destino), origen)
+            )
+            conexion.execute(
+                """UPDATE lineas SET archivo_resultado = ?,
+                    estado = (SELECT estado FROM archivos WHERE archivo = ?)
+                WHERE archivo_resultado = ?""",
+                (destino, destino, origen)
+            )
+
+    def cambiar_estado(self, archivo, estado):
+        """
+        Cambia el estado de pago de un libro sin tocar el archivo.
+
+        Args:
+            archivo (str): Nombre del libro en Resultados/
+            estado (str): ESTADO_PAGADO o ESTADO_POR_PAGAR
+
+        Returns:
+            str: Fecha y hora del cambio, o None si el libro no está registrado
+        """
+        actualizado = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            with self._conectar() as conexion:
+                fila = conexion.execute("SELECT hash FROM archivos WHERE archivo = ?", (archivo,)).fetchone()
+                if fila is None:
+                    return None
+                conexion.execute(
+                    "UPDATE archivos SET estado = ?, estado_actualizado = ? WHERE archivo = ?",
+                    (estado, actualizado, archivo)
+                )
+                conexion.execute("UPDATE lineas SET estado = ? WHERE archivo_resultado = ?", (estado, archivo))
+
+            if self.archivo_estados is not None:
+                estados = self._cargar_estados()
+                estados[archivo] = {'hash': fila[0], 'estado': estado, 'actualizado': actualizado}
+                self._guardar_estados(estados)
+        return actualizado
+
+    def indice_resultados(self):
+        """
+        Índice de libros de resultados, del más reciente al más antiguo.
+
+        Returns:
+            DataFrame: id, archivo, fecha, estado, estado_actualizado,
+                total_lineas, total_comision, hash, valido y motivo
+        """
+        import pandas as pd
+
+        with self._conectar() as conexion:
+            return pd.read_sql_query(CONSULTA_INDICE, conexion)
+
+    def sincronizar(self, directorio, cache, indice_wicho=None):
+        """
+        Pone el libro mayor al día con los libros de una carpeta de resultados.
+
+        Solo se leen los libros nuevos o cuyo contenido cambió; los que se
+        renombraron fuera de la aplicación se actualizan por su hash y los que
+        ya no existen se eliminan.
+
+        Args:
+            directorio (Path): Carpeta de resultados
+            cache (CacheLibros): Caché para hashes y lecturas
+            indice_wicho (IndiceWicho): Opcional, para anotar la hoja de Wicho
+
+        Returns:
+            list: Avisos de archivos que no pudieron registrarse o no tienen
+                las columnas necesarias
+        """
+        from .gemelos import leer_resultado
+
+        directorio = Path(directorio)
+        avisos = []
+        with self._conectar() as conexion:
+            registrados = dict(conexion.execute("SELECT archivo, hash FROM archivos"))
+
+        presentes = {}
+        for nombre in sorted(os.listdir(directorio)):
+            if nombre.endswith('.xlsx') and not nombre.startswith('~$'):
+                try:
+                    presentes[nombre] = cache.hash_contenido(directorio / nombre)
+                except Exception as e:
+                    avisos.append(f"Error al procesar {nombre}: {str(e)}")
+
+        self._seguir_renombrados(presentes)
+
+        # Libros renombrados fuera de la aplicación: mismo hash, otro nombre
+        huerfanos = {h: n for n, h in registrados.items() if n not in presentes}
+        for nombre, hash_archivo in presentes.items():
+            if nombre not in registrados and hash_archivo in huerfanos:
+                anterior = huerfanos.pop(hash_archivo)
+                self.renombrar_resultado(anterior, nombre)
+                registrados[nombre] = registrados.pop(anterior)
+
+        for nombre, hash_archivo in presentes.items():
+            if registrados.get(nombre) == hash_archivo:
+                continue
+            try:
+                datos = leer_resultado(directorio / nombre, cache, COLUMNAS_LIBRO)
+                self.registrar_resultado(nombre, hash_archivo, datos, indice_wicho)
+            except Exception as e:
+                avisos.append(f"Error al procesar {nombre}: {str(e)}")
+
+        with self._lock, self._conectar() as conexion:
+            for nombre in set(registrados) - set(presentes):
+                self._borrar_resultado(conexion, nombre)
+            for nombre, motivo in conexion.execute("SELECT archivo, motivo FROM archivos WHERE valido = 0"):
+                avisos.append(f"{motivo} en {nombre}")
+        return avisos
+
+    def importar_historico(self, directorio, indice_wicho):
+        """
+        Importa las líneas de los archivos de Detalle historico que no forman
+        parte de ningún libro de resultados, cruzándolos contra Wicho. Los
+        archivos ya importados se omiten, así que puede repetirse sin duplicar.
+
+        Args:
+            directorio (Path): Carpeta Detalle historico
+            indice_wicho (IndiceWicho): Índice de números de Wicho
+
+        Returns:
+            tuple: (archivos importados, lista de avisos)
+        """
+        from .procesamiento import OK, SIN_COINCIDENCIAS, procesar_detalle
+
+        directorio = Path(directorio)
+        with self._conectar() as conexion:
+            conocidos = {fila[0] for fila in conexion.execute("SELECT DISTINCT archivo_detalle FROM lineas")}
+
+        importados = 0
+        avisos = []
+        for nombre in sorted(os.listdir(directorio)):
+            if not nombre.endswith('.xlsx') or nombre.startswith('~$') or nombre in conocidos:
+                continue
+            resultado = procesar_detalle(indice_wicho, directorio / nombre)
+            if resultado.estado == OK:
+                filas = filas_lineas(resultado.datos, None, ESTADO_SIN_RESULTADO, indice_wicho)
+                with self._lock, self._conectar() as conexion:
+                    self._insertar_lineas(conexion, filas)
+                importados += 1
+            elif resultado.estado != SIN_COINCIDENCIAS:
+                avisos.append(f"{nombre}: {resultado.mensaje or 'columna de número no encontrada'}")
+
+        with self._lock, self._conectar() as conexion:
+            conexion.execute(
+                "INSERT OR REPLACE INTO metadatos (clave, valor) VALUES ('historico_importado', ?)",
+                (datetime.now().isoformat(timespec='seconds'),)
+            )
+        return importados, avisos
+
+    def historico_importado(self):
+        """Fecha de la última importación de Detalle historico, o None."""
+        with self._conectar() as conexion:
+            fila = conexion.execute("SELECT valor FROM metadatos WHERE clave = 'historico_importado'").fetchone()
+        return fila[0] if fila else None
+
+    def resumen_por_archivo(self, estado=None):
+        """
+        Conteos y comisiones por evaluación de cada libro de resultados.
+
+        Args:
+            estado (str): Opcional, solo los libros con este estado de pago
+
+        Returns:
+            DataFrame: Una fila por libro con total_lineas, fecha_max,
+                {fase}_eval, comision_{fase}, otras_eval, comision_otras,
+                comision_dat y total_comision
+        """
+        import pandas as pd
+
+        filtro = "AND a.estado = ?" if estado else ""
+        with self._conectar() as conexion:
+            resumen = pd.read_sql_query(
+                CONSULTA_RESUMEN.format(filtro=filtro),
+                conexion,
+                params=(estado,) if estado else ()
+            )
+        resumen['otras_eval'] = resumen['segunda_eval'] + resumen['tercera_eval'] + resumen['cuarta_eval']
+        resumen['comision_otras'] = resumen['comision_segunda'] + resumen['comision_tercera'] + resumen['comision_cuarta']
+        resumen['comision_dat'] = resumen['comision_otras']
+        resumen['total_comision'] = resumen['comision_primera'] + resumen['comision_otras']
+        return resumen
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: Líneas por estado de pago y número de libros registrados
+        """
+        with self._conectar() as conexion:
+            por_estado = dict(conexion.execute("SELECT estado, COUNT(*) FROM lineas GROUP BY estado"))
+            archivos = conexion.execute("SELECT COUNT(*) FROM archivos").fetchone()[0]
+        return {'lineas_por_estado': por_estado, 'archivos': archivos}
@@ -0,0 +1,116 @@
+"""
+Memoización de cálculos del dashboard por huella de los datos.
+
+Cada cálculo se guarda con la huella de los archivos de los que depende
+(nombre, tamaño y fecha de modificación, sin leer su contenido). Mientras la
+huella no cambie, todas las vistas y sesiones reciben el mismo resultado sin
+recalcularlo; las operaciones que cambian los datos pueden además invalidar
+todo explícitamente.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+def huella_archivos(*rutas, patron="*.xlsx"):
+    """
+    Huella barata de un conjunto de archivos y carpetas.
+
+    Args:
+        *rutas (Path): Archivos o carpetas; de las carpetas se toman los
+            archivos que coinciden con `patron`
+        patron (str): Patrón de archivos dentro de las carpetas
+
+    Returns:
+        str: Hash de los nombres, tamaños y fechas de modificación
+    """
+    sha = hashlib.sha1()
+    for ruta in rutas:
+        ruta = Path(ruta)
+        archivos = sorted(ruta.glob(patron)) if ruta.is_dir() else [ruta]
+        for archivo in archivos:
+            try:
+                info = os.stat(archivo)
+                sha.update(f"{archivo}|{info.st_size}|{info.st_mtime_ns}\n".encode())
+            except FileNotFoundError:
+                sha.update(f"{archivo}|-\n".encode())
+    return sha.hexdigest()
+
+
+class Memoizador:
+    """
+    Resultados calculados, indexados por nombre y huella de los datos.
+
+    Si varias sesiones piden a la vez un mismo resultado que no está
+    calculado, solo una lo calcula y las demás esperan su resultado. Si el
+    cálculo falla, la excepción llega a quien lo calculaba y cada una de las
+    que esperaban lo intenta de nuevo.
+    """
+
+    def __init__(self, max_entradas=64):
+        self.max_entradas = max_entradas
+        self._valores = OrderedDict()
+        self._en_calculo = {}
+        self._generacion = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, nombre, huella, calcular):
+        """
+        Devuelve el resultado memorizado o lo calcula.
+
+        Args:
+            nombre (str): Nombre del cálculo
+            huella (str): Huella de los datos de los que depende
+            calcular (callable): Función sin argumentos que lo calcula
+
+        Returns:
+            El resultado; no debe modificarse porque se comparte
+        """
+        with self._lock:
+            clave = (nombre, huella, self._generacion)
+            if clave in self._valores:
+                self._valores.move_to_end(clave)
+                self.aciertos += 1
+                return self._valores[clave]
+            candado = self._en_calculo.setdefault(clave, threading.Lock())
+
+        with candado:
+            try:
+                with self._lock:
+                    if clave in self._valores:
+                        self.aciertos += 1
+                        return self._valores[clave]
+                valor = calcular()
+                with self._lock:
+                    self.fallos += 1
+                    # Si se invalidó mientras se calculaba, el valor ya es viejo
+                    if clave[2] == self._generacion:
+                        self._valores[clave] = valor
+                        while len(self._valores) > self.max_entradas:
+                            self._valores.popitem(last=False)
+                return valor
+            finally:
+                # También si calcular() falló, para no dejar el candado de
+                # cada huella fallida en _en_calculo
+                with self._lock:
+                    if self._en_calculo.get(clave) is candado:
+                        del self._en_calculo[clave]
+
+    def invalidar(self):
+        """Descarta todos los resultados memorizados."""
+        with self._lock:
+            self._generacion += 1
+            self._valores.clear()
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: Aciertos, fallos y entradas memorizadas
+        """
+        with self._lock:
+            return {'aciertos': self.aciertos, 'fallos': self.fallos, 'entradas': len(self._valores)}
@@ -0,0 +1,84 @@
+"""
+Metadatos del archivo Wicho calculados al subirlo.
+
+Al subir el libro Wicho se guarda un registro JSON con las filas, los
+números distintos y los números mal formados de cada hoja, el hash del
+contenido y la fecha de subida.
+Las métricas de conversión del dashboard leen este registro en lugar de
+volver a parsear el libro en cada vista.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+
+def calcular_metadatos_wicho(dataframes_wicho, hash_archivo, nombre_archivo):
+    """
+    Calcula el registro de metadatos de un libro Wicho ya leído.
+
+    Args:
+        dataframes_wicho (dict): Hojas leídas con sheet_name=None
+        hash_archivo (str): Hash del contenido del libro
+        nombre_archivo (str): Nombre del archivo subido
+
+    Returns:
+        dict: Filas (None en las hojas sin 'CEL'), números distintos y
+            rechazados por hoja, totales, hash y fecha
+    """
+    import numpy as np
+
+    from .indice_wicho import COLUMNA_CEL, normalizar_telefonos, rechazados
+
+    hojas = []
+    todas_claves = []
+    for nombre_hoja, df_wicho in dataframes_wicho.items():
+        tiene_cel = COLUMNA_CEL in df_wicho.columns
+        cel_distintos = cel_rechazados = 0
+        if tiene_cel:
+            claves, validos, conteos = normalizar_telefonos(df_wicho[COLUMNA_CEL])
+            unicas = np.unique(claves[validos])
+            cel_distintos = len(unicas)
+            cel_rechazados = rechazados(conteos)
+            todas_claves.append(unicas)
+        hojas.append({
+            'hoja': str(nombre_hoja),
+            # Las hojas sin 'CEL' se leen sin columnas (ver esquema.leer_wicho)
+            'filas': int(len(df_wicho)) if tiene_cel else None,
+            'tiene_cel': tiene_cel,
+            'cel_distintos': int(cel_distintos),
+            'cel_rechazados': int(cel_rechazados)
+        })
+
+    return {
+        'archivo': nombre_archivo,
+        'hash': hash_archivo,
+        'subido': datetime.now().isoformat(timespec='seconds'),
+        'hojas': hojas,
+        'total_lineas_cel': sum(h['filas'] for h in hojas if h['tiene_cel']),
+        'cel_distintos': int(len(np.unique(np.concatenate(todas_claves)))) if todas_claves else 0,
+        'cel_rechazados': sum(h['cel_rechazados'] for h in hojas)
+    }
+
+
+def guardar_metadatos_wicho(ruta, metadatos):
+    """Escribe el registro de metadatos de forma atómica."""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix('.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(metadatos, f, ensure_ascii=False, indent=1)
+    os.replace(temporal, ruta)
+
+
+def cargar_metadatos_wicho(ruta):
+    """
+    Returns:
+        dict: Registro de metadatos, o None si no existe o está dañado
+    """
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
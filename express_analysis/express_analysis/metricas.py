@@ -0,0 +1,263 @@
+"""
+Métricas de ejecución por etapa.
+
+Las etapas instrumentadas (lectura de Wicho, lectura y cruce de los archivos
+de detalle, escritura del resultado, commits y push a Git, sincronización y
+cálculos del dashboard) registran su duración, las filas que procesaron y la
+memoria pico del proceso en un archivo JSON Lines local. Medir una etapa
+cuesta dos lecturas del reloj y dos de getrusage; no se rastrean las
+asignaciones de memoria.
+
+La memoria pico es la memoria residente máxima del proceso (ru_maxrss) al
+terminar la etapa. Nunca baja, así que `aumento_pico_mb` indica qué etapa
+llevó al proceso a un máximo nuevo. En Windows no hay getrusage y la memoria
+queda vacía, y los procesos trabajadores del cruce en paralelo no se cuentan.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+# Registros que se conservan al compactar el archivo
+MAX_REGISTROS = 5000
+
+
+def memoria_pico_mb():
+    """
+    Returns:
+        float: Memoria residente máxima del proceso en MiB, o None si el
+            sistema no la informa
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux la informa en KiB y macOS en bytes
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class RegistroMetricas:
+    """
+    Archivo de métricas de ejecución, una línea JSON por etapa medida.
+
+    Puede compartirse entre hilos; cuando el archivo duplica MAX_REGISTROS
+    se reescribe con los más recientes.
+    """
+
+    def __init__(self, ruta, max_registros=MAX_REGISTROS):
+        """
+        Args:
+            ruta (Path): Archivo .jsonl de métricas
+            max_registros (int): Registros que se conservan al compactar
+        """
+        self.ruta = Path(ruta)
+        self.max_registros = max_registros
+        self._lock = threading.Lock()
+        self._lineas = None
+
+    def corrida(self, nombre):
+        """
+        Args:
+            nombre (str): Tipo de corrida ('analisis', 'git', 'dashboard', ...)
+
+        Returns:
+            Corrida: Corrida nueva cuyas etapas se registran en este archivo
+        """
+        return Corrida(self, nombre)
+
+    def _leer_lineas(self):
+        if not self.ruta.exists():
+            return []
+        return [linea for linea in self.ruta.read_text(encoding='utf-8').splitlines() if linea.strip()]
+
+    def agregar(self, registro):
+        """
+        Agrega un registro al final del archivo.
+
+        Args:
+            registro (dict): Medición de una etapa
+        """
+        linea = json.dumps(registro, ensure_ascii=False)
+        with self._lock:
+            if self._lineas is None:
+                self._lineas = len(self._leer_lineas())
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(linea + '\n')
+            self._lineas += 1
+
+            if self._lineas > 2 * self.max_registros:
+                lineas = self._leer_lineas()[-self.max_registros:]
+                temporal = self.ruta.with_name(f".{self.ruta.name}.tmp")
+                temporal.write_text('\n'.join(lineas) + '\n', encoding='utf-8')
+                os.replace(temporal, self.ruta)
+                self._lineas = len(lineas)
+
+    def recientes(self, limite=1000):
+        """
+        Args:
+            limite (int): Máximo de registros
+
+        Returns:
+            list: Los registros más recientes, del más antiguo al más nuevo
+        """
+        with self._lock:
+            lineas = self._leer_lineas()[-limite:]
+        registros = []
+        for linea in lineas:
+            try:
+                registros.append(json.loads(linea))
+            except json.JSONDecodeError:
+                # Línea cortada por un cierre abrupto
+                continue
+        return registros
+
+
+class Corrida:
+    """
+    Etapas de una misma ejecución (un análisis, un push, una carga del
+    dashboard), agrupadas por un identificador común.
+
+    Con registro None las etapas se miden pero no se guardan.
+    """
+
+    def __init__(self, registro, nombre):
+        self.registro = registro
+        self.nombre = nombre
+        self.id = uuid.uuid4().hex[:12]
+
+    def registrar(self, etapa, segundos, filas=None, ok=True, pico_antes=None, inicio=None):
+        """
+        Registra una etapa ya medida.
+
+        Args:
+            etapa (str): Nombre de la etapa
+            segundos (float): Duración
+            filas (int): Filas procesadas, si aplica
+            ok (bool): False si la etapa terminó con error
+            pico_antes (float): Memoria pico al empezar la etapa, en MiB
+            inicio (str): Fecha ISO de inicio; por defecto, ahora
+        """
+        if self.registro is None:
+            return
+        pico = memoria_pico_mb()
+        try:
+            self.registro.agregar({
+                'corrida': self.id,
+                'nombre': self.nombre,
+                'etapa': etapa,
+                'inicio': inicio or datetime.now().isoformat(timespec='seconds'),
+                'segundos': round(segundos, 4),
+                'filas': filas,
+                'pico_mb': None if pico is None else round(pico, 1),
+                'aumento_pico_mb': None if pico is None or pico_antes is None else round(pico - pico_antes, 1),
+                'ok': ok
+            })
+        except OSError:
+            # Las métricas nunca deben interrumpir el trabajo que miden
+            pass
+
+    @contextmanager
+    def etapa(self, etapa, filas=None):
+        """
+        Mide el bloque como una etapa.
+
+        Args:
+            etapa (str): Nombre de la etapa
+            filas (int): Filas procesadas, si se conocen de antemano
+
+        Yields:
+            dict: Medición en curso; dentro del bloque se puede asignar
+                medicion['filas'] y marcar medicion['ok'] = False si la etapa
+                falló sin lanzar una excepción
+        """
+        medicion = {'filas': filas, 'ok': True}
+        inicio = datetime.now().isoformat(timespec='seconds')
+        pico_antes = memoria_pico_mb()
+        reloj = time.perf_counter()
+        ok = False
+        try:
+            yield medicion
+            ok = True
+        finally:
+            self.registrar(
+                etapa, time.perf_counter() - reloj, medicion['filas'], ok and medicion['ok'], pico_antes, inicio
+            )
+
+
+def resumir_corridas(registros):
+    """
+    Args:
+        registros (list): Registros de RegistroMetricas.recientes
+
+    Returns:
+        DataFrame: Una fila por corrida con inicio, nombre, etapas, segundos
+            (suma de sus etapas), pico_mb y errores, de la más reciente a la
+            más antigua
+    """
+    import pandas as pd
+
+    if not registros:
+        return pd.DataFrame(columns=['corrida', 'inicio', 'nombre', 'etapas', 'segundos', 'pico_mb', 'errores'])
+    df = pd.DataFrame(registros)
+    df['error'] = ~df['ok'].astype(bool)
+    return (
+        df.groupby('corrida', sort=False)
+        .agg(
+            inicio=('inicio', 'min'),
+            nombre=('nombre', 'first'),
+            etapas=('etapa', 'size'),
+            segundos=('segundos', 'sum'),
+            pico_mb=('pico_mb', 'max'),
+            errores=('error', 'sum')
+        )
+        .reset_index()
+        .sort_values('inicio', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
+
+
+def etapas_mas_lentas(registros, limite=10):
+    """
+    Args:
+        registros (list): Registros de RegistroMetricas.recientes
+        limite (int): Máximo de etapas
+
+    Returns:
+        DataFrame: Por tipo de corrida y etapa: veces, segundos mediana y
+            máximo, filas por segundo (mediana) y aumento máximo de la memoria
+            pico, ordenado por el máximo de segundos
+    """
+    import pandas as pd
+
+    columnas = ['nombre', 'etapa', 'veces', 'segundos_mediana', 'segundos_max', 'filas_por_segundo', 'aumento_pico_mb']
+    if not registros:
+        return pd.DataFrame(columns=columnas)
+    df = pd.DataFrame(registros)
+    filas = pd.to_numeric(df['filas'], errors='coerce')
+    df['filas_por_segundo'] = (filas / df['segundos']).where(df['segundos'] > 0)
+    return (
+        df.groupby(['nombre', 'etapa'])
+        .agg(
+            veces=('segundos', 'size'),
+            segundos_mediana=('segundos', 'median'),
+            segundos_max=('segundos', 'max'),
+            filas_por_segundo=('filas_por_segundo', 'median'),
+            aumento_pico_mb=('aumento_pico_mb', 'max')
+        )
+        .reset_index()
+        .sort_values('segundos_max', ascending=False)
+        .head(limite)
+        .reset_index(drop=True)[columnas]
+    )
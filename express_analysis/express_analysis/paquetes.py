@@ -0,0 +1,71 @@
+"""
+Paquetes ZIP para descargar varios archivos a la vez.
+
+Los archivos se comprimen en disco por bloques, sin cargarlos completos en
+memoria, dentro de una carpeta de caché. El nombre de cada paquete es la
+huella de la selección (nombres, tamaños y fechas de modificación), así que
+pedir otra vez la misma selección sin cambios devuelve el ZIP ya creado.
+"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+from .memo import huella_archivos
+
+# Bytes leídos y comprimidos por bloque
+TAMANO_BLOQUE = 1024 * 1024
+
+# Paquetes que se conservan en la caché (los usados más recientemente)
+MAX_PAQUETES = 8
+
+
+def _limpiar(directorio, conservar):
+    paquetes = sorted(directorio.glob("*.zip"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for paquete in paquetes[conservar:]:
+        try:
+            paquete.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def crear_paquete(rutas, directorio):
+    """
+    Crea (o reutiliza) el ZIP de una selección de archivos.
+
+    Args:
+        rutas (list): Archivos a incluir; dentro del ZIP se guardan por nombre
+        directorio (Path): Carpeta de caché de paquetes
+
+    Returns:
+        Path: Ruta del ZIP
+    """
+    rutas = sorted(Path(r) for r in rutas)
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    destino = directorio / f"{huella_archivos(*rutas)}.zip"
+
+    if destino.exists():
+        # Marcarlo como usado para que la limpieza no lo descarte
+        os.utime(destino)
+        return destino
+
+    descriptor, temporal = tempfile.mkstemp(prefix=".paquete_", suffix=".tmp", dir=directorio)
+    os.close(descriptor)
+    temporal = Path(temporal)
+    try:
+        with zipfile.ZipFile(temporal, 'w', compression=zipfile.ZIP_DEFLATED) as paquete:
+            for ruta in rutas:
+                info = zipfile.ZipInfo.from_file(ruta, arcname=ruta.name)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(ruta, 'rb') as origen, paquete.open(info, 'w', force_zip64=True) as salida:
+                    shutil.copyfileobj(origen, salida, TAMANO_BLOQUE)
+        os.replace(temporal, destino)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+
+    _limpiar(directorio, MAX_PAQUETES)
+    return destino
@@ -0,0 +1,302 @@
+"""
+Procesamiento de lotes de archivos de detalle.
+
+Cada archivo se lee y se cruza contra el índice de Wicho de forma
+independiente, así que el lote puede repartirse entre varios procesos. Los
+errores se capturan por archivo (un archivo dañado no detiene el lote) y los
+resultados se devuelven siempre en el orden de entrada, de modo que el
+resultado final es idéntico al de una ejecución en serie.
+
+Para archivos muy grandes el detalle puede leerse por bloques: solo el bloque
+actual y las líneas encontradas (a lo sumo una por número de Wicho) se
+mantienen en memoria, y cada archivo se entrega al sumidero en cuanto termina.
+
+El detalle se lee con las columnas de esquema.ESQUEMA_DETALLE y las líneas
+encontradas se compactan con ESQUEMA_RESULTADO antes de entregarse.
+
+Los procesos trabajadores se inician con "spawn" y no con fork: el lote se
+lanza desde un hilo de la aplicación de Streamlit (trabajos.EjecutorTrabajos)
+mientras otros hilos (la cola de Git, el servidor, los candados del memo)
+siguen vivos, y un hijo creado con fork podría heredar uno de sus candados
+tomado y bloquearse. Cada trabajador recibe el índice de Wicho serializado.
+"""
+
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .esquema import ESQUEMA_DETALLE, ESQUEMA_RESULTADO, compactar
+from .lector_detalle import leer_detalle, leer_detalle_por_bloques
+
+# Estados posibles de un archivo procesado
+OK = 'ok'
+SIN_COINCIDENCIAS = 'sin_coincidencias'
+SIN_COLUMNA = 'sin_columna'
+ERROR = 'error'
+
+
+@dataclass
+class ResultadoDetalle:
+    """
+    Resultado de procesar un archivo de detalle.
+
+    Atributos:
+        archivo (str): Nombre del archivo
+        estado (str): OK, SIN_COINCIDENCIAS, SIN_COLUMNA o ERROR
+        periodo: Periodo leído del archivo
+        datos (DataFrame): Líneas encontradas (solo con estado OK)
+        mensaje (str): Detalle del error, si lo hubo
+        filas_leidas (int): Filas de datos leídas del archivo
+        segundos_lectura (float): Tiempo de lectura del libro
+        segundos_cruce (float): Tiempo del cruce contra Wicho
+        telefonos (dict): Conteos de la normalización de la columna de
+            teléfono (ver indice_wicho.normalizar_telefonos)
+    """
+    archivo: str
+    estado: str
+    periodo: object = None
+    datos: pd.DataFrame = None
+    mensaje: str = ''
+    filas_leidas: int = 0
+    segundos_lectura: float = 0.0
+    segundos_cruce: float = 0.0
+    telefonos: dict = None
+
+    @property
+    def lineas(self):
+        return 0 if self.datos is None else len(self.datos)
+
+
+def procesar_detalle(indice_wicho, ruta, filas_por_bloque=None):
+    """
+    Lee un archivo de detalle y lo cruza contra el índice de Wicho.
+
+    Args:
+        indice_wicho (IndiceWicho): Índice de números de Wicho
+        ruta (Path): Ruta del archivo de detalle
+        filas_por_bloque (int): Si se indica, el archivo se lee por bloques
+            de ese número de filas en lugar de cargarlo completo
+
+    Returns:
+        ResultadoDetalle: Nunca lanza excepciones; los errores quedan en el
+            estado ERROR
+    """
+    archivo = Path(ruta).name
+    inicio = time.perf_counter()
+    telefonos = {}
+    try:
+        if filas_por_bloque:
+            periodo, columna_numero, datos, filas_leidas, segundos_cruce = _cruzar_por_bloques(
+                indice_wicho, ruta, filas_por_bloque, telefonos
+            )
+            segundos_lectura = time.perf_counter() - inicio - segundos_cruce
+        else:
+            libro = leer_detalle(ruta, ESQUEMA_DETALLE)
+            compactar(libro.datos, ESQUEMA_DETALLE)
+            periodo, columna_numero, filas_leidas = libro.periodo, libro.columna_numero, len(libro.datos)
+            segundos_lectura = time.perf_counter() - inicio
+            datos = indice_wicho.cruzar(libro.datos, columna_numero, telefonos) if columna_numero else None
+            segundos_cruce = time.perf_counter() - inicio - segundos_lectura
+
+        tiempos = {
+            'filas_leidas': filas_leidas,
+            'segundos_lectura': segundos_lectura,
+            'segundos_cruce': segundos_cruce,
+            'telefonos': telefonos
+        }
+        if not columna_numero:
+            return ResultadoDetalle(archivo, SIN_COLUMNA, periodo, **tiempos)
+        if datos.empty:
+            return ResultadoDetalle(archivo, SIN_COINCIDENCIAS, periodo, **tiempos)
+
+        datos['Archivo_Detalle'] = archivo
+        datos['Periodo'] = periodo
+        compactar(datos, ESQUEMA_RESULTADO)
+        return ResultadoDetalle(archivo, OK, periodo, datos, **tiempos)
+    except Exception as e:
+        return ResultadoDetalle(archivo, ERROR, mensaje=str(e), segundos_lectura=time.perf_counter() - inicio)
+
+
+def _cruzar_por_bloques(indice_wicho, ruta, filas_por_bloque, telefonos=None):
+    """
+    Cruza un archivo de detalle leyéndolo por bloques.
+
+    De cada bloque solo se conservan las filas con número en Wicho que no
+    aparecieron en bloques anteriores, así que la memoria queda acotada por el
+    tamaño del bloque más el de Wicho, no por el tamaño del archivo.
+    Los conteos de la normalización de teléfonos se acumulan en `telefonos`.
+
+    Returns:
+        tuple: (periodo, columna de teléfono, DataFrame del cruce o None,
+            filas leídas, segundos del cruce sin contar la lectura)
+    """
+    vistos = np.zeros(len(indice_wicho), dtype=bool)
+    partes = []
+    posiciones = []
+    periodo = None
+    filas_leidas = 0
+    segundos_cruce = 0.0
+
+    for bloque in leer_detalle_por_bloques(ruta, filas_por_bloque, ESQUEMA_DETALLE):
+        periodo = bloque.periodo
+        filas_leidas += len(bloque.datos)
+        if not bloque.columna_numero:
+            return periodo, None, None, filas_leidas, segundos_cruce
+        inicio = time.perf_counter()
+        filas, posiciones_bloque = indice_wicho.coincidencias(
+            bloque.datos, bloque.columna_numero, vistos, telefonos
+        )
+        if len(filas):
+            partes.append(bloque.datos.iloc[filas])
+            posiciones.append(posiciones_bloque)
+        segundos_cruce += time.perf_counter() - inicio
+        columna_numero = bloque.columna_numero
+        columnas = bloque.columnas
+
+    if not partes:
+        return periodo, columna_numero, pd.DataFrame(columns=columnas), filas_leidas, segundos_cruce
+
+    inicio = time.perf_counter()
+    encontradas = pd.concat(partes, ignore_index=True)
+    datos = indice_wicho.armar(encontradas, np.arange(len(encontradas)), np.concatenate(posiciones))
+    segundos_cruce += time.perf_counter() - inicio
+    return periodo, columna_numero, datos, filas_leidas, segundos_cruce
+
+
+# Índice de Wicho de cada proceso trabajador, recibido una sola vez al iniciar
+_indice_trabajador = None
+
+
+def _iniciar_trabajador(indice_wicho):
+    global _indice_trabajador
+    _indice_trabajador = indice_wicho
+
+
+def _procesar_en_trabajador(ruta, filas_por_bloque):
+    return procesar_detalle(_indice_trabajador, ruta, filas_por_bloque)
+
+
+def iterar_lote(indice_wicho, rutas, trabajadores=1, filas_por_bloque=None):
+    """
+    Procesa una lista de archivos de detalle y entrega cada resultado en
+    cuanto está listo, siempre en el orden de `rutas`.
+
+    En paralelo se mantienen a lo sumo dos archivos en curso por proceso, de
+    modo que los resultados pendientes de entregar no crecen con el lote.
+
+    Args:
+        indice_wicho (IndiceWicho): Índice de números de Wicho
+        rutas (list): Rutas de los archivos de detalle
+        trabajadores (int): Número de procesos; 1 procesa en serie
+        filas_por_bloque (int): Lectura por bloques (ver procesar_detalle)
+
+    Yields:
+        ResultadoDetalle: Un resultado por archivo
+    """
+    rutas = list(rutas)
+
+    if trabajadores <= 1 or len(rutas) <= 1:
+        for ruta in rutas:
+            yield procesar_detalle(indice_wicho, ruta, filas_por_bloque)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(trabajadores, len(rutas)),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_iniciar_trabajador,
+        initargs=(indice_wicho,)
+    ) as ejecutor:
+        def enviar(ruta):
+            try:
+                return ejecutor.submit(_procesar_en_trabajador, ruta, filas_por_bloque)
+            except BrokenProcessPool as e:
+                futuro = Future()
+                futuro.set_exception(e)
+                return futuro
+
+        pendientes = deque()
+        siguientes = iter(rutas)
+        for ruta in siguientes:
+            pendientes.append((ruta, enviar(ruta)))
+            if len(pendientes) >= 2 * trabajadores:
+                break
+
+        while pendientes:
+            ruta, futuro = pendientes.popleft()
+            siguiente = next(siguientes, None)
+            if siguiente is not None:
+                pendientes.append((siguiente, enviar(siguiente)))
+            try:
+                yield futuro.result()
+            except BrokenProcessPool as e:
+                yield ResultadoDetalle(Path(ruta).name, ERROR, mensaje=f"Proceso trabajador interrumpido: {e}")
+            except Exception as e:
+                yield ResultadoDetalle(Path(ruta).name, ERROR, mensaje=str(e))
+
+
+def procesar_lote(indice_wicho, rutas, trabajadores=1, al_terminar=None, filas_por_bloque=None):
+    """
+    Procesa una lista de archivos de detalle, en serie o en paralelo.
+
+    Args:
+        indice_wicho (IndiceWicho): Índice de números de Wicho
+        rutas (list): Rutas de los archivos de detalle
+        trabajadores (int): Número de procesos; 1 procesa en serie
+        al_terminar (callable): Se llama con cada ResultadoDetalle en cuanto
+            está listo
+        filas_por_bloque (int): Lectura por bloques (ver procesar_detalle)
+
+    Returns:
+        list: ResultadoDetalle en el mismo orden que `rutas`
+    """
+    resultados = []
+    for resultado in iterar_lote(indice_wicho, rutas, trabajadores, filas_por_bloque):
+        if al_terminar:
+            al_terminar(resultado)
+        resultados.append(resultado)
+    return resultados
+
+
+def unir_resultados(resultados):
+    """
+    Concatena las líneas encontradas de un lote, en el orden del lote.
+
+    Args:
+        resultados (list): ResultadoDetalle devueltos por procesar_lote
+
+    Returns:
+        DataFrame: Resultado final, o None si no hubo coincidencias
+    """
+    marcos = [r.datos for r in resultados if r.estado == OK]
+    if not marcos:
+        return None
+    return pd.concat(marcos, ignore_index=True)
+
+
+class SumideroMemoria:
+    """
+    Sumidero que acumula en memoria las líneas encontradas de cada archivo.
+
+    Los sumideros reciben los archivos en orden con escribir() y devuelven el
+    resultado con cerrar().
+    """
+
+    def __init__(self):
+        self.marcos = []
+        self.lineas = 0
+
+    def escribir(self, datos):
+        self.marcos.append(datos)
+        self.lineas += len(datos)
+
+    def cerrar(self):
+        if not self.marcos:
+            return None
+        return pd.concat(self.marcos, ignore_index=True)
@@ -0,0 +1,74 @@
+"""
+Estructura de carpetas y archivos de datos de la aplicación.
+
+La aplicación de Streamlit y la línea de comandos trabajan sobre la misma
+raíz de datos: Detalle/, Resultados/, Detalle historico/, el archivo Wicho y
+Temp/ con los datos derivados (libro mayor, cachés, trabajos).
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+NOMBRE_WICHO = "CHIPS RUTA JL CABRERA WICHO.xlsx"
+
+
+@dataclass(frozen=True)
+class Rutas:
+    """
+    Rutas de datos bajo una raíz.
+
+    Atributos:
+        raiz (Path): Carpeta raíz de los datos
+    """
+    raiz: Path
+
+    def __post_init__(self):
+        object.__setattr__(self, 'raiz', Path(self.raiz))
+
+    @property
+    def detalle(self):
+        return self.raiz / "Detalle"
+
+    @property
+    def resultados(self):
+        return self.raiz / "Resultados"
+
+    @property
+    def historico(self):
+        return self.raiz / "Detalle historico"
+
+    @property
+    def temp(self):
+        return self.raiz / "Temp"
+
+    @property
+    def wicho(self):
+        return self.raiz / NOMBRE_WICHO
+
+    @property
+    def metadatos_wicho(self):
+        """Registro de metadatos del archivo Wicho (ver metadatos_wicho.py)."""
+        return self.temp / "wicho_metadatos.json"
+
+    @property
+    def estados_pago(self):
+        """Registro de cambios de estado de pago (ver libro_mayor.py)."""
+        return self.resultados / "estados_pago.json"
+
+    @property
+    def libro_mayor(self):
+        return self.temp / "libro_mayor.sqlite"
+
+    @property
+    def cache_libros(self):
+        return self.temp / "cache_libros"
+
+    @property
+    def metricas(self):
+        """Registro de métricas de ejecución por etapa (ver metricas.py)."""
+        return self.temp / "metricas.jsonl"
+
+    def crear_directorios(self):
+        """Crea las carpetas de datos que no existan."""
+        for directorio in [self.detalle, self.resultados, self.historico, self.temp]:
+            directorio.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,157 @@
+"""
+Sincronización incremental de carpetas de archivos Excel.
+
+Mantiene una copia espejo de los archivos .xlsx de varias carpetas (por
+ejemplo del repositorio en Temp/) y un manifiesto con el tamaño, la fecha de
+modificación y el hash de cada archivo de origen. En cada sincronización solo
+se copian los archivos nuevos o modificados; los demás se descartan con un
+os.stat, así que una sincronización sin cambios tarda milisegundos.
+
+Las copias se hacen con reflink (copia en escritura) cuando el sistema de
+archivos lo permite, si no con un enlace duro y, como último recurso, con una
+copia completa.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from .cache_libros import calcular_hash_archivo
+
+# ioctl FICLONE de Linux (reflink en btrfs, xfs y similares)
+FICLONE = 0x40049409
+
+
+def _reflink(origen, destino):
+    import fcntl
+
+    with open(origen, 'rb') as fuente, open(destino, 'wb') as copia:
+        fcntl.ioctl(copia.fileno(), FICLONE, fuente.fileno())
+    shutil.copystat(origen, destino)
+
+
+def copiar_archivo(origen, destino):
+    """
+    Copia un archivo por el medio más barato disponible.
+
+    Args:
+        origen (Path): Archivo de origen
+        destino (Path): Ruta de la copia; se reemplaza si existe
+
+    Returns:
+        str: 'reflink', 'enlace' o 'copia'
+    """
+    temporal = destino.with_name(f".{destino.name}.tmp")
+    if temporal.exists():
+        temporal.unlink()
+    try:
+        try:
+            _reflink(origen, temporal)
+            metodo = 'reflink'
+        except (ImportError, OSError):
+            if temporal.exists():
+                temporal.unlink()
+            try:
+                os.link(origen, temporal)
+                metodo = 'enlace'
+            except OSError:
+                shutil.copy2(origen, temporal)
+                metodo = 'copia'
+        os.replace(temporal, destino)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+    return metodo
+
+
+class Sincronizador:
+    """
+    Sincroniza pares (carpeta de origen, carpeta espejo) usando un manifiesto
+    persistente en JSON.
+    """
+
+    def __init__(self, archivo_manifiesto):
+        self.archivo_manifiesto = Path(archivo_manifiesto)
+        self._lock = threading.Lock()
+        self._manifiesto = self._cargar_manifiesto()
+
+    def _cargar_manifiesto(self):
+        try:
+            with open(self.archivo_manifiesto, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _guardar_manifiesto(self):
+        self.archivo_manifiesto.parent.mkdir(parents=True, exist_ok=True)
+        temporal = self.archivo_manifiesto.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._manifiesto, f, ensure_ascii=False, indent=1)
+        os.replace(temporal, self.archivo_manifiesto)
+
+    def sincronizar(self, pares):
+        """
+        Copia a cada carpeta espejo los .xlsx nuevos o modificados de su
+        carpeta de origen y elimina las copias cuyo origen ya no existe.
+
+        Args:
+            pares (list): Tuplas (carpeta de origen, carpeta espejo)
+
+        Returns:
+            dict: Listas 'nuevos', 'modificados' y 'eliminados', número de
+                archivos 'sin_cambios', copias por 'metodos' y 'segundos'
+        """
+        inicio = time.perf_counter()
+        resumen = {'nuevos': [], 'modificados': [], 'eliminados': [], 'sin_cambios': 0, 'metodos': {}}
+
+        with self._lock:
+            cambios = False
+            for origen_dir, espejo_dir in pares:
+                origen_dir, espejo_dir = Path(origen_dir), Path(espejo_dir)
+                origen_dir.mkdir(parents=True, exist_ok=True)
+                espejo_dir.mkdir(parents=True, exist_ok=True)
+                prefijo = str(espejo_dir) + os.sep
+
+                vistos = set()
+                for archivo in sorted(origen_dir.glob("*.xlsx")):
+                    destino = espejo_dir / archivo.name
+                    clave = str(destino)
+                    vistos.add(clave)
+                    info = archivo.stat()
+                    entrada = self._manifiesto.get(clave)
+                    if (entrada and entrada['tamano'] == info.st_size
+                            and entrada['mtime_ns'] == info.st_mtime_ns and destino.exists()):
+                        resumen['sin_cambios'] += 1
+                        continue
+
+                    hash_archivo = calcular_hash_archivo(archivo)
+                    if entrada and entrada['hash'] == hash_archivo and destino.exists():
+                        # Solo cambió la fecha de modificación
+                        resumen['sin_cambios'] += 1
+                    else:
+                        metodo = copiar_archivo(archivo, destino)
+                        resumen['metodos'][metodo] = resumen['metodos'].get(metodo, 0) + 1
+                        resumen['modificados' if entrada else 'nuevos'].append(clave)
+                    self._manifiesto[clave] = {
+                        'tamano': info.st_size,
+                        'mtime_ns': info.st_mtime_ns,
+                        'hash': hash_archivo
+                    }
+                    cambios = True
+
+                # Copias cuyo archivo de origen ya no existe
+                for clave in [c for c in self._manifiesto if c.startswith(prefijo) and c not in vistos]:
+                    if Path(clave).exists():
+                        Path(clave).unlink()
+                    del self._manifiesto[clave]
+                    resumen['eliminados'].append(clave)
+                    cambios = True
+
+            if cambios:
+                self._guardar_manifiesto()
+
+        resumen['segundos'] = time.perf_counter() - inicio
+        return resumen
@@ -0,0 +1,243 @@
+"""
+Ejecutor local de trabajos en segundo plano.
+
+Los análisis largos se envían como trabajos a un hilo de fondo en lugar de
+ejecutarse dentro del script de Streamlit. Cada trabajo tiene un id y un
+estado persistido en un archivo JSON (en_cola, ejecutando, terminado, fallido
+o cancelado) con el avance por archivo y el tiempo estimado restante, así que
+la página puede consultarlo en cada recarga sin bloquearse y el trabajo
+sobrevive a reruns y reconexiones del navegador.
+
+Solo se conservan los últimos trabajos terminados (ver CONSERVAR_TRABAJOS);
+los más antiguos se borran de memoria y de la carpeta al terminar cada
+trabajo y al arrancar.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Estados de un trabajo
+EN_COLA = 'en_cola'
+EJECUTANDO = 'ejecutando'
+TERMINADO = 'terminado'
+FALLIDO = 'fallido'
+CANCELADO = 'cancelado'
+
+ACTIVOS = (EN_COLA, EJECUTANDO)
+
+# Trabajos terminados (o fallidos o cancelados) que se conservan
+CONSERVAR_TRABAJOS = 50
+
+
+def _ahora():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class Trabajo:
+    """
+    Vista de un trabajo para la función que lo ejecuta.
+
+    La función recibe este objeto para informar el total de pasos, registrar
+    el avance de cada archivo y consultar si se pidió cancelar.
+    """
+
+    def __init__(self, ejecutor, id_trabajo):
+        self._ejecutor = ejecutor
+        self.id = id_trabajo
+
+    def fijar_total(self, total):
+        """Número de archivos que procesará el trabajo."""
+        self._ejecutor._actualizar(self.id, total=total)
+
+    def avanzar(self, archivo, estado, lineas=0, mensaje='', periodo=None):
+        """
+        Registra que terminó un archivo y recalcula el tiempo restante.
+
+        Args:
+            archivo (str): Nombre del archivo
+            estado (str): Estado del archivo (ver procesamiento.py)
+            lineas (int): Líneas encontradas
+            mensaje (str): Detalle del error, si lo hubo
+            periodo: Periodo del archivo, si se conoce
+        """
+        self._ejecutor._registrar_evento(self.id, {
+            'fecha': _ahora(),
+            'archivo': archivo,
+            'estado': estado,
+            'lineas': int(lineas),
+            'mensaje': mensaje,
+            'periodo': None if periodo is None else str(periodo)
+        })
+
+    def cancelado(self):
+        """True si se pidió cancelar el trabajo."""
+        return self._ejecutor._cancelaciones[self.id].is_set()
+
+
+class EjecutorTrabajos:
+    """
+    Ejecuta trabajos de uno en uno en un hilo de fondo y persiste su estado.
+
+    Al crearse marca como fallidos los trabajos que quedaron en_cola o
+    ejecutando en una ejecución anterior del servidor.
+    """
+
+    def __init__(self, directorio, conservar=CONSERVAR_TRABAJOS):
+        """
+        Args:
+            directorio (Path): Carpeta de los archivos JSON de los trabajos
+            conservar (int): Trabajos terminados que se conservan
+        """
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.conservar = max(int(conservar), 1)
+        self._lock = threading.Lock()
+        self._trabajos = {}
+        self._cancelaciones = {}
+        self._inicios = {}
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trabajos")
+
+        for ruta in self.directorio.glob("*.json"):
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    trabajo = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if trabajo['estado'] in ACTIVOS:
+                trabajo.update({
+                    'estado': FALLIDO,
+                    'terminado': _ahora(),
+                    'error': "Interrumpido por un reinicio del servidor"
+                })
+                self._guardar(trabajo)
+            self._trabajos[trabajo['id']] = trabajo
+        self._depurar()
+
+    def _guardar(self, trabajo):
+        ruta = self.directorio / f"{trabajo['id']}.json"
+        temporal = ruta.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(trabajo, f, ensure_ascii=False, indent=1, default=str)
+        os.replace(temporal, ruta)
+
+    def _depurar(self):
+        """Borra los trabajos terminados más antiguos que los últimos `conservar`."""
+        terminados = sorted(i for i, t in self._trabajos.items() if t['estado'] not in ACTIVOS)
+        for id_trabajo in terminados[:max(len(terminados) - self.conservar, 0)]:
+            del self._trabajos[id_trabajo]
+            (self.directorio / f"{id_trabajo}.json").unlink(missing_ok=True)
+
+    def _actualizar(self, id_trabajo, **cambios):
+        with self._lock:
+            trabajo = self._trabajos[id_trabajo]
+            trabajo.update(cambios)
+            self._guardar(trabajo)
+
+    def _registrar_evento(self, id_trabajo, evento):
+        with self._lock:
+            trabajo = self._trabajos[id_trabajo]
+            trabajo['eventos'].append(evento)
+            trabajo['completados'] += 1
+            transcurrido = time.monotonic() - self._inicios[id_trabajo]
+            restantes = max(trabajo['total'] - trabajo['completados'], 0)
+            trabajo['eta_segundos'] = round(transcurrido / trabajo['completados'] * restantes, 1)
+            self._guardar(trabajo)
+
+    def enviar(self, descripcion, funcion):
+        """
+        Encola un trabajo.
+
+        Args:
+            descripcion (str): Texto que se muestra en la página
+            funcion (callable): Recibe un Trabajo y devuelve un dict
+                serializable con el resultado. Si lanza una excepción después
+                de que se pidió cancelar, el trabajo queda cancelado
+
+        Returns:
+            str: Id del trabajo
+        """
+        # Con microsegundos, para que el orden de los ids sea el de envío
+        id_trabajo = datetime.now().strftime("%Y%m%d%H%M%S%f") + "_" + uuid.uuid4().hex[:6]
+        trabajo = {
+            'id': id_trabajo,
+            'descripcion': descripcion,
+            'estado': EN_COLA,
+            'creado': _ahora(),
+            'iniciado': None,
+            'terminado': None,
+            'total': 0,
+            'completados': 0,
+            'eta_segundos': None,
+            'eventos': [],
+            'resultado': None,
+            'error': None
+        }
+        with self._lock:
+            self._trabajos[id_trabajo] = trabajo
+            self._cancelaciones[id_trabajo] = threading.Event()
+            self._guardar(trabajo)
+        self._ejecutor.submit(self._ejecutar, id_trabajo, funcion)
+        return id_trabajo
+
+    def _ejecutar(self, id_trabajo, funcion):
+        try:
+            if self._cancelaciones[id_trabajo].is_set():
+                self._actualizar(id_trabajo, estado=CANCELADO, terminado=_ahora())
+                return
+            self._inicios[id_trabajo] = time.monotonic()
+            self._actualizar(id_trabajo, estado=EJECUTANDO, iniciado=_ahora())
+            try:
+                resultado = funcion(Trabajo(self, id_trabajo))
+                self._actualizar(id_trabajo, estado=TERMINADO, terminado=_ahora(), resultado=resultado, eta_segundos=0)
+            except Exception as e:
+                if self._cancelaciones[id_trabajo].is_set():
+                    self._actualizar(id_trabajo, estado=CANCELADO, terminado=_ahora(), eta_segundos=None)
+                else:
+                    self._actualizar(id_trabajo, estado=FALLIDO, terminado=_ahora(), error=str(e), eta_segundos=None)
+        finally:
+            # El trabajo ya no está activo: cancelar() no vuelve a buscar su
+            # evento y el tiempo de inicio ya no se usa
+            with self._lock:
+                self._cancelaciones.pop(id_trabajo, None)
+                self._inicios.pop(id_trabajo, None)
+                self._depurar()
+
+    def cancelar(self, id_trabajo):
+        """
+        Pide cancelar un trabajo. Uno en cola no llega a ejecutarse; uno en
+        ejecución se detiene después del archivo en curso.
+
+        Returns:
+            bool: True si el trabajo seguía activo
+        """
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            evento = self._cancelaciones.get(id_trabajo)
+            if trabajo is None or trabajo['estado'] not in ACTIVOS or evento is None:
+                return False
+            evento.set()
+            return True
+
+    def estado(self, id_trabajo):
+        """Copia del estado del trabajo, o None si no existe."""
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            return json.loads(json.dumps(trabajo, default=str)) if trabajo else None
+
+    def recientes(self, cantidad=5):
+        """Estados de los últimos trabajos, del más reciente al más antiguo."""
+        with self._lock:
+            ids = sorted(self._trabajos, reverse=True)[:cantidad]
+        return [self.estado(id_trabajo) for id_trabajo in ids]
+
+    def activo(self):
+        """Estado del trabajo en cola o en ejecución más antiguo, o None."""
+        with self._lock:
+            activos = sorted(i for i, t in self._trabajos.items() if t['estado'] in ACTIVOS)
+        return self.estado(activos[0]) if activos else None
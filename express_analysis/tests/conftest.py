@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Las pruebas importan el motor igual que app.py, desde express_analysis/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
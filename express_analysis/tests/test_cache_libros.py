@@ -0,0 +1,45 @@
+import pandas as pd
+
+from express_analysis.cache_libros import CacheLibros
+
+
+def escribir(ruta, filas):
+    pd.DataFrame({'CEL': [5512340000 + i for i in range(filas)]}).to_excel(ruta, index=False)
+    return ruta
+
+
+def test_relee_desde_el_sidecar(tmp_path):
+    ruta = escribir(tmp_path / 'resultado.xlsx', 3)
+    cache = CacheLibros(tmp_path / 'cache')
+
+    primera = cache.leer_excel(ruta)
+    segunda = cache.leer_excel(ruta)
+
+    pd.testing.assert_frame_equal(primera, segunda)
+    assert (cache.estadisticas()['fallos'], cache.estadisticas()['aciertos']) == (1, 1)
+    assert cache.estadisticas()['sidecars'] == 1
+
+
+def test_borra_los_sidecars_de_contenidos_reemplazados(tmp_path):
+    modificado = escribir(tmp_path / 'modificado.xlsx', 3)
+    intacto = escribir(tmp_path / 'intacto.xlsx', 5)
+    cache = CacheLibros(tmp_path / 'cache')
+    cache.leer_excel(modificado)
+    cache.leer_excel(intacto)
+    anteriores = {ruta.name for ruta in cache.directorio.glob('*.parquet')}
+
+    escribir(modificado, 4)
+    assert len(cache.leer_excel(modificado)) == 4
+
+    actuales = {ruta.name for ruta in cache.directorio.glob('*.parquet')}
+    assert len(actuales) == 2
+    assert sorted(ruta.split('_')[0] for ruta in actuales) == sorted(
+        [cache.hash_contenido(modificado), cache.hash_contenido(intacto)]
+    )
+    assert len(anteriores & actuales) == 1
+
+    # Un manifiesto nuevo también descarta los sidecars que no conoce
+    (cache.directorio / f"{'0' * 64}_00000000.parquet").write_bytes(b'')
+    otra = CacheLibros(tmp_path / 'cache')
+    otra.hash_contenido(escribir(tmp_path / 'nuevo.xlsx', 1))
+    assert {ruta.name for ruta in otra.directorio.glob('*.parquet')} == actuales
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from express_analysis.cli import crear_parser, main
+
+
+@pytest.mark.parametrize('opciones, formato', [
+    ([], 'texto'),
+    (['--formato-resumen', 'json'], 'json'),
+    # Nombre anterior, aceptado para no romper tareas programadas
+    (['--formato', 'csv'], 'csv'),
+])
+def test_formato_del_resumen(opciones, formato):
+    assert crear_parser().parse_args(['aggregate', *opciones]).formato == formato
+
+
+def test_ayuda_no_sugiere_otro_formato_de_resultados(capsys):
+    with pytest.raises(SystemExit):
+        crear_parser().parse_args(['process', '--help'])
+
+    ayuda = capsys.readouterr().out
+    assert '--formato-resumen' in ayuda
+    assert '--formato ' not in ayuda
+
+
+def test_aggregate_imprime_el_resumen_en_json(tmp_path, capsys):
+    assert main(['aggregate', '--datos', str(tmp_path), '--formato-resumen', 'json']) == 0
+
+    assert json.loads(capsys.readouterr().out) == []
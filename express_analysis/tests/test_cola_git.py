@@ -0,0 +1,62 @@
+import subprocess
+
+import pytest
+
+from express_analysis.cola_git import ColaGit
+
+
+def git(directorio, *argumentos):
+    return subprocess.run(
+        ['git', *argumentos], cwd=directorio, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repositorio(tmp_path):
+    remoto = tmp_path / 'remoto.git'
+    local = tmp_path / 'local'
+    subprocess.run(['git', 'init', '-q', '--bare', str(remoto)], check=True)
+    subprocess.run(['git', 'init', '-q', '-b', 'trabajo', str(local)], check=True)
+    git(local, 'config', 'user.email', 'prueba@example.com')
+    git(local, 'config', 'user.name', 'Prueba')
+    (local / 'inicial.txt').write_text('inicial')
+    git(local, 'add', 'inicial.txt')
+    git(local, 'commit', '-q', '-m', 'inicial')
+    git(local, 'remote', 'add', 'respaldo', str(remoto))
+    git(local, 'push', '-q', '-u', 'respaldo', 'trabajo:produccion')
+    return local, remoto
+
+
+def test_commit_solo_incluye_el_lote(repositorio):
+    local, _ = repositorio
+    (local / 'ajeno.txt').write_text('preparado por otro proceso')
+    git(local, 'add', 'ajeno.txt')
+    (local / 'lote.txt').write_text('lote')
+
+    cola = ColaGit(local)
+    assert cola._confirmar([local / 'lote.txt'], 'Agregar lote')
+
+    assert git(local, 'show', '--name-only', '--format=', 'HEAD') == 'lote.txt'
+    assert git(local, 'diff', '--cached', '--name-only') == 'ajeno.txt'
+
+
+def test_lote_sin_cambios_no_confirma_el_indice(repositorio):
+    local, _ = repositorio
+    (local / 'ajeno.txt').write_text('preparado por otro proceso')
+    git(local, 'add', 'ajeno.txt')
+
+    assert not ColaGit(local)._confirmar([local / 'inicial.txt'], 'Sin cambios')
+    assert git(local, 'log', '--format=%s', '-1') == 'inicial'
+
+
+def test_push_usa_la_rama_remota_de_la_rama_actual(repositorio):
+    local, _ = repositorio
+    assert ColaGit(local)._destino_push() == ('respaldo', 'produccion')
+    assert ColaGit(local, remoto='otro', rama='main')._destino_push() == ('otro', 'main')
+
+
+def test_push_sin_rama_remota(repositorio):
+    local, _ = repositorio
+    git(local, 'branch', '--unset-upstream')
+    with pytest.raises(RuntimeError):
+        ColaGit(local)._destino_push()
@@ -0,0 +1,54 @@
+import sqlite3
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from express_analysis.cache_libros import CacheLibros
+from express_analysis.escritor_resultados import EscritorResultados
+from express_analysis.gemelos import CLAVE_VERSION, VERSION_GEMELO, escribir_gemelo, leer_gemelo, ruta_gemelo, tipar_bloque
+from express_analysis.libro_mayor import LibroMayor
+
+
+def lineas_resultado():
+    return pd.DataFrame({
+        'CEL': ['55 1234 5678', 5512345679, '+52 1 55 1234 5680'],
+        'Evaluación': ['1ra evaluación', '2da evaluación', '1ra evaluación'],
+        'Comisión': [25, 25, 25],
+        'Fecha Primera Recarga': pd.to_datetime(['2025-01-02', '2025-01-03', '2025-01-04']),
+        'Archivo_Detalle': 'detalle.xlsx',
+        'Periodo': '01/01/2025 AL 07/01/2025'
+    })
+
+
+def test_tipar_bloque_conserva_cel_de_texto():
+    tipado = tipar_bloque(lineas_resultado(), ['CEL', 'Comisión'])
+    assert tipado['CEL'].tolist() == ['55 1234 5678', '5512345679', '+52 1 55 1234 5680']
+    assert tipado['Comisión'].dtype == 'float64'
+
+
+def test_gemelo_de_otra_version_esta_vencido(tmp_path):
+    libro = tmp_path / '20250101_analisis_chipExpress_(PAGADO).xlsx'
+    destino = escribir_gemelo([lineas_resultado()], list(lineas_resultado().columns), libro, 'abc')
+    assert leer_gemelo(libro, 'abc', ['CEL']) is not None
+
+    tabla = pq.read_table(destino)
+    metadatos = dict(tabla.schema.metadata)
+    metadatos[CLAVE_VERSION] = str(VERSION_GEMELO - 1).encode()
+    pq.write_table(tabla.replace_schema_metadata(metadatos), ruta_gemelo(libro))
+    assert leer_gemelo(libro, 'abc', ['CEL']) is None
+
+
+def test_cel_de_texto_llega_al_libro_mayor(tmp_path):
+    resultados = tmp_path / 'Resultados'
+    resultados.mkdir()
+    escritor = EscritorResultados(resultados / '20250101_analisis_chipExpress_(PAGADO).xlsx')
+    escritor.escribir(lineas_resultado())
+    escritor.cerrar()
+
+    ruta_libro_mayor = tmp_path / 'libro_mayor.sqlite'
+    avisos = LibroMayor(ruta_libro_mayor).sincronizar(resultados, CacheLibros(tmp_path / 'cache'))
+
+    assert avisos == []
+    with sqlite3.connect(ruta_libro_mayor) as conexion:
+        cels = [fila[0] for fila in conexion.execute("SELECT cel FROM lineas ORDER BY id")]
+    assert cels == [5512345678, 5512345679, 5512345680]
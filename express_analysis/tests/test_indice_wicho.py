@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from express_analysis.indice_wicho import CONTEOS_TELEFONO, IndiceWicho, normalizar_telefonos
+
+COLUMNA_NUMERO = 'Número celular asignado'
+
+
+def cruce_anterior(dataframes_wicho, df_detalle, columna_numero):
+    """El cruce de la versión anterior: un pd.merge por hoja, concat y drop_duplicates."""
+    detalle_numerado = df_detalle.assign(_fila_detalle=np.arange(len(df_detalle)))
+    resultados = []
+    for df_wicho in dataframes_wicho.values():
+        if 'CEL' in df_wicho.columns:
+            df_join = pd.merge(
+                df_wicho.assign(_fila_wicho=np.arange(len(df_wicho))),
+                detalle_numerado,
+                left_on='CEL',
+                right_on=columna_numero,
+                how='inner'
+            )
+            # Orden documentado del inner merge (el de pandas 2.2, la versión
+            # fijada en requirements.txt): filas de Wicho y, para cada una,
+            # filas del detalle. pandas 3 no siempre lo respeta.
+            df_join = (
+                df_join.sort_values(['_fila_wicho', '_fila_detalle'], kind='stable')
+                .drop(columns=['_fila_wicho', '_fila_detalle'])
+            )
+            if not df_join.empty:
+                resultados.append(df_join)
+    return pd.concat(resultados, ignore_index=True).drop_duplicates(subset='CEL').reset_index(drop=True)
+
+
+def libro_wicho():
+    return {
+        'Resumen': pd.DataFrame({'TOTAL': [3]}),
+        'ENERO': pd.DataFrame({
+            'NO ': [1, 2, 3, 4],
+            'ICCID': ['8952000001', '8952000002', '8952000003', '8952000004'],
+            'CEL': [5512345678, 5512345679, 5512345680, 5512345678],
+            'CLIENTE': ['ABARROTES', 'PAPELERIA', 'FARMACIA', 'ABARROTES'],
+        }),
+        # Sus números ya están en ENERO: aporta la columna LOTE aunque sus
+        # filas se descarten como repetidas
+        'FEBRERO': pd.DataFrame({
+            'ICCID': ['8952000005', '8952000006'],
+            'CEL': [5512345680, 5512345679],
+            'LOTE': [7, 8],
+        }),
+        'MARZO': pd.DataFrame({
+            'ICCID': ['8952000007'],
+            'CEL': [5512345690],
+            'CLIENTE': ['TLAPALERIA'],
+        }),
+    }
+
+
+def detalle():
+    return pd.DataFrame({
+        COLUMNA_NUMERO: [5512345690, 5512345680, 5599999999, 5512345678, 5512345680],
+        'ICCID': ['D1', 'D2', 'D3', 'D4', 'D5'],
+        'Evaluación': ['1ra', '1ra', '2da', '3ra', '4ta'],
+        'Comisión': [25, 25, 25, 25, 50],
+    })
+
+
+def test_cruce_igual_al_merge_de_la_version_anterior():
+    wicho = libro_wicho()
+    nuevo = IndiceWicho.construir(wicho).cruzar(detalle(), COLUMNA_NUMERO)
+    anterior = cruce_anterior(wicho, detalle(), COLUMNA_NUMERO)
+
+    assert list(nuevo.columns) == list(anterior.columns)
+    assert {'ICCID_x', 'ICCID_y', 'LOTE'} <= set(nuevo.columns)
+    pd.testing.assert_frame_equal(nuevo, anterior, check_dtype=False)
+
+
+def test_normaliza_prefijo_flotantes_y_texto():
+    serie = pd.Series([
+        5512345678, 5512345678.0, '55 1234 5678', '+52 55 1234 5678',
+        '+52 1 55-1234-5678', '0052 (55) 1234.5678', 525512345678, 5215512345678
+    ], dtype=object)
+    claves, validos, conteos = normalizar_telefonos(serie)
+
+    assert validos.all()
+    assert (claves == 5512345678).all()
+    assert conteos['desde_texto'] == 4
+    assert conteos['con_prefijo'] == 5
+
+
+def test_cuenta_los_numeros_rechazados():
+    serie = pd.Series([None, 'sin número', 5512345678.5, 52, '52', 12345, 10 ** 16, -5512345678, 0, '0000000052'],
+                      dtype=object)
+    claves, validos, conteos = normalizar_telefonos(serie)
+
+    assert not validos.any()
+    assert (claves == 0).all()
+    assert conteos == {
+        **dict.fromkeys(CONTEOS_TELEFONO, 0),
+        'vacios': 1, 'no_numericos': 1, 'decimales': 1, 'fuera_de_rango': 7
+    }
+
+
+def test_numero_corto_no_es_valido_en_columnas_enteras():
+    claves, validos, conteos = normalizar_telefonos(pd.Series([52, 5512345678, 525512345678], dtype='int64'))
+
+    assert validos.tolist() == [False, True, True]
+    assert claves[validos].tolist() == [5512345678, 5512345678]
+    assert conteos['fuera_de_rango'] == 1
+    assert conteos['con_prefijo'] == 1
+
+
+def test_cruce_acumula_los_conteos_del_detalle():
+    wicho = {'ENERO': pd.DataFrame({'CEL': [5512345678, 52]})}
+    df_detalle = pd.DataFrame({COLUMNA_NUMERO: ['+52 55 1234 5678', '52', None, 'pendiente']})
+    indice = IndiceWicho.construir(wicho)
+    conteos = dict.fromkeys(CONTEOS_TELEFONO, 0)
+
+    resultado = indice.cruzar(df_detalle, COLUMNA_NUMERO, conteos)
+
+    # '52' está en ambos libros pero no es un teléfono: no cruza
+    assert resultado[COLUMNA_NUMERO].tolist() == ['+52 55 1234 5678']
+    assert indice.conteos_telefono['fuera_de_rango'] == 1
+    assert conteos == {
+        **dict.fromkeys(CONTEOS_TELEFONO, 0),
+        'vacios': 1, 'no_numericos': 1, 'fuera_de_rango': 1, 'desde_texto': 1, 'con_prefijo': 1
+    }
+
+
+def test_cel_vacio_no_cruza_con_numero_vacio():
+    # pd.merge empareja un 'CEL' vacío con un número vacío del detalle; esa
+    # línea sobraba en el resultado de la versión anterior
+    wicho = {'ENERO': pd.DataFrame({'CEL': [5512345678, np.nan]})}
+    df_detalle = pd.DataFrame({COLUMNA_NUMERO: [np.nan, 5512345678.0], 'Comisión': [25, 25]})
+
+    anterior = cruce_anterior(wicho, df_detalle, COLUMNA_NUMERO)
+    nuevo = IndiceWicho.construir(wicho).cruzar(df_detalle, COLUMNA_NUMERO)
+
+    assert len(anterior) == 2
+    assert nuevo['CEL'].tolist() == [5512345678]
+    pd.testing.assert_frame_equal(nuevo, anterior.dropna(subset=['CEL']), check_dtype=False)
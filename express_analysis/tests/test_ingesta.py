@@ -0,0 +1,73 @@
+import hashlib
+import io
+import zipfile
+
+import pytest
+
+from express_analysis.ingesta import Ingesta
+
+
+def zip_con(miembros):
+    contenido = io.BytesIO()
+    with zipfile.ZipFile(contenido, 'w') as paquete:
+        for nombre, datos in miembros.items():
+            if nombre.endswith('/'):
+                paquete.writestr(zipfile.ZipInfo(nombre), b'')
+            else:
+                paquete.writestr(nombre, datos)
+    contenido.seek(0)
+    return contenido
+
+
+@pytest.fixture
+def detalle(tmp_path):
+    carpeta = tmp_path / 'Detalle'
+    carpeta.mkdir()
+    return carpeta
+
+
+def test_zip_solo_ingresa_los_xlsx(detalle):
+    ingesta = Ingesta(detalle)
+
+    ingesta.ingresar(zip_con({
+        'semana/': b'',
+        'semana/detalle_1.xlsx': b'detalle 1',
+        'semana/~$detalle_1.xlsx': b'bloqueo',
+        'semana/notas.txt': b'notas',
+        'semana/detalle_2.XLSX': b'detalle 2'
+    }), 'semana.zip')
+
+    assert [(a.nombre, a.origen) for a in ingesta.ingresados] == [
+        ('detalle_1.xlsx', 'semana.zip'), ('detalle_2.XLSX', 'semana.zip')
+    ]
+    assert ingesta.ingresados[0].hash == hashlib.sha256(b'detalle 1').hexdigest()
+    assert ingesta.omitidos == [
+        ('semana.zip/semana/~$detalle_1.xlsx', "archivo de bloqueo de Excel"),
+        ('semana.zip/semana/notas.txt', "no es un archivo .xlsx")
+    ]
+    assert sorted(ruta.name for ruta in detalle.iterdir()) == ['detalle_1.xlsx', 'detalle_2.XLSX']
+
+
+def test_omite_contenido_repetido(tmp_path, detalle):
+    historico = tmp_path / 'Detalle historico'
+    historico.mkdir()
+    (historico / 'procesado.xlsx').write_bytes(b'ya procesado')
+    ingesta = Ingesta(detalle, historico)
+
+    ingesta.ingresar(io.BytesIO(b'detalle 1'), 'detalle_1.xlsx')
+    ingesta.ingresar(zip_con({
+        'copia.xlsx': b'detalle 1',
+        'detalle_1.xlsx': b'otro contenido',
+        'procesado.xlsx': b'ya procesado'
+    }), 'semana.zip')
+    ingesta.ingresar(io.BytesIO(b'contenido nuevo'), 'procesado_2.xlsx')
+
+    assert [a.nombre for a in ingesta.ingresados] == ['detalle_1.xlsx', 'procesado_2.xlsx']
+    assert ingesta.omitidos == [
+        ('semana.zip/copia.xlsx', "contenido repetido en la subida"),
+        ('semana.zip/detalle_1.xlsx', "nombre repetido en la subida"),
+        ('semana.zip/procesado.xlsx', "ya se procesó (está en Detalle historico)")
+    ]
+    # Sin temporales de la subida en la carpeta de detalle
+    assert sorted(ruta.name for ruta in detalle.iterdir()) == ['detalle_1.xlsx', 'procesado_2.xlsx']
+    assert (detalle / 'detalle_1.xlsx').read_bytes() == b'detalle 1'
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from express_analysis.esquema import ESQUEMA_DETALLE
+from express_analysis.lector_detalle import leer_detalle, leer_detalle_por_bloques
+
+FILAS = [
+    [5512340000, 'N/A', datetime(2025, 1, 10), '1ra evaluación', 25, 'a'],
+    [5512340001, '8952140000000000001', datetime(2025, 1, 11), '2da evaluación', 35, 'b'],
+    [],
+    ['5512340003', '8952140000000000003', None, '3ra evaluación', None, None],
+    [],
+    [5512340004, None, datetime(2025, 1, 13), 'NULL', 35, 'c'],
+    [5512340005, '8952140000000000005', datetime(2025, 1, 14), '4ta evaluación', 35, 'd', 'nota'],
+    [],
+    [],
+]
+
+
+@pytest.fixture
+def detalle(tmp_path):
+    libro = Workbook()
+    hoja = libro.active
+    hoja.append([None, None, '01/01/2025 AL 07/01/2025'])
+    hoja.append([])
+    hoja.append([' Número celular asignado', 'ICCID', 'Fecha Primera Recarga', 'Evaluación', 'Comisión', 'ICCID'])
+    for fila in FILAS:
+        hoja.append(fila)
+    ruta = tmp_path / 'detalle.xlsx'
+    libro.save(ruta)
+    return ruta
+
+
+def test_igual_que_read_excel(detalle):
+    esperado = pd.read_excel(detalle, header=2)
+    esperado.columns = esperado.columns.str.strip()
+
+    libro = leer_detalle(detalle)
+
+    pd.testing.assert_frame_equal(libro.datos, esperado)
+    assert libro.periodo == '01/01/2025 AL 07/01/2025'
+    assert libro.columnas == [
+        'Número celular asignado', 'ICCID', 'Fecha Primera Recarga', 'Evaluación', 'Comisión', 'ICCID.1', 'Unnamed: 6'
+    ]
+    assert libro.columna_numero == 'Número celular asignado'
+    # Las filas vacías entre datos se conservan y las del final no
+    assert len(libro.datos) == 7
+    assert libro.datos['Número celular asignado'].isna().tolist() == [False, False, True, False, True, False, False]
+
+
+def valores(datos):
+    return datos.astype(object).where(datos.notna(), None)
+
+
+@pytest.mark.parametrize('filas_por_bloque', [1, 2, 3, 100])
+def test_bloques_con_las_mismas_filas(detalle, filas_por_bloque):
+    completo = leer_detalle(detalle, ESQUEMA_DETALLE)
+
+    bloques = list(leer_detalle_por_bloques(detalle, filas_por_bloque, ESQUEMA_DETALLE))
+
+    assert [len(b.datos) for b in bloques[:-1]] == [filas_por_bloque] * (len(bloques) - 1)
+    assert all(b.columnas == completo.columnas for b in bloques)
+    assert completo.columnas == [
+        'Número celular asignado', 'ICCID', 'Fecha Primera Recarga', 'Evaluación', 'Comisión', 'ICCID.1'
+    ]
+    # Cada bloque infiere sus tipos; los valores son los mismos
+    unidos = pd.concat([valores(b.datos) for b in bloques], ignore_index=True)
+    pd.testing.assert_frame_equal(unidos, valores(completo.datos))
+
+
+def test_archivo_sin_datos(tmp_path):
+    libro = Workbook()
+    libro.active.append([None, None, 'periodo'])
+    libro.active.append([])
+    libro.active.append(['Número celular', 'Evaluación', 'Comisión'])
+    ruta = tmp_path / 'vacio.xlsx'
+    libro.save(ruta)
+
+    completo = leer_detalle(ruta)
+    bloques = list(leer_detalle_por_bloques(ruta, 10))
+
+    assert (completo.columnas, len(completo.datos), completo.columna_numero) == (
+        ['Número celular', 'Evaluación', 'Comisión'], 0, 'Número celular'
+    )
+    assert [(b.columnas, len(b.datos)) for b in bloques] == [(['Número celular', 'Evaluación', 'Comisión'], 0)]
@@ -0,0 +1,242 @@
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from express_analysis.agregados import COMISION_POR_LINEA, construir_marcos
+from express_analysis.banco import preparar_datos
+from express_analysis.cache_libros import CacheLibros
+from express_analysis.escritor_resultados import EscritorResultados
+from express_analysis.esquema import leer_wicho
+from express_analysis.indice_wicho import IndiceWicho
+from express_analysis.libro_mayor import ESTADO_PAGADO, ESTADO_POR_PAGAR, ESTADO_SIN_RESULTADO, LibroMayor
+
+EVALUACIONES = ['1ra evaluación', '2da evaluación', '3ra evaluación', '4ta evaluación']
+
+
+def lineas(cantidad, inicio=5512340000, dia='2025-01-10'):
+    return pd.DataFrame({
+        'CEL': [inicio + i for i in range(cantidad)],
+        'Evaluación': [EVALUACIONES[i % 4] for i in range(cantidad)],
+        'Comisión': [25 if i % 4 == 0 else 35 for i in range(cantidad)],
+        'Fecha Primera Recarga': pd.to_datetime([dia] * cantidad) + pd.to_timedelta(range(cantidad), unit='D'),
+        'Archivo_Detalle': 'detalle.xlsx',
+        'Periodo': '01/01/2025 AL 07/01/2025'
+    })
+
+
+def escribir_libro(ruta, datos):
+    escritor = EscritorResultados(ruta)
+    escritor.escribir(datos)
+    escritor.cerrar()
+    return ruta
+
+
+@pytest.fixture
+def carpeta(tmp_path):
+    resultados = tmp_path / 'Resultados'
+    resultados.mkdir()
+    return resultados
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheLibros(tmp_path / 'cache')
+
+
+def libro_mayor(tmp_path, nombre='libro_mayor.sqlite'):
+    return LibroMayor(tmp_path / nombre, tmp_path / 'estados_pago.json')
+
+
+def archivos(libro):
+    indice = libro.indice_resultados()
+    return dict(zip(indice['archivo'], indice['estado']))
+
+
+def test_sincronizar_registra_renombra_y_elimina(tmp_path, carpeta, cache):
+    escribir_libro(carpeta / '20250101_analisis_chipExpress_(PAGADO).xlsx', lineas(8))
+    escribir_libro(carpeta / '20250108_analisis_chipExpress.xlsx', lineas(4, inicio=5512350000))
+    libro = libro_mayor(tmp_path)
+
+    assert libro.sincronizar(carpeta, cache) == []
+    assert archivos(libro) == {
+        '20250101_analisis_chipExpress_(PAGADO).xlsx': ESTADO_PAGADO,
+        '20250108_analisis_chipExpress.xlsx': ESTADO_POR_PAGAR
+    }
+    assert libro.estadisticas()['lineas_por_estado'] == {ESTADO_PAGADO: 8, ESTADO_POR_PAGAR: 4}
+
+    # Renombrado fuera de la aplicación: se reconoce por el hash y toma el
+    # estado del nombre nuevo, sin volver a leer el libro
+    (carpeta / '20250108_analisis_chipExpress.xlsx').rename(carpeta / '20250108_analisis_chipExpress_(PAGADO).xlsx')
+    fallos = cache.estadisticas()['fallos']
+    assert libro.sincronizar(carpeta, cache) == []
+    assert cache.estadisticas()['fallos'] == fallos
+    assert archivos(libro) == {
+        '20250101_analisis_chipExpress_(PAGADO).xlsx': ESTADO_PAGADO,
+        '20250108_analisis_chipExpress_(PAGADO).xlsx': ESTADO_PAGADO
+    }
+
+    (carpeta / '20250101_analisis_chipExpress_(PAGADO).xlsx').unlink()
+    libro.sincronizar(carpeta, cache)
+    assert list(archivos(libro)) == ['20250108_analisis_chipExpress_(PAGADO).xlsx']
+    assert libro.estadisticas() == {'lineas_por_estado': {ESTADO_PAGADO: 4}, 'archivos': 1}
+
+
+def test_sincronizar_relee_un_libro_modificado(tmp_path, carpeta, cache):
+    ruta = escribir_libro(carpeta / '20250101_analisis_chipExpress.xlsx', lineas(8))
+    libro = libro_mayor(tmp_path)
+    libro.sincronizar(carpeta, cache)
+
+    escribir_libro(ruta, lineas(3))
+    libro.sincronizar(carpeta, cache)
+
+    assert libro.indice_resultados()['total_lineas'].tolist() == [3]
+
+
+def test_cambiar_estado_sobrevive_a_reconstruir_el_libro_mayor(tmp_path, carpeta, cache):
+    nombre = '20250101_analisis_chipExpress.xlsx'
+    escribir_libro(carpeta / nombre, lineas(8))
+    libro = libro_mayor(tmp_path)
+    libro.sincronizar(carpeta, cache)
+
+    assert libro.cambiar_estado(nombre, ESTADO_PAGADO) is not None
+    assert libro.cambiar_estado('no_existe.xlsx', ESTADO_PAGADO) is None
+    assert archivos(libro) == {nombre: ESTADO_PAGADO}
+    assert libro.estadisticas()['lineas_por_estado'] == {ESTADO_PAGADO: 8}
+
+    # Un libro mayor nuevo toma el estado del registro JSON, no del nombre
+    reconstruido = libro_mayor(tmp_path, 'reconstruido.sqlite')
+    reconstruido.sincronizar(carpeta, cache)
+    assert archivos(reconstruido) == {nombre: ESTADO_PAGADO}
+
+    # Un estado cambiado en la aplicación no cambia al renombrar el libro
+    (carpeta / nombre).rename(carpeta / '20250101_analisis_chipExpress_(POR_PAGAR).xlsx')
+    libro.sincronizar(carpeta, cache)
+    assert archivos(libro) == {'20250101_analisis_chipExpress_(POR_PAGAR).xlsx': ESTADO_PAGADO}
+
+
+def test_copias_con_el_mismo_contenido_tienen_cada_una_su_estado(tmp_path, carpeta, cache):
+    original = '20250101_analisis_chipExpress.xlsx'
+    copia = '20250102_analisis_chipExpress.xlsx'
+    escribir_libro(carpeta / original, lineas(8))
+    (carpeta / copia).write_bytes((carpeta / original).read_bytes())
+    libro = libro_mayor(tmp_path)
+    libro.sincronizar(carpeta, cache)
+
+    libro.cambiar_estado(original, ESTADO_PAGADO)
+    assert archivos(libro) == {original: ESTADO_PAGADO, copia: ESTADO_POR_PAGAR}
+
+    # Al reconstruir, la copia no hereda el estado del original
+    reconstruido = libro_mayor(tmp_path, 'reconstruido.sqlite')
+    reconstruido.sincronizar(carpeta, cache)
+    assert archivos(reconstruido) == {original: ESTADO_PAGADO, copia: ESTADO_POR_PAGAR}
+
+    # Un libro regenerado con el nombre de otro que se borró tampoco
+    (carpeta / original).unlink()
+    libro.sincronizar(carpeta, cache)
+    escribir_libro(carpeta / original, lineas(8))
+    libro.sincronizar(carpeta, cache)
+    assert archivos(libro)[original] == ESTADO_POR_PAGAR
+
+
+def test_estado_sigue_al_libro_renombrado_al_reconstruir(tmp_path, carpeta, cache):
+    nombre = '20250101_analisis_chipExpress.xlsx'
+    escribir_libro(carpeta / nombre, lineas(8))
+    libro = libro_mayor(tmp_path)
+    libro.sincronizar(carpeta, cache)
+    libro.cambiar_estado(nombre, ESTADO_PAGADO)
+
+    (carpeta / nombre).rename(carpeta / '20250101_comisiones.xlsx')
+    reconstruido = libro_mayor(tmp_path, 'reconstruido.sqlite')
+    reconstruido.sincronizar(carpeta, cache)
+
+    assert archivos(reconstruido) == {'20250101_comisiones.xlsx': ESTADO_PAGADO}
+    assert list(reconstruido._cargar_estados()) == ['20250101_comisiones.xlsx']
+
+
+def test_lee_el_registro_de_estados_por_hash(tmp_path, carpeta, cache):
+    nombre = '20250101_analisis_chipExpress.xlsx'
+    escribir_libro(carpeta / nombre, lineas(8))
+    anotacion = {'archivo': nombre, 'estado': ESTADO_PAGADO, 'actualizado': '2025-01-20T10:00:00'}
+    (tmp_path / 'estados_pago.json').write_text(
+        json.dumps({cache.hash_contenido(carpeta / nombre): anotacion}), encoding='utf-8'
+    )
+    libro = libro_mayor(tmp_path)
+
+    libro.sincronizar(carpeta, cache)
+
+    assert archivos(libro) == {nombre: ESTADO_PAGADO}
+
+
+def test_libro_sin_comision_cuenta_sus_lineas(tmp_path, carpeta, cache):
+    escribir_libro(carpeta / '20250101_analisis_chipExpress_(PAGADO).xlsx', lineas(8).drop(columns=['Comisión']))
+    escribir_libro(carpeta / '20250108_analisis_chipExpress_(PAGADO).xlsx', lineas(4).drop(columns=['Evaluación']))
+    libro = libro_mayor(tmp_path)
+
+    avisos = libro.sincronizar(carpeta, cache)
+
+    assert avisos == ["Columna 'Evaluación' no encontrada en 20250108_analisis_chipExpress_(PAGADO).xlsx"]
+    resumen = libro.resumen_por_archivo(ESTADO_PAGADO)
+    assert resumen['archivo'].tolist() == ['20250101_analisis_chipExpress_(PAGADO).xlsx']
+    assert resumen.loc[0, 'total_lineas'] == 8
+    assert resumen.loc[0, 'primera_eval'] == 2
+    assert resumen.loc[0, 'total_comision'] == 0
+
+
+def analisis_anterior(carpeta):
+    """Conteos del análisis de pagados de la versión anterior, leyendo cada libro."""
+    resultados = []
+    for ruta in sorted(carpeta.glob('*PAGADO*.xlsx')):
+        df = pd.read_excel(ruta)
+        evaluaciones = df['Evaluación'].value_counts()
+        primera, segunda, tercera, cuarta = (int(evaluaciones.get(e, 0)) for e in EVALUACIONES)
+        resultados.append({
+            'fecha': pd.to_datetime(df['Fecha Primera Recarga']).max(),
+            'archivo': ruta.name,
+            'primera_eval': primera,
+            'segunda_eval': segunda,
+            'tercera_eval': tercera,
+            'cuarta_eval': cuarta,
+            'otras_eval': segunda + tercera + cuarta,
+            'comision_primera': primera * COMISION_POR_LINEA,
+            'comision_otras': (segunda + tercera + cuarta) * COMISION_POR_LINEA
+        })
+    return pd.DataFrame(resultados).sort_values('fecha', ascending=False)
+
+
+def test_analisis_de_pagados_igual_al_de_la_version_anterior(tmp_path, carpeta, cache):
+    escribir_libro(carpeta / '20250101_analisis_chipExpress_(PAGADO).xlsx', lineas(9))
+    escribir_libro(carpeta / '20250108_analisis_chipExpress_(PAGADO).xlsx', lineas(14, dia='2025-02-01'))
+    escribir_libro(carpeta / '20250115_analisis_chipExpress.xlsx', lineas(5))
+    libro = libro_mayor(tmp_path)
+    libro.sincronizar(carpeta, cache)
+
+    df_resultados, df_funnel = construir_marcos(libro.resumen_por_archivo(ESTADO_PAGADO))
+
+    anterior = analisis_anterior(carpeta)
+    pd.testing.assert_frame_equal(
+        df_resultados.reset_index(drop=True), anterior.reset_index(drop=True), check_dtype=False
+    )
+    assert df_funnel['primera'].tolist() == anterior['primera_eval'].tolist()
+
+
+def test_importar_historico_no_duplica(tmp_path):
+    datos = preparar_datos(tmp_path / 'banco', 2_000)
+    historico = tmp_path / 'Detalle historico'
+    historico.mkdir()
+    for ruta in datos['detalle']:
+        ruta.rename(historico / ruta.name)
+    indice = IndiceWicho.construir(leer_wicho(datos['wicho']))
+    libro = libro_mayor(tmp_path)
+
+    importados, avisos = libro.importar_historico(historico, indice)
+    lineas_importadas = libro.estadisticas()['lineas_por_estado'][ESTADO_SIN_RESULTADO]
+
+    assert (importados, avisos) == (len(datos['detalle']), [])
+    assert lineas_importadas > 0
+    assert libro.historico_importado() is not None
+    assert libro.importar_historico(historico, indice) == (0, [])
+    assert libro.estadisticas()['lineas_por_estado'][ESTADO_SIN_RESULTADO] == lineas_importadas
+    with sqlite3.connect(tmp_path / 'libro_mayor.sqlite') as conexion:
+        assert conexion.execute("SELECT COUNT(*) FROM lineas WHERE hoja_wicho IS NULL").fetchone()[0] == 0
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from express_analysis.memo import Memoizador, huella_archivos
+
+ESPERA = 10
+
+
+def test_calcula_una_sola_vez_para_llamadas_concurrentes():
+    memo = Memoizador()
+    liberar = threading.Event()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        liberar.wait(ESPERA)
+        return {'total': 42}
+
+    resultados = []
+    hilos = [
+        threading.Thread(target=lambda: resultados.append(memo.obtener('resumen', 'h1', calcular)))
+        for _ in range(8)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(0.05)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(ESPERA)
+
+    assert len(llamadas) == 1
+    assert resultados == [{'total': 42}] * 8
+    assert all(resultado is resultados[0] for resultado in resultados)
+    assert memo.estadisticas() == {'aciertos': 7, 'fallos': 1, 'entradas': 1}
+    assert memo._en_calculo == {}
+
+
+def test_un_calculo_fallido_no_deja_su_candado():
+    memo = Memoizador()
+
+    def fallar():
+        raise ValueError("libro dañado")
+
+    for huella in ['h1', 'h2', 'h3']:
+        with pytest.raises(ValueError):
+            memo.obtener('resumen', huella, fallar)
+
+    assert memo._en_calculo == {}
+    assert memo.obtener('resumen', 'h1', lambda: 7) == 7
+
+
+def test_invalidar_durante_un_calculo_no_guarda_el_valor_viejo():
+    memo = Memoizador()
+    en_curso = threading.Event()
+    liberar = threading.Event()
+    resultados = []
+
+    def calcular_viejo():
+        en_curso.set()
+        liberar.wait(ESPERA)
+        return 'viejo'
+
+    hilo = threading.Thread(target=lambda: resultados.append(memo.obtener('resumen', 'h1', calcular_viejo)))
+    hilo.start()
+    assert en_curso.wait(ESPERA)
+
+    memo.invalidar()
+    # Con la generación nueva no se espera al cálculo anterior
+    assert memo.obtener('resumen', 'h1', lambda: 'nuevo') == 'nuevo'
+
+    liberar.set()
+    hilo.join(ESPERA)
+
+    assert resultados == ['viejo']
+    assert memo.obtener('resumen', 'h1', lambda: 'otro') == 'nuevo'
+    assert memo._en_calculo == {}
+
+
+def test_huella_cambia_con_los_archivos(tmp_path):
+    libro = tmp_path / 'resultado.xlsx'
+    libro.write_bytes(b'1')
+    memo = Memoizador(max_entradas=1)
+    antes = huella_archivos(tmp_path)
+
+    libro.write_bytes(b'12')
+    despues = huella_archivos(tmp_path)
+
+    assert antes != despues
+    assert memo.obtener('resumen', antes, lambda: 1) == 1
+    assert memo.obtener('resumen', despues, lambda: 2) == 2
+    # Con una sola entrada, la huella anterior ya se descartó
+    assert memo.obtener('resumen', antes, lambda: 3) == 3
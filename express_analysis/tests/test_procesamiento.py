@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from express_analysis import procesamiento
+from express_analysis.banco import preparar_datos
+from express_analysis.esquema import leer_wicho
+from express_analysis.indice_wicho import IndiceWicho
+from express_analysis.procesamiento import ERROR, OK, iterar_lote
+
+
+@pytest.fixture(scope='module')
+def lote(tmp_path_factory):
+    datos = preparar_datos(tmp_path_factory.mktemp('lote'), 2_000)
+    return IndiceWicho.construir(leer_wicho(datos['wicho'])), datos['detalle']
+
+
+def test_lote_en_paralelo_igual_que_en_serie(lote):
+    indice, rutas = lote
+    serie = list(iterar_lote(indice, rutas, trabajadores=1))
+    paralelo = list(iterar_lote(indice, rutas, trabajadores=2))
+
+    assert [r.archivo for r in paralelo] == [r.archivo for r in serie]
+    assert all(r.estado == OK for r in paralelo)
+    for esperado, obtenido in zip(serie, paralelo):
+        pd.testing.assert_frame_equal(obtenido.datos, esperado.datos)
+        assert obtenido.telefonos == esperado.telefonos
+
+
+def test_trabajadores_se_inician_con_spawn(lote, monkeypatch):
+    indice, rutas = lote
+    contextos = []
+    ejecutor_original = procesamiento.ProcessPoolExecutor
+
+    def ejecutor(*args, **kwargs):
+        contextos.append(kwargs.get('mp_context'))
+        return ejecutor_original(*args, **kwargs)
+
+    monkeypatch.setattr(procesamiento, 'ProcessPoolExecutor', ejecutor)
+    # Un archivo que no existe falla solo, sin detener el resto del lote
+    resultados = list(iterar_lote(indice, [rutas[0], rutas[0].with_name('no_existe.xlsx')], trabajadores=2))
+
+    assert [contexto.get_start_method() for contexto in contextos] == ['spawn']
+    assert [r.estado for r in resultados] == [OK, ERROR]
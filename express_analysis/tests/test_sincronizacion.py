@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+from express_analysis import sincronizacion
+from express_analysis.sincronizacion import Sincronizador, copiar_archivo
+
+
+@pytest.fixture
+def carpetas(tmp_path):
+    origen = tmp_path / 'Temp' / 'Resultados'
+    espejo = tmp_path / 'Resultados'
+    origen.mkdir(parents=True)
+    (origen / 'a.xlsx').write_bytes(b'libro a')
+    (origen / 'b.xlsx').write_bytes(b'libro b')
+    (origen / 'notas.txt').write_bytes(b'no es un libro')
+    return origen, espejo
+
+
+def test_solo_copia_lo_nuevo_o_modificado(tmp_path, carpetas):
+    origen, espejo = carpetas
+    manifiesto = tmp_path / 'manifiesto.json'
+
+    resumen = Sincronizador(manifiesto).sincronizar([(origen, espejo)])
+    assert resumen['nuevos'] == [str(espejo / 'a.xlsx'), str(espejo / 'b.xlsx')]
+    assert sorted(ruta.name for ruta in espejo.iterdir()) == ['a.xlsx', 'b.xlsx']
+
+    (origen / 'a.xlsx').write_bytes(b'libro a, segunda version')
+    (origen / 'c.xlsx').write_bytes(b'libro c')
+    # Solo cambia la fecha: se compara el hash y no se copia
+    info = (origen / 'b.xlsx').stat()
+    os.utime(origen / 'b.xlsx', ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+
+    resumen = Sincronizador(manifiesto).sincronizar([(origen, espejo)])
+    assert resumen['nuevos'] == [str(espejo / 'c.xlsx')]
+    assert resumen['modificados'] == [str(espejo / 'a.xlsx')]
+    assert (resumen['sin_cambios'], resumen['eliminados']) == (1, [])
+    assert (espejo / 'a.xlsx').read_bytes() == b'libro a, segunda version'
+    guardado = json.loads(manifiesto.read_text(encoding='utf-8'))
+    assert guardado[str(espejo / 'b.xlsx')]['mtime_ns'] == info.st_mtime_ns + 10**9
+
+    resumen = Sincronizador(manifiesto).sincronizar([(origen, espejo)])
+    assert (resumen['nuevos'], resumen['modificados'], resumen['sin_cambios']) == ([], [], 3)
+
+
+def test_elimina_las_copias_sin_origen(tmp_path, carpetas):
+    origen, espejo = carpetas
+    otro_origen, otro_espejo = tmp_path / 'Temp' / 'Detalle', tmp_path / 'Detalle'
+    otro_origen.mkdir()
+    (otro_origen / 'a.xlsx').write_bytes(b'detalle a')
+    sincronizador = Sincronizador(tmp_path / 'manifiesto.json')
+    sincronizador.sincronizar([(origen, espejo), (otro_origen, otro_espejo)])
+
+    (origen / 'a.xlsx').unlink()
+    resumen = sincronizador.sincronizar([(origen, espejo), (otro_origen, otro_espejo)])
+
+    assert resumen['eliminados'] == [str(espejo / 'a.xlsx')]
+    assert sorted(ruta.name for ruta in espejo.iterdir()) == ['b.xlsx']
+    # El archivo del mismo nombre en otra carpeta espejo no se toca
+    assert (otro_espejo / 'a.xlsx').read_bytes() == b'detalle a'
+
+
+def fallar(*args):
+    raise OSError("no soportado")
+
+
+def test_copia_con_enlace_si_no_hay_reflink(tmp_path, monkeypatch):
+    origen = tmp_path / 'origen.xlsx'
+    origen.write_bytes(b'libro')
+    monkeypatch.setattr(sincronizacion, '_reflink', fallar)
+
+    assert copiar_archivo(origen, tmp_path / 'destino.xlsx') == 'enlace'
+    assert os.path.samefile(origen, tmp_path / 'destino.xlsx')
+
+
+def test_copia_completa_como_ultimo_recurso(tmp_path, monkeypatch):
+    origen = tmp_path / 'origen.xlsx'
+    origen.write_bytes(b'libro')
+    destino = tmp_path / 'destino.xlsx'
+    destino.write_bytes(b'copia anterior')
+    monkeypatch.setattr(sincronizacion, '_reflink', fallar)
+    monkeypatch.setattr(sincronizacion.os, 'link', fallar)
+
+    assert copiar_archivo(origen, destino) == 'copia'
+    assert destino.read_bytes() == b'libro'
+    assert not os.path.samefile(origen, destino)
+    assert sorted(ruta.name for ruta in tmp_path.iterdir()) == ['destino.xlsx', 'origen.xlsx']
@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from express_analysis import trabajos
+from express_analysis.trabajos import CANCELADO, EJECUTANDO, EN_COLA, FALLIDO, TERMINADO, EjecutorTrabajos
+
+ESPERA = 10
+
+
+def esperar(ejecutor, id_trabajo, estados=(TERMINADO, FALLIDO, CANCELADO)):
+    limite = time.monotonic() + ESPERA
+    while time.monotonic() < limite:
+        estado = ejecutor.estado(id_trabajo)
+        if estado and estado['estado'] in estados:
+            return estado
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo {id_trabajo} no llegó a {estados}")
+
+
+def guardado(directorio, id_trabajo):
+    with open(directorio / f"{id_trabajo}.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_trabajo_terminado_guarda_su_resultado(tmp_path):
+    ejecutor = EjecutorTrabajos(tmp_path)
+
+    id_trabajo = ejecutor.enviar("análisis", lambda trabajo: {'lineas': 3})
+
+    estado = esperar(ejecutor, id_trabajo)
+    assert (estado['estado'], estado['resultado'], estado['eta_segundos']) == (TERMINADO, {'lineas': 3}, 0)
+    assert guardado(tmp_path, id_trabajo)['estado'] == TERMINADO
+
+
+def test_fallo_queda_registrado(tmp_path):
+    ejecutor = EjecutorTrabajos(tmp_path)
+
+    def fallar(trabajo):
+        raise ValueError("Libro Wicho no encontrado")
+
+    id_trabajo = ejecutor.enviar("análisis", fallar)
+
+    estado = esperar(ejecutor, id_trabajo)
+    assert (estado['estado'], estado['error']) == (FALLIDO, "Libro Wicho no encontrado")
+    assert guardado(tmp_path, id_trabajo)['error'] == "Libro Wicho no encontrado"
+    assert ejecutor.activo() is None
+
+
+def test_reinicio_marca_activos_como_fallidos(tmp_path):
+    for id_trabajo, estado in [('1_a', EN_COLA), ('2_b', EJECUTANDO), ('3_c', TERMINADO)]:
+        (tmp_path / f"{id_trabajo}.json").write_text(json.dumps({'id': id_trabajo, 'estado': estado}), encoding='utf-8')
+    (tmp_path / "4_d.json").write_text("{incompleto", encoding='utf-8')
+
+    ejecutor = EjecutorTrabajos(tmp_path)
+
+    assert [t['estado'] for t in ejecutor.recientes(10)] == [TERMINADO, FALLIDO, FALLIDO]
+    for id_trabajo in ['1_a', '2_b']:
+        assert guardado(tmp_path, id_trabajo)['error'] == "Interrumpido por un reinicio del servidor"
+    assert ejecutor.activo() is None
+
+
+def test_cancelar_un_trabajo_en_cola(tmp_path):
+    ejecutor = EjecutorTrabajos(tmp_path)
+    liberar = threading.Event()
+    ejecutados = []
+
+    primero = ejecutor.enviar("primero", lambda trabajo: liberar.wait(ESPERA) and {})
+    segundo = ejecutor.enviar("segundo", lambda trabajo: ejecutados.append(trabajo.id))
+    assert ejecutor.activo()['id'] == primero
+
+    assert ejecutor.cancelar(segundo)
+    liberar.set()
+
+    assert esperar(ejecutor, primero)['estado'] == TERMINADO
+    estado = esperar(ejecutor, segundo)
+    assert (estado['estado'], estado['iniciado']) == (CANCELADO, None)
+    assert ejecutados == []
+    assert not ejecutor.cancelar(segundo)
+
+
+def test_cancelar_un_trabajo_en_ejecucion(tmp_path):
+    ejecutor = EjecutorTrabajos(tmp_path)
+    en_curso = threading.Event()
+
+    def procesar(trabajo):
+        trabajo.fijar_total(100)
+        for numero in range(100):
+            trabajo.avanzar(f"detalle_{numero}.xlsx", 'ok', lineas=1)
+            en_curso.set()
+            if trabajo.cancelado():
+                raise RuntimeError("Análisis cancelado")
+            time.sleep(0.01)
+        return {}
+
+    id_trabajo = ejecutor.enviar("análisis", procesar)
+    assert en_curso.wait(ESPERA)
+    assert ejecutor.cancelar(id_trabajo)
+
+    estado = esperar(ejecutor, id_trabajo)
+    assert estado['estado'] == CANCELADO
+    assert estado['error'] is None
+    assert 0 < estado['completados'] < 100
+
+
+def test_tiempo_restante_estimado(tmp_path, monkeypatch):
+    ahora = [100.0]
+    monkeypatch.setattr(trabajos, 'time', SimpleNamespace(monotonic=lambda: ahora[0]))
+    ejecutor = EjecutorTrabajos(tmp_path)
+    estimaciones = []
+
+    def procesar(trabajo):
+        trabajo.fijar_total(4)
+        for segundos in [110.0, 120.0]:
+            ahora[0] = segundos
+            trabajo.avanzar("detalle.xlsx", 'ok')
+            estimaciones.append(ejecutor.estado(trabajo.id)['eta_segundos'])
+        return {}
+
+    id_trabajo = ejecutor.enviar("análisis", procesar)
+
+    assert esperar(ejecutor, id_trabajo)['eta_segundos'] == 0
+    # 10 s por archivo con 3 pendientes; luego 10 s por archivo con 2 pendientes
+    assert estimaciones == [30.0, 20.0]
+
+
+@pytest.mark.parametrize('conservar', [1, 3])
+def test_conserva_solo_los_ultimos_trabajos(tmp_path, conservar):
+    ejecutor = EjecutorTrabajos(tmp_path, conservar=conservar)
+
+    ids = [ejecutor.enviar(f"análisis {numero}", lambda trabajo: {}) for numero in range(5)]
+    esperar(ejecutor, ids[-1])
+    limite = time.monotonic() + ESPERA
+    while len(list(tmp_path.glob("*.json"))) > conservar and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    assert ids == sorted(ids)
+    assert [t['id'] for t in ejecutor.recientes(10)] == ids[::-1][:conservar]
+    assert sorted(ruta.stem for ruta in tmp_path.glob("*.json")) == ids[-conservar:]
+    assert ejecutor._cancelaciones == {} and ejecutor._inicios == {}
+
+    # Al arrancar también se depuran los archivos de ejecuciones anteriores
+    assert len(EjecutorTrabajos(tmp_path, conservar=1).recientes(10)) == 1
@@ -3,14 +3,21 @@ from setuptools import setup, find_packages
 setup(
     name="comisiones-mio",
     version="1.0.0",
-    packages=find_packages(),
+    packages=find_packages(where="express_analysis"),
+    package_dir={"": "express_analysis"},
     install_requires=[
         "streamlit",
         "pandas",
         "plotly",
         "openpyxl",
+        "pyarrow",
         "pyinstaller"
     ],
+    entry_points={
+        "console_scripts": [
+            "chips-express=express_analysis.cli:main",
+        ],
+    },
     author="Your Name",
     author_email="your.email@example.com",
     description="Análisis de Chips Express",